@@ -1,26 +1,149 @@
-from flask import Flask
+import tracemalloc
+
+from flask import Flask, jsonify
 
 from app.configs.settings import Settings
-from app.controllers.api_controller import api_bp
-from app.controllers.table_widget_controller import table_widget_bp
-from app.controllers.backglass_widget_controller import backglass_widget_bp
-from app.controllers.health_controller import health_bp
-from app.controllers.vpsdb_sync_controller import vpsdb_sync_bp
 
 
 def create_app() -> Flask:
-    """Application factory."""
+    """Application factory.
+
+    Controllers and services are imported here rather than at module load, and
+    optional services only when enabled, so importing `app` stays cheap.
+    """
+    from app.services.background_sync import BackgroundSync
+    from app.services.change_log import ChangeLog
+    from app.services.game_snapshot import SnapshotProvider
+    from app.services.request_timing import RequestTiming
+    from app.services.snapshot_history import SnapshotHistory
+    from app.services.widget_rows import WidgetRowsCache
+
     app = Flask(__name__, static_folder="static", template_folder="templates")
 
     # Load settings into app config
     settings = Settings.from_env()
     app.config["SETTINGS"] = settings
 
-    # Register blueprints
+    # Allocation sites for /admin/memory; started before the snapshot is loaded so it is attributed
+    if settings.TRACEMALLOC_FRAMES and not tracemalloc.is_tracing():
+        tracemalloc.start(settings.TRACEMALLOC_FRAMES)
+
+    # One snapshot provider per process; mapped games are shared across requests
+    provider = SnapshotProvider(settings)
+    app.extensions["vpsdb_snapshots"] = provider
+
+    # Past versions for `?asOf=` and per-sync diffs for /api/changes (both written by the sync service)
+    app.extensions["vpsdb_history"] = SnapshotHistory(settings)
+    app.extensions["vpsdb_changes"] = ChangeLog(settings)
+
+    # With leadership, only the holder of the storage dir's sync lease checks upstream
+    leadership = None
+    if settings.SYNC_LEADER_ENABLED and settings.UPSTREAM_SYNC_ENABLED:
+        from app.services.sync_leader import SyncLeadership
+
+        leadership = SyncLeadership(settings)
+        app.extensions["vpsdb_leadership"] = leadership
+
+    # Serve the local copy as soon as it is loaded; upstream syncs run in the background
+    sync = BackgroundSync(settings, provider, leadership=leadership)
+    app.extensions["vpsdb_sync"] = sync
+    if leadership is not None:
+        leadership.start(on_leader_tick=sync.trigger)
+    sync.boot()
+
+    # Reload as soon as another process (the sync sidecar or leader) publishes a new local copy
+    if settings.WATCH_LOCAL_ENABLED or leadership is not None:
+        from app.services.local_file_watcher import LocalFileWatcher
+
+        watcher = LocalFileWatcher(settings, provider)
+        app.extensions["vpsdb_watcher"] = watcher
+        watcher.start()
+
+    # Periodic URL health checks; results demote dead links in best_url selection
+    if settings.LINK_CHECK_ENABLED:
+        from app.services.link_checker import LinkChecker
+
+        checker = LinkChecker(settings, provider)
+        app.extensions["link_checker"] = checker
+        checker.start()
+
+    # Encoded row payloads for the client-side rendered widgets
+    app.extensions["widget_rows_cache"] = WidgetRowsCache(settings)
+
+    # Stage timings (Server-Timing header, slow-request log); registered first so it also times 429s
+    timing = RequestTiming(settings)
+    app.before_request(timing.before_request)
+    app.after_request(timing.after_request)
+
+    # Per-route, per-client token buckets (widgets get larger budgets than listings)
+    if settings.RATE_LIMIT_ENABLED:
+        from app.services.rate_limiter import RateLimiter
+
+        limiter = RateLimiter(settings)
+        app.extensions["rate_limiter"] = limiter
+        app.before_request(limiter.before_request)
+
+    # Identical concurrent GETs share one computed response (after the limiter, so duplicates still spend tokens)
+    if settings.COALESCE_ENABLED:
+        from app.services.request_coalescer import RequestCoalescer
+
+        coalescer = RequestCoalescer(settings)
+        app.extensions["request_coalescer"] = coalescer
+        app.before_request(coalescer.before_request)
+        app.after_request(coalescer.after_request)
+        app.teardown_request(coalescer.teardown_request)
+
+    _register_error_handlers(app)
+    _register_blueprints(app)
+    return app
+
+
+def _register_error_handlers(app: Flask) -> None:
+    from app.services.activity_feed import InvalidCursorError
+    from app.services.game_fieldset import InvalidFieldsError
+    from app.services.game_snapshot import SnapshotUnavailableError
+    from app.services.snapshot_history import HistoryBusyError, HistoryNotFoundError, InvalidAsOfError
+
+    @app.errorhandler(SnapshotUnavailableError)
+    def _snapshot_unavailable(e):
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+
+    @app.errorhandler(InvalidAsOfError)
+    def _invalid_as_of(e):
+        return jsonify({"error": str(e)}), 400
+
+    @app.errorhandler(InvalidFieldsError)
+    def _invalid_fields(e):
+        return jsonify({"error": str(e)}), 400
+
+    @app.errorhandler(InvalidCursorError)
+    def _invalid_cursor(e):
+        return jsonify({"error": str(e)}), 400
+
+    @app.errorhandler(HistoryNotFoundError)
+    def _history_not_found(e):
+        return jsonify({"error": str(e)}), 404
+
+    @app.errorhandler(HistoryBusyError)
+    def _history_busy(e):
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+
+
+def _register_blueprints(app: Flask) -> None:
+    from app.controllers.activity_widget_controller import activity_widget_bp
+    from app.controllers.admin_controller import admin_bp
+    from app.controllers.api_controller import api_bp
+    from app.controllers.backglass_widget_controller import backglass_widget_bp
+    from app.controllers.health_controller import health_bp
+    from app.controllers.stats_controller import stats_bp
+    from app.controllers.table_widget_controller import table_widget_bp
+    from app.controllers.vpsdb_sync_controller import vpsdb_sync_bp
+
     app.register_blueprint(health_bp)
     app.register_blueprint(vpsdb_sync_bp)
+    app.register_blueprint(stats_bp, url_prefix="/stats")
+    app.register_blueprint(admin_bp, url_prefix="/admin")
     app.register_blueprint(api_bp, url_prefix="/api")
     app.register_blueprint(table_widget_bp, url_prefix="/widgets/tables")
     app.register_blueprint(backglass_widget_bp, url_prefix="/widgets/backglasses")
-
-    return app
\ No newline at end of file
+    app.register_blueprint(activity_widget_bp, url_prefix="/widgets/activity")
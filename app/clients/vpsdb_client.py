@@ -1,43 +1,247 @@
 from __future__ import annotations
 
-import requests
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+# Smoothing factor for per-mirror latency/error moving averages.
+_EWMA_ALPHA = 0.3
+# A mirror whose error rate is above this is skipped until its cooldown passes.
+_UNHEALTHY_ERROR_RATE = 0.5
+_UNHEALTHY_COOLDOWN_SECONDS = 60.0
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="vpsdb-mirror")
+
+
+@dataclass(frozen=True)
+class Mirror:
+    """One upstream source: the DB JSON and its lastUpdated.json (http(s):// or file://)."""
+
+    db_url: str
+    last_updated_url: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.db_url}|{self.last_updated_url}"
+
+
+@dataclass
+class MirrorStats:
+    """Moving averages and last observations for one mirror (shared per process)."""
+
+    latency_ewma: float | None = None
+    error_ewma: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    last_error: str | None = None
+    last_error_at: float | None = None
+    last_timestamp: int | None = None
+
+    def healthy(self, now: float) -> bool:
+        if self.error_ewma <= _UNHEALTHY_ERROR_RATE:
+            return True
+        return self.last_error_at is None or now - self.last_error_at > _UNHEALTHY_COOLDOWN_SECONDS
+
+    def to_dict(self) -> dict:
+        return {
+            "latencyMs": round(self.latency_ewma * 1000.0, 1) if self.latency_ewma is not None else None,
+            "errorRate": round(self.error_ewma, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "lastError": self.last_error,
+            "lastTimestamp": self.last_timestamp,
+        }
+
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, MirrorStats] = {}
+
+
+def _stats_for(mirror: Mirror) -> MirrorStats:
+    with _stats_lock:
+        return _stats.setdefault(mirror.key, MirrorStats())
+
+
+def _read_url(url: str, timeout: float) -> str:
+    """Read a http(s) URL, or a local file given as file:// URL or path."""
+    if url.startswith("file://") or url.startswith("/"):
+        path = url[len("file://") :] if url.startswith("file://") else url
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    # Imported on first use: `requests` is a large share of worker boot time.
+    import requests
+
+    resp = requests.get(url, timeout=timeout)
+    resp.raise_for_status()
+    return resp.text
+
+
+def _parse_timestamp(text: str) -> int:
+    """Parse lastUpdated.json.
+
+    Expected payload shape (current upstream): { "lastUpdated": 1234567890 }
+    We also support plain integer payloads defensively.
+    """
+    data = json.loads(text)
+
+    if isinstance(data, int):
+        return int(data)
+    if isinstance(data, dict):
+        # Preferred key from upstream
+        if "lastUpdated" in data:
+            return int(data["lastUpdated"])
+        # Defensive: use first int-like value
+        for v in data.values():
+            try:
+                return int(v)
+            except (TypeError, ValueError):
+                continue
+
+    raise ValueError("Unexpected lastUpdated.json payload shape")
+
+
+def _parse_db(text: str, validate: Callable[[Any], None] | None = None) -> Tuple[str, Any]:
+    """Check that a DB download is complete JSON (a truncated body must never replace the local copy).
+
+    `validate` (supplied by the caller) may reject the parsed payload by raising.
+    """
+    data = json.loads(text)
+    if validate is not None:
+        validate(data)
+    return text, data
 
 
 class VpsDbClient:
-    """HTTP client for the upstream VPS DB endpoints."""
+    """HTTP client for the upstream VPS DB endpoints.
+
+    With several mirrors, requests go to the fastest healthy mirror (by moving
+    average latency; a mirror not measured yet is tried first) and fail over in order.
+    With `hedge_after_seconds`, a second mirror is asked once the first one is
+    slower than that, and the first good answer wins.
+    """
 
-    def __init__(self, last_updated_url: str, db_url: str, timeout_seconds: int = 30):
-        self._last_updated_url = last_updated_url
-        self._db_url = db_url
+    def __init__(
+        self,
+        last_updated_url: str,
+        db_url: str,
+        timeout_seconds: int = 30,
+        mirrors: Sequence[Mirror] | None = None,
+        hedge_after_seconds: float | None = None,
+    ):
+        self._mirrors: List[Mirror] = list(mirrors) if mirrors else [Mirror(db_url=db_url, last_updated_url=last_updated_url)]
         self._timeout = timeout_seconds
+        self._hedge_after = hedge_after_seconds if hedge_after_seconds and hedge_after_seconds > 0 else None
+        self._last_remote_timestamp: int | None = None
 
     def fetch_remote_timestamp(self) -> int:
-        """Fetch the remote epoch timestamp from lastUpdated.json.
+        """Fetch the remote epoch timestamp from lastUpdated.json."""
+        ts = self._request(self._mirrors, lambda m: m.last_updated_url, _parse_timestamp, record_timestamp=True)
+        self._last_remote_timestamp = ts
+        return ts
 
-        Expected payload shape (current upstream): { "lastUpdated": 1234567890 }
-        We also support plain integer payloads defensively.
+    def fetch_db_json_text(self) -> str:
+        """Fetch the full VPS DB JSON as text."""
+        return self.fetch_db_json()[0]
+
+    def fetch_db_json(self, validate: Callable[[Any], None] | None = None) -> Tuple[str, Any]:
+        """Fetch the full VPS DB JSON as (text, parsed data).
+
+        After `fetch_remote_timestamp`, only mirrors known to serve at least that
+        timestamp are used, so a lagging mirror cannot supply stale data. A body
+        that does not parse, or that `validate` rejects, counts as that mirror failing.
         """
-        resp = requests.get(self._last_updated_url, timeout=self._timeout)
-        resp.raise_for_status()
-        data = resp.json()
-
-        if isinstance(data, int):
-            return int(data)
-        if isinstance(data, dict):
-            # Preferred key from upstream
-            if "lastUpdated" in data:
-                return int(data["lastUpdated"])
-            # Defensive: use first int-like value
-            for v in data.values():
+        mirrors = self._mirrors
+        wanted = self._last_remote_timestamp
+        if wanted is not None and len(mirrors) > 1:
+            mirrors = [m for m in mirrors if (_stats_for(m).last_timestamp or 0) >= wanted]
+            if not mirrors:
+                raise RuntimeError(f"No mirror has reported lastUpdated >= {wanted}")
+        return self._request(mirrors, lambda m: m.db_url, lambda text: _parse_db(text, validate))
+
+    def mirror_stats(self) -> List[dict]:
+        """Per-mirror latency/error stats in current preference order."""
+        return [{"dbUrl": m.db_url, "lastUpdatedUrl": m.last_updated_url, **_stats_for(m).to_dict()} for m in self._ranked(self._mirrors)]
+
+    # ---------- Internals ----------
+
+    def _ranked(self, mirrors: Sequence[Mirror]) -> List[Mirror]:
+        now = time.time()
+
+        def key(item: Tuple[int, Mirror]) -> tuple:
+            i, m = item
+            s = _stats_for(m)
+            # Unmeasured mirrors go first (in configured order), so each one gets measured once.
+            latency = s.latency_ewma if s.latency_ewma is not None else 0.0
+            return (not s.healthy(now), latency, i)
+
+        return [m for _, m in sorted(enumerate(mirrors), key=key)]
+
+    def _attempt(self, mirror: Mirror, url: str, parse: Callable[[str], Any], record_timestamp: bool) -> Any:
+        stats = _stats_for(mirror)
+        started = time.perf_counter()
+        try:
+            value = parse(_read_url(url, self._timeout))
+        except Exception as e:
+            with _stats_lock:
+                stats.requests += 1
+                stats.errors += 1
+                stats.error_ewma = _EWMA_ALPHA + (1 - _EWMA_ALPHA) * stats.error_ewma
+                stats.last_error = str(e) or e.__class__.__name__
+                stats.last_error_at = time.time()
+            raise
+        elapsed = time.perf_counter() - started
+        with _stats_lock:
+            stats.requests += 1
+            stats.error_ewma = (1 - _EWMA_ALPHA) * stats.error_ewma
+            stats.latency_ewma = elapsed if stats.latency_ewma is None else _EWMA_ALPHA * elapsed + (1 - _EWMA_ALPHA) * stats.latency_ewma
+            if record_timestamp:
+                stats.last_timestamp = int(value)
+        return value
+
+    def _request(
+        self,
+        mirrors: Sequence[Mirror],
+        url_of: Callable[[Mirror], str],
+        parse: Callable[[str], Any],
+        record_timestamp: bool = False,
+    ) -> Any:
+        ranked = self._ranked(mirrors)
+        if len(ranked) == 1 or self._hedge_after is None:
+            last_error: Exception | None = None
+            for m in ranked:
                 try:
-                    return int(v)
-                except (TypeError, ValueError):
-                    continue
+                    return self._attempt(m, url_of(m), parse, record_timestamp)
+                except Exception as e:
+                    last_error = e
+            raise last_error  # type: ignore[misc]
 
-        raise ValueError("Unexpected lastUpdated.json payload shape")
+        # Hedged: start the best mirror, add the next one if it is slow or fails.
+        pending: Dict[Future, Mirror] = {}
+        queue = list(ranked)
+        last_error = None
 
-    def fetch_db_json_text(self) -> str:
-        """Fetch the full VPS DB JSON as text."""
-        resp = requests.get(self._db_url, timeout=self._timeout)
-        resp.raise_for_status()
-        return resp.text
+        def launch() -> None:
+            m = queue.pop(0)
+            pending[_executor.submit(self._attempt, m, url_of(m), parse, record_timestamp)] = m
+
+        launch()
+        hedged = False
+        while pending:
+            timeout = None if hedged or not queue else self._hedge_after
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                launch()
+                continue
+            for fut in done:
+                pending.pop(fut)
+                try:
+                    return fut.result()
+                except Exception as e:
+                    last_error = e
+            if queue and len(pending) < 2:
+                launch()
+        raise last_error  # type: ignore[misc]
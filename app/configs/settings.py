@@ -2,6 +2,9 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from typing import Tuple
+
+from app.utils import compression
 
 
 @dataclass(frozen=True)
@@ -10,13 +13,65 @@ class Settings:
 
     VPSDB_REMOTE_URL: str
     VPSDB_LASTUPDATED_URL: str
+    VPSDB_MIRRORS: Tuple[Tuple[str, str], ...]
+    VPSDB_HEDGE_AFTER_MS: int
 
     STORAGE_DIR: str
     LOCAL_JSON_PATH: str
     LOCAL_TIMESTAMP_PATH: str
+    MANIFEST_PATH: str
+    LOCAL_COMPRESSION: str
+    LOCAL_COMPRESSION_LEVEL: int | None
+    LOCAL_COMPRESSION_PRUNE: bool
+    STORE_BACKEND: str
+    SQLITE_PATH: str
+    INGEST_PROCESSES: int
+    HISTORY_DIR: str
+    HISTORY_VERSIONS: int
+    HISTORY_MAX_AGE_DAYS: int
+    CHANGELOG_ENABLED: bool
+    CHANGELOG_DIR: str
+    CHANGELOG_VERSIONS: int
 
     CACHE_TTL_SECONDS: int
     SYNC_ON_START: bool
+    SYNC_MIN_INTERVAL_SECONDS: int
+    UPSTREAM_SYNC_ENABLED: bool
+    WATCH_LOCAL_ENABLED: bool
+    WATCH_MODE: str
+    WATCH_POLL_SECONDS: int
+    WATCH_DEBOUNCE_MS: int
+    SYNC_LEADER_ENABLED: bool
+    SYNC_LEASE_TTL_SECONDS: int
+
+    RATE_LIMIT_ENABLED: bool
+    RATE_LIMIT_BACKEND: str
+    RATE_LIMIT_SHM_PATH: str
+    RATE_LIMIT_LISTING: str
+    RATE_LIMIT_WIDGET: str
+    RATE_LIMIT_TRUST_PROXY: bool
+    RATE_LIMIT_API_KEYS: Tuple[str, ...]
+
+    SERVER_TIMING_ENABLED: bool
+    SLOW_REQUEST_MS: int
+
+    COALESCE_ENABLED: bool
+    COALESCE_WAIT_MS: int
+
+    LINK_CHECK_ENABLED: bool
+    LINK_CHECK_CACHE_PATH: str
+    LINK_CHECK_INTERVAL_SECONDS: int
+    LINK_CHECK_TTL_SECONDS: int
+    LINK_CHECK_CONCURRENCY: int
+    LINK_CHECK_PER_HOST: int
+    LINK_CHECK_TIMEOUT_SECONDS: int
+    LINK_CHECK_DEAD_AFTER: int
+
+    ADMIN_TOKEN: str
+    TRACEMALLOC_FRAMES: int
+
+    WIDGET_ROWS_CACHE_ENTRIES: int
+    WIDGET_ROWS_MAX_AGE_SECONDS: int
 
     @staticmethod
     def _get_int(name: str, default: int) -> int:
@@ -34,25 +89,89 @@ class Settings:
             return default
         return v.strip().lower() in ("1", "true", "t", "yes", "y", "on")
 
+    @staticmethod
+    def _get_mirrors(name: str, default: Tuple[str, str]) -> Tuple[Tuple[str, str], ...]:
+        """Read an ordered mirror list: `db_url|last_updated_url,db_url|last_updated_url,...`."""
+        mirrors = []
+        for entry in os.getenv(name, "").split(","):
+            db_url, sep, last_updated_url = entry.strip().partition("|")
+            if db_url and sep and last_updated_url:
+                mirrors.append((db_url.strip(), last_updated_url.strip()))
+        return tuple(mirrors) or (default,)
+
     @classmethod
     def from_env(cls) -> "Settings":
         """Create settings from environment variables."""
         storage_dir = os.getenv("VPSDB_STORAGE_DIR", "./data").rstrip("/")
         local_json = os.getenv("VPSDB_LOCAL_JSON_PATH", f"{storage_dir}/vpsdb.json")
         local_ts = os.getenv("VPSDB_LOCAL_TIMESTAMP_PATH", f"{storage_dir}/vpsdb.lastUpdated.json")
+        store_backend = os.getenv("VPSDB_STORE_BACKEND", "memory").strip().lower()
+        rate_limit_backend = os.getenv("RATE_LIMIT_BACKEND", "memory").strip().lower()
+        watch_mode = os.getenv("VPSDB_WATCH_MODE", "auto").strip().lower()
+        shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else storage_dir
+        compression_level = cls._get_int("VPSDB_LOCAL_COMPRESSION_LEVEL", -1)
+
+        remote_url = os.getenv(
+            "VPSDB_REMOTE_URL",
+            "https://virtualpinballspreadsheet.github.io/vps-db/db/vpsdb.json",
+        )
+        last_updated_url = os.getenv(
+            "VPSDB_LASTUPDATED_URL",
+            "https://virtualpinballspreadsheet.github.io/vps-db/lastUpdated.json",
+        )
 
         return cls(
-            VPSDB_REMOTE_URL=os.getenv(
-                "VPSDB_REMOTE_URL",
-                "https://virtualpinballspreadsheet.github.io/vps-db/db/vpsdb.json",
-            ),
-            VPSDB_LASTUPDATED_URL=os.getenv(
-                "VPSDB_LASTUPDATED_URL",
-                "https://virtualpinballspreadsheet.github.io/vps-db/lastUpdated.json",
-            ),
+            VPSDB_REMOTE_URL=remote_url,
+            VPSDB_LASTUPDATED_URL=last_updated_url,
+            VPSDB_MIRRORS=cls._get_mirrors("VPSDB_MIRRORS", (remote_url, last_updated_url)),
+            VPSDB_HEDGE_AFTER_MS=cls._get_int("VPSDB_HEDGE_AFTER_MS", 0),
             STORAGE_DIR=storage_dir,
             LOCAL_JSON_PATH=local_json,
             LOCAL_TIMESTAMP_PATH=local_ts,
+            MANIFEST_PATH=os.getenv("VPSDB_MANIFEST_PATH", f"{storage_dir}/vpsdb.manifest.json"),
+            LOCAL_COMPRESSION=compression.resolve(os.getenv("VPSDB_LOCAL_COMPRESSION", "none")),
+            LOCAL_COMPRESSION_LEVEL=compression_level if compression_level >= 0 else None,
+            LOCAL_COMPRESSION_PRUNE=cls._get_bool("VPSDB_LOCAL_COMPRESSION_PRUNE", False),
+            STORE_BACKEND=store_backend if store_backend in ("memory", "sqlite") else "memory",
+            SQLITE_PATH=os.getenv("VPSDB_SQLITE_PATH", f"{storage_dir}/vpsdb.sqlite"),
+            INGEST_PROCESSES=max(0, cls._get_int("VPSDB_INGEST_PROCESSES", 0)),
+            HISTORY_DIR=os.getenv("VPSDB_HISTORY_DIR", f"{storage_dir}/history"),
+            HISTORY_VERSIONS=max(0, cls._get_int("VPSDB_HISTORY_VERSIONS", 0)),
+            HISTORY_MAX_AGE_DAYS=max(0, cls._get_int("VPSDB_HISTORY_MAX_AGE_DAYS", 0)),
+            CHANGELOG_ENABLED=cls._get_bool("VPSDB_CHANGELOG_ENABLED", True),
+            CHANGELOG_DIR=os.getenv("VPSDB_CHANGELOG_DIR", f"{storage_dir}/changes"),
+            CHANGELOG_VERSIONS=max(1, cls._get_int("VPSDB_CHANGELOG_VERSIONS", 30)),
             CACHE_TTL_SECONDS=cls._get_int("CACHE_TTL_SECONDS", 900),
             SYNC_ON_START=cls._get_bool("VPSDB_SYNC_ON_START", True),
+            SYNC_MIN_INTERVAL_SECONDS=cls._get_int("VPSDB_SYNC_MIN_INTERVAL_SECONDS", 60),
+            UPSTREAM_SYNC_ENABLED=cls._get_bool("VPSDB_UPSTREAM_SYNC", True),
+            WATCH_LOCAL_ENABLED=cls._get_bool("VPSDB_WATCH_LOCAL", False),
+            WATCH_MODE=watch_mode if watch_mode in ("auto", "inotify", "poll") else "auto",
+            WATCH_POLL_SECONDS=max(1, cls._get_int("VPSDB_WATCH_POLL_SECONDS", 2)),
+            WATCH_DEBOUNCE_MS=max(0, cls._get_int("VPSDB_WATCH_DEBOUNCE_MS", 500)),
+            SYNC_LEADER_ENABLED=cls._get_bool("VPSDB_SYNC_LEADER", False),
+            SYNC_LEASE_TTL_SECONDS=max(3, cls._get_int("VPSDB_SYNC_LEASE_TTL_SECONDS", 30)),
+            RATE_LIMIT_ENABLED=cls._get_bool("RATE_LIMIT_ENABLED", False),
+            RATE_LIMIT_BACKEND=rate_limit_backend if rate_limit_backend in ("memory", "shm") else "memory",
+            RATE_LIMIT_SHM_PATH=os.getenv("RATE_LIMIT_SHM_PATH", f"{shm_dir}/vpsdb-ratelimit.bin"),
+            RATE_LIMIT_LISTING=os.getenv("RATE_LIMIT_LISTING", "2/20"),
+            RATE_LIMIT_WIDGET=os.getenv("RATE_LIMIT_WIDGET", "10/60"),
+            RATE_LIMIT_TRUST_PROXY=cls._get_bool("RATE_LIMIT_TRUST_PROXY", False),
+            RATE_LIMIT_API_KEYS=tuple(k.strip() for k in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if k.strip()),
+            SERVER_TIMING_ENABLED=cls._get_bool("SERVER_TIMING_ENABLED", True),
+            SLOW_REQUEST_MS=max(0, cls._get_int("SLOW_REQUEST_MS", 1000)),
+            COALESCE_ENABLED=cls._get_bool("COALESCE_ENABLED", True),
+            COALESCE_WAIT_MS=max(1, cls._get_int("COALESCE_WAIT_MS", 2000)),
+            LINK_CHECK_ENABLED=cls._get_bool("LINK_CHECK_ENABLED", False),
+            LINK_CHECK_CACHE_PATH=os.getenv("LINK_CHECK_CACHE_PATH", f"{storage_dir}/link_health.json"),
+            LINK_CHECK_INTERVAL_SECONDS=max(60, cls._get_int("LINK_CHECK_INTERVAL_SECONDS", 3600)),
+            LINK_CHECK_TTL_SECONDS=cls._get_int("LINK_CHECK_TTL_SECONDS", 86400),
+            LINK_CHECK_CONCURRENCY=max(1, cls._get_int("LINK_CHECK_CONCURRENCY", 16)),
+            LINK_CHECK_PER_HOST=max(1, cls._get_int("LINK_CHECK_PER_HOST", 2)),
+            LINK_CHECK_TIMEOUT_SECONDS=max(1, cls._get_int("LINK_CHECK_TIMEOUT_SECONDS", 10)),
+            LINK_CHECK_DEAD_AFTER=max(1, cls._get_int("LINK_CHECK_DEAD_AFTER", 3)),
+            ADMIN_TOKEN=os.getenv("ADMIN_TOKEN", "").strip(),
+            TRACEMALLOC_FRAMES=max(0, cls._get_int("TRACEMALLOC_FRAMES", 0)),
+            WIDGET_ROWS_CACHE_ENTRIES=max(0, cls._get_int("WIDGET_ROWS_CACHE_ENTRIES", 256)),
+            WIDGET_ROWS_MAX_AGE_SECONDS=max(0, cls._get_int("WIDGET_ROWS_MAX_AGE_SECONDS", 60)),
         )
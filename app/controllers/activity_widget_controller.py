@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import List
+
+from flask import Blueprint, render_template, current_app, request
+
+from app.controllers.backglass_widget_controller import _rows_from_backglasses
+from app.controllers.table_widget_controller import _rows_from_tables
+from app.services.activity_feed import KINDS, ActivityItem, activity_page
+from app.services.game_index import GameQuery
+from app.services.game_repository import GameRepository
+from app.services.request_timing import timed
+from app.utils.query import get_csv_list, get_int, get_str, parse_bool
+
+activity_widget_bp = Blueprint("activity_widgets", __name__)
+
+
+def _norm_sort(value: str | None) -> str:
+    """Normalize sort to createdAt/updatedAt (default updatedAt)."""
+    v = (value or "").strip().lower()
+    if v in ("createdat", "created", "c"):
+        return "createdAt"
+    return "updatedAt"
+
+
+def _sync_data():
+    """Start a background VPSDB sync if one is due (never blocks the request)."""
+    with timed("sync"):
+        current_app.extensions["vpsdb_sync"].trigger()
+
+
+def _rows_from_activity(snapshot, items: List[ActivityItem]) -> List[dict]:
+    """Display rows in feed order, built by the table and backglass widgets' row builders."""
+    tables = iter(_rows_from_tables(snapshot, [a.item for a in items if a.kind == "table"]))
+    bgs = iter(_rows_from_backglasses(snapshot, [a.item for a in items if a.kind == "backglass"]))
+    return [
+        {**next(tables if a.kind == "table" else bgs), "kind": "Table" if a.kind == "table" else "Backglass"}
+        for a in items
+    ]
+
+
+@activity_widget_bp.get("/list")
+def activity_list_widget():
+    _sync_data()
+    """HTML card with the most recent tables and backglasses in one mini-table."""
+    limit = get_int("limit", 10, 1, 100)
+    theme = get_str("theme", "light")
+    query = GameQuery.from_request()
+    sort = _norm_sort(get_str("sort", None))
+    kinds = [k for k in KINDS if k in get_csv_list("kind")] or list(KINDS)
+
+    snapshot = GameRepository.from_flask_app().snapshot()
+    with timed("filter"):
+        page = activity_page(snapshot.index, snapshot.timestamp, query, sort, limit, kinds)  # type: ignore[arg-type]
+
+    rows = _rows_from_activity(snapshot, page.items)
+    show_header = parse_bool(request.args.get("header"), default=True)
+    show_footer = parse_bool(request.args.get("footer"), default=True)
+    with timed("render"):
+        return render_template(
+            "activity_list.html",
+            show_header=show_header,
+            show_footer=show_footer,
+            theme=theme,
+            rows=rows,
+            title="Recent Activity",
+            sort=sort,
+        )
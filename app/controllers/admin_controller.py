@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import hmac
+
+from flask import Blueprint, current_app, jsonify, request
+
+from app.services.memory_report import memory_report
+from app.utils.query import get_bool, get_int
+
+admin_bp = Blueprint("admin", __name__)
+
+
+@admin_bp.before_request
+def _require_admin_token():
+    """Admin routes exist only when ADMIN_TOKEN is set, and require it as a bearer token."""
+    token = current_app.config["SETTINGS"].ADMIN_TOKEN
+    if not token:
+        return jsonify({"error": "not found"}), 404
+    auth = request.headers.get("Authorization", "")
+    given = auth[7:].strip() if auth.lower().startswith("bearer ") else request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(given.encode("utf-8"), token.encode("utf-8")):
+        return jsonify({"error": "unauthorized"}), 401, {"WWW-Authenticate": "Bearer"}
+    return None
+
+
+@admin_bp.get("/memory")
+def memory():
+    """Memory use of this worker: snapshot entity counts and deep sizes, caches, RSS, allocation sites."""
+    deep = get_bool("deep", True)
+    top = get_int("top", 20, 0, 200)
+    return jsonify(memory_report(current_app, deep=deep, top=top))
@@ -1,77 +1,207 @@
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, current_app
+from flask import Blueprint, Response, abort, jsonify, current_app
 
-from app.services.vpsdb_sync_service import VpsDbSyncService
-
-from app.models.game import Game
+from app.services.activity_feed import KINDS, ActivityCursor, activity_page
+from app.services.catalog_export import EXPORT_KINDS, MIMETYPES, stream_export
+from app.services.game_facets import FACET_NAMES
+from app.services.game_fieldset import GameFieldset
+from app.services.game_index import GameQuery
 from app.services.game_repository import GameRepository
+from app.services.link_checker import dead_link_filter
+from app.services.request_timing import timed
+from app.services.snapshot_history import InvalidAsOfError, parse_as_of
 from app.utils.query import get_int, get_str, get_csv_list
-from app.utils.comparators import sort_games_by_updated_at, sort_tables_by_updated_at, sort_backglasses_by_updated_at
 
 api_bp = Blueprint("api", __name__)
 
 def _sync_data():
-    """Sync VPSDB data if needed."""
-    settings = current_app.config["SETTINGS"]
-    svc = VpsDbSyncService(settings)
-    svc.sync_if_needed()
+    """Start a background VPSDB sync if one is due (never blocks the request)."""
+    with timed("sync"):
+        current_app.extensions["vpsdb_sync"].trigger()
+
+
+def _snapshot():
+    """The current snapshot, or the historical one selected by `?asOf=`."""
+    return GameRepository.from_flask_app().snapshot(as_of=get_str("asOf", None))
 
 @api_bp.get("/games")
 def list_games():
     _sync_data()
-    """Return a JSON list of games with child models."""
+    """Return a JSON list of games with child models (see `GameFieldset` for `fields`/`include`)."""
     limit = get_int("limit", default=50, min_value=1, max_value=500)
     sort_mode = (get_str("sort", "game_updated") or "game_updated").strip().lower()
-
-    repo = GameRepository.from_flask_app()
-    games = repo.list_games()
-
-    if sort_mode == "table_updated":
-        tables = sort_tables_by_updated_at([t for g in games for t in g.tableFiles])[:limit]
-        game_ids: list[str] = []
-        for t in tables:
-            if t.gameId and t.gameId not in game_ids:
-                game_ids.append(t.gameId)
-        games = [g for g in games if g.id in set(game_ids)]
-        games = sorted(games, key=lambda g: game_ids.index(g.id))
-    elif sort_mode == "backglass_updated":
-        bgs = sort_backglasses_by_updated_at([b for g in games for b in g.b2sFiles])[:limit]
-        game_ids: list[str] = []
-        for b in bgs:
-            if b.gameId and b.gameId not in game_ids:
-                game_ids.append(b.gameId)
-        games = [g for g in games if g.id in set(game_ids)]
-        games = sorted(games, key=lambda g: game_ids.index(g.id))
-    else:
-        games = sort_games_by_updated_at(games)[:limit]
-
-    return jsonify({"count": len(games), "games": [g.to_dict() for g in games]})
+    query = GameQuery.from_request()
+    fieldset = GameFieldset.from_request()
+
+    snapshot = _snapshot()
+    index = snapshot.index
+
+    with timed("filter"):
+        if sort_mode in ("table_updated", "backglass_updated"):
+            items = (
+                index.tables(query, limit=limit, sort="updatedAt")
+                if sort_mode == "table_updated"
+                else index.backglasses(query, limit=limit, sort="updatedAt")
+            )
+            game_ids: list[str] = []
+            for it in items:
+                if it.gameId and it.gameId not in game_ids:
+                    game_ids.append(it.gameId)
+            games = index.games_by_ids(game_ids)
+        else:
+            games = index.games(query, limit=limit, sort="updatedAt")
+
+    with timed("render"):
+        return jsonify({"count": len(games), "games": [fieldset.serialize(g) for g in games]})
 
 
 @api_bp.get("/tables")
 def list_tables():
     _sync_data()
-    """Return a flattened list of most-recent tables (optionally filtered by format)."""
+    """Return a flattened list of most-recent tables (optionally filtered)."""
     limit = get_int("limit", default=50, min_value=1, max_value=500)
-    formats = get_csv_list("format")
-
-    repo = GameRepository.from_flask_app()
-    games = repo.list_games()
+    query = GameQuery.from_request()
 
-    tables = Game.tables_by_formats(games, formats, limit=limit) if formats else Game.most_recent_tables(games, limit=limit)
-    return jsonify({"count": len(tables), "tables": [t.to_dict() for t in tables]})
+    index = _snapshot().index
+    with timed("filter"):
+        tables = index.tables(query, limit=limit, sort="createdAt")
+    with timed("render"):
+        return jsonify({"count": len(tables), "tables": [t.to_dict() for t in tables]})
 
 
 @api_bp.get("/backglasses")
 def list_backglasses():
     _sync_data()
-    """Return a flattened list of most-recent backglasses (optionally filtered by feature)."""
+    """Return a flattened list of most-recent backglasses (optionally filtered)."""
     limit = get_int("limit", default=50, min_value=1, max_value=500)
-    features = get_csv_list("feature")
+    query = GameQuery.from_request()
 
-    repo = GameRepository.from_flask_app()
-    games = repo.list_games()
+    index = _snapshot().index
+    with timed("filter"):
+        bgs = index.backglasses(query, limit=limit, sort="createdAt")
+    with timed("render"):
+        return jsonify({"count": len(bgs), "backglasses": [b.to_dict() for b in bgs]})
 
-    bgs = Game.backglasses_by_features(games, features, limit=limit) if features else Game.most_recent_backglasses(games, limit=limit)
-    return jsonify({"count": len(bgs), "backglasses": [b.to_dict() for b in bgs]})
+
+@api_bp.get("/activity")
+def list_activity():
+    _sync_data()
+    """Return tables and backglasses interleaved, newest first; pass `nextCursor` back as `cursor` for more."""
+    limit = get_int("limit", default=20, min_value=1, max_value=200)
+    sort_raw = (get_str("sort", "updatedAt") or "").strip().lower()
+    sort = "createdAt" if sort_raw in ("createdat", "created", "c") else "updatedAt"
+    kinds = [k for k in KINDS if k in get_csv_list("kind")] or list(KINDS)
+    raw_cursor = get_str("cursor", None)
+    cursor = ActivityCursor.decode(raw_cursor, sort) if raw_cursor else None
+    query = GameQuery.from_request()
+
+    snapshot = _snapshot()
+    with timed("filter"):
+        page = activity_page(snapshot.index, snapshot.timestamp, query, sort, limit, kinds, cursor)
+    with timed("render"):
+        return jsonify(
+            {
+                "version": snapshot.timestamp,
+                "sort": sort,
+                "count": len(page.items),
+                "items": [a.to_dict() for a in page.items],
+                "nextCursor": page.next_cursor.encode() if page.next_cursor else None,
+            }
+        )
+
+
+@api_bp.get("/facets")
+def list_facets():
+    _sync_data()
+    """Return top-N value counts per facet (optionally restricted by the listing filters)."""
+    limit = get_int("limit", default=10, min_value=1, max_value=100)
+    names = [n for n in get_csv_list("facets") if n in FACET_NAMES] or list(FACET_NAMES)
+
+    snapshot = _snapshot()
+    with timed("filter"):
+        facets = snapshot.facets_for(GameQuery.from_request())
+    with timed("render"):
+        return jsonify(
+            {
+                "version": snapshot.timestamp,
+                "totals": facets.totals,
+                "facets": facets.top(names, limit=limit),
+            }
+        )
+
+
+@api_bp.get("/export/<kind>")
+def export(kind: str):
+    _sync_data()
+    """Stream every matching game/table/backglass as NDJSON (default) or CSV.
+
+    Accepts the same filters as the listings; `output=csv` switches the encoding.
+    The snapshot is pinned up front so a refresh mid-stream cannot mix versions.
+    """
+    if kind not in EXPORT_KINDS:
+        abort(404)
+    fmt = (get_str("output", "ndjson") or "ndjson").strip().lower()
+    if fmt not in MIMETYPES:
+        return jsonify({"error": f"unsupported output {fmt!r}", "supported": sorted(MIMETYPES)}), 400
+    query = GameQuery.from_request()
+
+    snapshot = _snapshot()
+    resp = Response(stream_export(snapshot.index, kind, query, fmt, dead_link_filter()), mimetype=MIMETYPES[fmt])
+    resp.headers["Content-Disposition"] = f'attachment; filename="vpsdb-{kind}-{snapshot.timestamp}.{fmt}"'
+    resp.headers["X-Snapshot-Version"] = str(snapshot.timestamp)
+    return resp
+
+
+@api_bp.get("/links/health")
+def links_health():
+    """Link checker results: counts by state, coverage and hosts with the most dead links."""
+    checker = current_app.extensions.get("link_checker")
+    if checker is None:
+        return jsonify({"enabled": False})
+    return jsonify(checker.stats())
+
+
+@api_bp.get("/history")
+def list_history():
+    """Recorded dataset versions usable as `?asOf=` (oldest first)."""
+    history = current_app.extensions["vpsdb_history"]
+    return jsonify({"enabled": history.enabled, "versions": history.versions()})
+
+
+@api_bp.get("/changes")
+def list_changes():
+    _sync_data()
+    """Games, tables and backglasses added, updated or removed since `since` (epoch, version or ISO date).
+
+    Added/updated entries carry the current item; removed ones only the id.
+    When `complete` is false the log does not reach back to `since` and the
+    caller should refetch everything instead.
+    """
+    since_raw = get_str("since", None)
+    if since_raw is None:
+        raise InvalidAsOfError("Missing since: expected epoch seconds/milliseconds, a version or an ISO-8601 date")
+    since = parse_as_of(since_raw, name="since")
+    if not current_app.extensions["vpsdb_changes"].enabled:
+        return jsonify({"error": "Change log is disabled (VPSDB_CHANGELOG_ENABLED=false)"}), 404
+
+    snapshot = _snapshot()
+    changes = current_app.extensions["vpsdb_changes"].since(since, up_to=snapshot.timestamp)
+
+    wanted = {
+        gid for per_kind in changes.changes.values() for op in ("added", "updated") for gid in per_kind[op].values()
+    }
+    games = {g.id: g for g in snapshot.index.games_by_ids(sorted(wanted))}
+    children = {
+        "tables": {t.id: t for g in games.values() for t in g.tableFiles},
+        "backglasses": {b.id: b for g in games.values() for b in g.b2sFiles},
+    }
+
+    payload = {"since": since.isoformat(), "version": snapshot.timestamp, "complete": changes.complete}
+    for kind, per_kind in changes.changes.items():
+        lookup = games if kind == "games" else children[kind]
+        payload[kind] = {
+            op: [lookup[i].to_dict() for i in per_kind[op] if i in lookup] for op in ("added", "updated")
+        }
+        payload[kind]["removed"] = sorted(per_kind["removed"])
+    return jsonify(payload)
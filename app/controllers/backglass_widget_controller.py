@@ -1,67 +1,24 @@
 from __future__ import annotations
 
-from typing import Any, List
+from typing import List
 
 from flask import Blueprint, render_template, current_app, request
 
-from app.services.vpsdb_sync_service import VpsDbSyncService
-from app.models.game import Game
 from app.models.game_back_glass import GameBackGlass
+from app.services.game_index import GameQuery
 from app.services.game_repository import GameRepository
-from app.utils.dates import dt_to_iso
-from app.utils.query import get_int, get_str, get_csv_list, parse_bool
-from app.utils.strings import truncate
+from app.services.link_checker import dead_link_filter, link_revision
+from app.services.request_timing import timed
+from app.services.widget_rows import rows_response
+from app.utils.query import get_int, get_str, parse_bool
 
 backglass_widget_bp = Blueprint("backglass_widgets", __name__)
 
 
-def _get_attr(obj: Any, name: str, default: Any = "") -> Any:
-    """Safely get an attribute if it exists."""
-    return getattr(obj, name, default)
-
-
-def _game_field_from_bg(b: GameBackGlass, field: str) -> Any:
-    """See table controller for precedence rules."""
-    if field == "manufacturer":
-        v = _get_attr(b, "gameManufacturer", None)
-        if v:
-            return v
-    if field == "year":
-        v = _get_attr(b, "gameYear", None)
-        if v is not None and v != "":
-            return v
-
-    game_obj = _get_attr(b, "game", None)
-    if isinstance(game_obj, dict):
-        return game_obj.get(field, "")
-
-    return ""
-
-
-def _rows_from_backglasses(bgs: List[GameBackGlass]) -> List[dict]:
-    """Create display rows for backglass widgets."""
-    rows: List[dict] = []
-    for b in bgs:
-        created_dt = _get_attr(b, "createdAt", None) or _get_attr(b, "updatedAt", None)
-        updated_dt = _get_attr(b, "updatedAt", None)
-        authors = _get_attr(b, "authors", []) or []
-        first_author = authors[0] if authors else ""
-
-        rows.append(
-            {
-                "name": _get_attr(b, "gameName", "") or "",
-                "manufacturer": _game_field_from_bg(b, "manufacturer") or "",
-                "year": _game_field_from_bg(b, "year") or "",
-                "version": _get_attr(b, "version", "") or "",
-                "features": truncate(", ".join(_get_attr(b, "features", []) or []), 40),
-                "authors": truncate(first_author, 40),
-                "createdAt": (dt_to_iso(created_dt) or "")[:10],
-                "updatedAt": (dt_to_iso(updated_dt) or "")[:10],
-                "url": (b.best_url() if hasattr(b, "best_url") else "") or "",
-                "imgUrl": _get_attr(b, "imgUrl", "") or "",
-            }
-        )
-    return rows
+@timed("rows")
+def _rows_from_backglasses(snapshot, bgs: List[GameBackGlass]) -> List[dict]:
+    """Display rows for backglass widgets, precomputed per snapshot (see `widget_view`)."""
+    return snapshot.widget_rows.rows("backglass", bgs, dead_link_filter(), link_revision())
 
 
 def _layout_flags():
@@ -80,10 +37,9 @@ def _norm_sort(value: str | None) -> str:
 
 
 def _sync_data():
-    """Sync VPSDB data if needed."""
-    settings = current_app.config["SETTINGS"]
-    svc = VpsDbSyncService(settings)
-    svc.sync_if_needed()
+    """Start a background VPSDB sync if one is due (never blocks the request)."""
+    with timed("sync"):
+        current_app.extensions["vpsdb_sync"].trigger()
 
 @backglass_widget_bp.get("/list")
 def backglass_list_widget():
@@ -91,29 +47,25 @@ def backglass_list_widget():
     """HTML card with a mini-table of most recently created/updated backglasses."""
     limit = get_int("limit", 10, 1, 100)
     theme = get_str("theme", "light")
-    features = get_csv_list("feature")
+    query = GameQuery.from_request()
     sort = _norm_sort(get_str("sort", None))
 
-    repo = GameRepository.from_flask_app()
-    games = repo.list_games()
-
-    bgs = (
-        Game.backglasses_by_features(games, features, limit=limit, sort=sort)  # type: ignore[arg-type]
-        if features
-        else Game.most_recent_backglasses(games, limit=limit, sort=sort)  # type: ignore[arg-type]
-    )
+    snapshot = GameRepository.from_flask_app().snapshot()
+    with timed("filter"):
+        bgs = snapshot.index.backglasses(query, limit=limit, sort=sort)  # type: ignore[arg-type]
 
-    rows = _rows_from_backglasses(bgs)
+    rows = _rows_from_backglasses(snapshot, bgs)
     show_header, show_footer = _layout_flags()
-    return render_template(
-        "backglasses_list.html",  # whatever your template is
-        show_header=show_header,
-        show_footer=show_footer,
-        theme=theme,
-        rows=rows,
-        title="Recent Backglasses",
-        sort=sort
-    )
+    with timed("render"):
+        return render_template(
+            "backglasses_list.html",  # whatever your template is
+            show_header=show_header,
+            show_footer=show_footer,
+            theme=theme,
+            rows=rows,
+            title="Recent Backglasses",
+            sort=sort
+        )
 
 
 @backglass_widget_bp.get("/images")
@@ -122,26 +74,40 @@ def backglass_image_row():
     """HTML card with a row of clickable backglass images."""
     limit = get_int("limit", 10, 1, 100)
     theme = get_str("theme", "light")
-    features = get_csv_list("feature")
+    query = GameQuery.from_request()
     sort = _norm_sort(get_str("sort", None))
 
-    repo = GameRepository.from_flask_app()
-    games = repo.list_games()
-
-    bgs = (
-        Game.backglasses_by_features(games, features, limit=limit, sort=sort)  # type: ignore[arg-type]
-        if features
-        else Game.most_recent_backglasses(games, limit=limit, sort=sort)  # type: ignore[arg-type]
-    )
+    snapshot = GameRepository.from_flask_app().snapshot()
+    with timed("filter"):
+        bgs = snapshot.index.backglasses(query, limit=limit, sort=sort)  # type: ignore[arg-type]
 
-    rows = [r for r in _rows_from_backglasses(bgs) if r.get("imgUrl")]
+    rows = [r for r in _rows_from_backglasses(snapshot, bgs) if r.get("imgUrl")]
     show_header, show_footer = _layout_flags()
-    return render_template(
-        "backglasses_images.html",  # whatever your template is
-        show_header=show_header,
-        show_footer=show_footer,
-        theme=theme,
-        rows=rows,
-        title="Recent Backglasses",
-        sort=sort
-    )
+    with timed("render"):
+        return render_template(
+            "backglasses_images.html",  # whatever your template is
+            show_header=show_header,
+            show_footer=show_footer,
+            theme=theme,
+            rows=rows,
+            title="Recent Backglasses",
+            sort=sort
+        )
+
+
+@backglass_widget_bp.get("/rows")
+def backglass_rows():
+    _sync_data()
+    """Compact JSON rows for the client-side rendered widget (static/js/widgets.js)."""
+    limit = get_int("limit", 10, 1, 100)
+    query = GameQuery.from_request()
+    sort = _norm_sort(get_str("sort", None))
+
+    snapshot = GameRepository.from_flask_app().snapshot()
+
+    def build_rows() -> List[dict]:
+        with timed("filter"):
+            bgs = snapshot.index.backglasses(query, limit=limit, sort=sort)  # type: ignore[arg-type]
+        return _rows_from_backglasses(snapshot, bgs)
+
+    return rows_response(snapshot, "Recent Backglasses", sort, build_rows)
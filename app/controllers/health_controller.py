@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from flask import Blueprint, jsonify
+import time
+
+from flask import Blueprint, current_app, jsonify
 
 health_bp = Blueprint("health", __name__)
 
@@ -9,3 +11,32 @@ health_bp = Blueprint("health", __name__)
 def health():
     """Health check endpoint used by docker healthchecks and monitoring."""
     return jsonify({"status": "ok"})
+
+
+@health_bp.get("/ready")
+def ready():
+    """Readiness check: 200 once a snapshot is loaded, 503 before that."""
+    snapshot = current_app.extensions["vpsdb_snapshots"].peek()
+    sync = current_app.extensions["vpsdb_sync"]
+
+    payload = {
+        "ready": snapshot is not None,
+        "snapshot": {"loaded": snapshot is not None},
+        "sync": sync.state.to_dict(),
+    }
+    leadership = current_app.extensions.get("vpsdb_leadership")
+    if leadership is not None:
+        payload["sync"]["leadership"] = leadership.stats()
+    watcher = current_app.extensions.get("vpsdb_watcher")
+    if watcher is not None:
+        payload["watch"] = watcher.state.to_dict()
+    if snapshot is not None:
+        payload["snapshot"].update(
+            {
+                "timestamp": snapshot.timestamp,
+                "builtAt": snapshot.built_at,
+                "ageSeconds": round(time.time() - snapshot.built_at, 3),
+                "games": snapshot.game_count,
+            }
+        )
+    return jsonify(payload), 200 if snapshot is not None else 503
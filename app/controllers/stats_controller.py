@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from flask import Blueprint, current_app, jsonify
+
+stats_bp = Blueprint("stats", __name__)
+
+
+@stats_bp.get("/ratelimit")
+def rate_limit_stats():
+    """Rate limiter budgets and allowed/limited counters for this worker."""
+    limiter = current_app.extensions.get("rate_limiter")
+    if limiter is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **limiter.stats()})
+
+
+@stats_bp.get("/coalescing")
+def coalescing_stats():
+    """Request coalescing counters for this worker."""
+    coalescer = current_app.extensions.get("request_coalescer")
+    if coalescer is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **coalescer.stats()})
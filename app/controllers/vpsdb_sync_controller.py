@@ -17,15 +17,24 @@ def sync_status():
     # Remote timestamp call is the same one used to decide whether to download.
     remote_ts = svc._client.fetch_remote_timestamp()  # intentionally internal; kept in one place
 
-    return jsonify({"localTimestamp": local_ts, "remoteTimestamp": remote_ts})
+    return jsonify({"localTimestamp": local_ts, "remoteTimestamp": remote_ts, "mirrors": svc._client.mirror_stats()})
 
 
 @vpsdb_sync_bp.post("/sync")
 def sync_now():
-    """Manual sync: download the DB only if the remote timestamp is newer."""
+    """Manual sync: download the DB only if the remote timestamp is newer.
+
+    With sync leadership, only the lease holder syncs; followers answer 409.
+    """
+    leadership = current_app.extensions.get("vpsdb_leadership")
+    if leadership is not None and not leadership.is_leader:
+        lease = leadership.stats()["lease"] or {}
+        return jsonify({"error": "this process is not the sync leader", "leader": lease.get("holder")}), 409
     settings = current_app.config["SETTINGS"]
     svc = VpsDbSyncService(settings)
     result = svc.sync_if_needed()
+    if result.updated:
+        current_app.extensions["vpsdb_snapshots"].refresh()
     return jsonify(
         {
             "updated": result.updated,
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import warnings
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Iterable, List, Literal, Sequence
@@ -12,6 +13,14 @@ from app.utils.dates import dt_to_iso
 SortField = Literal["createdAt", "updatedAt"]
 
 
+def _deprecated(name: str) -> None:
+    warnings.warn(
+        f"Game.{name} is deprecated; query the snapshot's GameIndex (snapshot.index) instead",
+        DeprecationWarning,
+        stacklevel=3,
+    )
+
+
 @dataclass
 class Game(BaseModel):
     """Root model representing a pinball game entry."""
@@ -25,11 +34,12 @@ class Game(BaseModel):
     tableFiles: List[GameTable] = field(default_factory=list)
     b2sFiles: List[GameBackGlass] = field(default_factory=list)
 
-    # ---------- Query helpers (static) ----------
+    # ---------- Query helpers (static, deprecated: use `GameIndex`) ----------
 
     @staticmethod
     def most_recent_games(games: Iterable["Game"], limit: int = 10, sort: SortField = "createdAt") -> List["Game"]:
         """Return the most recently created/updated games."""
+        _deprecated("most_recent_games")
         from app.utils.comparators import sort_games_by_created_at, sort_games_by_updated_at
 
         sorter = sort_games_by_created_at if sort == "createdAt" else sort_games_by_updated_at
@@ -38,6 +48,7 @@ class Game(BaseModel):
     @staticmethod
     def most_recent_tables(games: Iterable["Game"], limit: int = 10, sort: SortField = "createdAt") -> List[GameTable]:
         """Return the most recently created/updated tables across all games."""
+        _deprecated("most_recent_tables")
         from app.utils.comparators import sort_tables_by_created_at, sort_tables_by_updated_at
 
         tables: List[GameTable] = []
@@ -52,13 +63,14 @@ class Game(BaseModel):
         games: Iterable["Game"], limit: int = 10, sort: SortField = "updatedAt"
     ) -> List[GameBackGlass]:
         """Return the most recently created/updated backglasses across all games."""
+        _deprecated("most_recent_backglasses")
         from app.utils.comparators import sort_backglasses_by_created_at, sort_backglasses_by_updated_at
 
         bgs: List[GameBackGlass] = []
         for g in games:
             bgs.extend(g.b2sFiles)
 
-        sorter = sort_backglasses_by_created_at if sort == "updatedAt" else sort_backglasses_by_updated_at
+        sorter = sort_backglasses_by_created_at if sort == "createdAt" else sort_backglasses_by_updated_at
         return sorter(bgs)[:limit]
 
     @staticmethod
@@ -69,6 +81,7 @@ class Game(BaseModel):
         sort: SortField = "createdAt",
     ) -> List[GameTable]:
         """Filter tables by one-or-more formats and return most recently created/updated."""
+        _deprecated("tables_by_formats")
         from app.utils.comparators import sort_tables_by_created_at, sort_tables_by_updated_at
 
         wanted = {(f or "").strip().lower() for f in (table_formats or []) if (f or "").strip()}
@@ -93,6 +106,7 @@ class Game(BaseModel):
         sort: SortField = "createdAt",
     ) -> List[GameBackGlass]:
         """Filter backglasses by one-or-more features and return most recently created/updated."""
+        _deprecated("backglasses_by_features")
         from app.utils.comparators import sort_backglasses_by_created_at, sort_backglasses_by_updated_at
 
         wanted = {(f or "").strip().lower() for f in (features or []) if (f or "").strip()}
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List
+from typing import Callable, List
 
 from app.models.base_model import BaseModel
-from app.models.game_item_url import GameItemUrl
+from app.models.game_item_url import GameItemUrl, pick_best_url
 from app.utils.dates import dt_to_iso
 
 
@@ -33,13 +33,9 @@ class GameBackGlass(BaseModel):
         priority = len(self.urls) + 1
         self.urls.append(GameItemUrl(url=url, broken=broken, priority=priority))
 
-    def best_url(self) -> str | None:
-        """Return the highest-priority non-broken URL, falling back to first."""
-        candidates = sorted(self.urls, key=lambda u: u.priority)
-        for u in candidates:
-            if not u.broken and u.url:
-                return u.url
-        return candidates[0].url if candidates else None
+    def best_url(self, is_dead: Callable[[str], bool] | None = None) -> str | None:
+        """Return the highest-priority non-broken (and not dead) URL, falling back to first."""
+        return pick_best_url(self.urls, is_dead)
 
     def has_feature(self, feature: str) -> bool:
         """Case-insensitive feature match."""
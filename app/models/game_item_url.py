@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from typing import Callable, Iterable
 
 from app.models.base_model import BaseModel
 
@@ -16,3 +17,25 @@ class GameItemUrl(BaseModel):
     def to_dict(self) -> dict:
         """Serialize to JSON-friendly dict."""
         return {"url": self.url, "broken": self.broken, "priority": self.priority}
+
+
+def pick_best_url(urls: Iterable[GameItemUrl], is_dead: Callable[[str], bool] | None = None) -> str | None:
+    """Return the highest-priority usable URL in one pass (no sorting).
+
+    Preference: not flagged broken upstream and not seen dead by the link
+    checker, then not flagged broken, then simply the highest priority.
+    """
+    best = usable = first = None
+    for u in urls:
+        if first is None or u.priority < first.priority:
+            first = u
+        if u.broken or not u.url:
+            continue
+        if usable is None or u.priority < usable.priority:
+            usable = u
+        if is_dead is not None and is_dead(u.url):
+            continue
+        if best is None or u.priority < best.priority:
+            best = u
+    chosen = best or usable or first
+    return chosen.url if chosen else None
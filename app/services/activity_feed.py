@@ -0,0 +1,161 @@
+"""Recent activity: tables and backglasses interleaved by createdAt/updatedAt.
+
+The index already keeps each type presorted, newest first. A page is a lazy
+k-way merge (`heapq.merge`) of one lazy index scan per type, each started at its
+cursor offset, so a request reads only the items it merges (plus one per type)
+and never sorts either collection or re-walks the filter bitmap.
+
+The cursor records the snapshot version, how many items of each type earlier
+pages consumed, the last item's time and the items already served at exactly
+that time. On the same version it resumes exactly; after a data update it
+resumes with the items older than that time plus the unserved ones sharing it.
+"""
+from __future__ import annotations
+
+import base64
+import heapq
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, FrozenSet, Iterator, List, Sequence, Tuple
+
+from app.models.game import SortField
+from app.services.game_index import GameQuery
+from app.utils.comparators import _dt_or_min_utc
+from app.utils.dates import dt_to_iso
+
+KINDS = ("table", "backglass")
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a cursor that cannot be decoded or was issued for another sort."""
+
+
+def _epoch_ms(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+@dataclass(frozen=True)
+class ActivityCursor:
+    """Where the next page starts: per-type offsets into `version`, plus the last item's time.
+
+    `served_at_last` holds `"<kind>:<id>"` of every item served at exactly `last_ms`.
+    """
+
+    version: int
+    sort: SortField
+    offsets: Dict[str, int]
+    last_ms: int
+    served_at_last: FrozenSet[str] = field(default_factory=frozenset)
+
+    def encode(self) -> str:
+        payload = {
+            "v": self.version,
+            "s": self.sort,
+            "o": [self.offsets.get(k, 0) for k in KINDS],
+            "k": self.last_ms,
+            "e": sorted(self.served_at_last),
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, raw: str, sort: SortField) -> "ActivityCursor":
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4)))
+            cursor = cls(
+                version=int(payload["v"]),
+                sort=payload["s"],
+                offsets={k: max(0, int(n)) for k, n in zip(KINDS, payload["o"])},
+                last_ms=int(payload["k"]),
+                served_at_last=frozenset(str(key) for key in payload.get("e", [])),
+            )
+        except (ValueError, KeyError, TypeError):
+            raise InvalidCursorError("Invalid cursor") from None
+        if cursor.sort != sort:
+            raise InvalidCursorError(f"Cursor was issued for sort={cursor.sort}")
+        return cursor
+
+
+@dataclass(frozen=True)
+class ActivityItem:
+    """One table or backglass in the feed."""
+
+    kind: str
+    at: datetime
+    item: Any
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "at": dt_to_iso(self.at), self.kind: self.item.to_dict()}
+
+
+@dataclass(frozen=True)
+class ActivityPage:
+    items: List[ActivityItem]
+    next_cursor: ActivityCursor | None
+
+
+def _scan(index: Any, kind: str, query: GameQuery, sort: SortField, offset: int) -> Iterator[Any]:
+    scan = index.iter_tables if kind == "table" else index.iter_backglasses
+    return scan(query, sort=sort, offset=offset)
+
+
+def _item_key(kind: str, item: Any) -> str:
+    return f"{kind}:{getattr(item, 'id', '')}"
+
+
+def activity_page(
+    index: Any,
+    version: int,
+    query: GameQuery,
+    sort: SortField = "updatedAt",
+    limit: int = 20,
+    kinds: Sequence[str] = KINDS,
+    cursor: ActivityCursor | None = None,
+) -> ActivityPage:
+    """Return the next `limit` items of the merged feed and the cursor after them."""
+    resume_exact = cursor is None or cursor.version == version
+    start = dict(cursor.offsets) if cursor is not None and resume_exact else {k: 0 for k in KINDS}
+    # Position (in its type's sequence) of the next item each type would serve.
+    next_offsets = dict(start)
+
+    def at(item: Any) -> datetime:
+        return _dt_or_min_utc(getattr(item, sort, None))
+
+    def tagged(kind: str) -> Iterator[Tuple[datetime, str, int, Any]]:
+        pos = start.get(kind, 0)
+        # After a data update, skip the items newer than the last one served and
+        # those served at its exact time; unserved items sharing that time remain.
+        skipping = not resume_exact
+        for it in _scan(index, kind, query, sort, pos):
+            when = at(it)
+            if skipping:
+                ms = _epoch_ms(when)
+                if ms > cursor.last_ms or (ms == cursor.last_ms and _item_key(kind, it) in cursor.served_at_last):
+                    pos += 1
+                    next_offsets[kind] = pos
+                    continue
+                skipping = ms == cursor.last_ms
+            yield when, kind, pos, it
+            pos += 1
+
+    # Newest first; equal times keep KINDS order (tables before backglasses).
+    merged = heapq.merge(*(tagged(k) for k in KINDS if k in kinds), key=lambda row: row[0], reverse=True)
+    rows = list(islice(merged, limit + 1))
+
+    page = rows[:limit]
+    for _, kind, pos, _ in page:
+        next_offsets[kind] = pos + 1
+    items = [ActivityItem(kind=kind, at=when, item=it) for when, kind, _, it in page]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last_ms = _epoch_ms(page[-1][0])
+        served = {_item_key(kind, it) for when, kind, _, it in page if _epoch_ms(when) == last_ms}
+        if cursor is not None and cursor.last_ms == last_ms:
+            served |= cursor.served_at_last
+        next_cursor = ActivityCursor(
+            version=version, sort=sort, offsets=next_offsets, last_ms=last_ms, served_at_last=frozenset(served)
+        )
+    return ActivityPage(items=items, next_cursor=next_cursor)
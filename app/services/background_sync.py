@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from app.configs.settings import Settings
+from app.services.game_snapshot import SnapshotProvider, SnapshotUnavailableError
+from app.services.vpsdb_sync_service import SyncResult, VpsDbSyncService
+
+if TYPE_CHECKING:
+    from app.services.sync_leader import SyncLeadership
+
+
+@dataclass
+class SyncState:
+    """Observable state of the background sync."""
+
+    running: bool = False
+    last_started_at: float | None = None
+    last_finished_at: float | None = None
+    last_error: str | None = None
+    last_result: SyncResult | None = None
+
+    def to_dict(self) -> dict:
+        """Serialize to JSON-friendly dict."""
+        if self.running:
+            state = "running"
+        elif self.last_finished_at is None:
+            state = "pending"
+        else:
+            state = "failed" if self.last_error else "ok"
+        return {
+            "state": state,
+            "lastStartedAt": self.last_started_at,
+            "lastFinishedAt": self.last_finished_at,
+            "lastError": self.last_error,
+            "updated": self.last_result.updated if self.last_result else None,
+            "localTimestamp": self.last_result.local_timestamp if self.last_result else None,
+            "remoteTimestamp": self.last_result.remote_timestamp if self.last_result else None,
+        }
+
+
+class BackgroundSync:
+    """Runs upstream syncs off the request path, at most one at a time.
+
+    Requests call `trigger()`, which returns immediately; new data is swapped
+    into the snapshot provider from the sync thread.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        provider: SnapshotProvider,
+        service: VpsDbSyncService | None = None,
+        leadership: SyncLeadership | None = None,
+    ):
+        self._settings = settings
+        self._provider = provider
+        self._service = service or VpsDbSyncService(settings)
+        self._leadership = leadership
+        self._lock = threading.Lock()
+        self.state = SyncState()
+
+    def boot(self) -> None:
+        """Load any local copy and run the first sync, without blocking the caller."""
+        threading.Thread(target=self._boot, name="vpsdb-boot", daemon=True).start()
+
+    def _boot(self) -> None:
+        try:
+            self._provider.current()
+        except SnapshotUnavailableError:
+            pass
+        except Exception as e:
+            print(f"Failed to load local VPSDB copy: {e}")
+
+        if not self._may_sync():
+            # Another process (the sync sidecar or leader) keeps the local copy fresh.
+            return
+        if self._settings.SYNC_ON_START or self._provider.peek() is None:
+            if self._claim(force=True):
+                self._run()
+
+    def trigger(self, force: bool = False) -> bool:
+        """Start a sync in the background unless one ran recently; return True if started."""
+        if not self._may_sync() or not self._claim(force):
+            return False
+        threading.Thread(target=self._run, name="vpsdb-sync", daemon=True).start()
+        return True
+
+    def _may_sync(self) -> bool:
+        """Upstream syncs are enabled and, with leadership, this process holds the lease."""
+        if not self._settings.UPSTREAM_SYNC_ENABLED:
+            return False
+        return self._leadership is None or self._leadership.is_leader
+
+    def _claim(self, force: bool) -> bool:
+        with self._lock:
+            if self.state.running:
+                return False
+            last = self.state.last_started_at
+            if not force and last is not None and time.time() - last < self._settings.SYNC_MIN_INTERVAL_SECONDS:
+                return False
+            self.state.running = True
+            self.state.last_started_at = time.time()
+            return True
+
+    def _run(self) -> None:
+        try:
+            result = self._service.sync_if_needed()
+            if result.updated or self._provider.peek() is None:
+                self._provider.refresh()
+            self.state.last_result = result
+            self.state.last_error = None
+        except Exception as e:
+            self.state.last_error = str(e) or e.__class__.__name__
+        finally:
+            self.state.last_finished_at = time.time()
+            self.state.running = False
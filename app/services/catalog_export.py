@@ -0,0 +1,141 @@
+"""Streaming NDJSON/CSV export of the catalog.
+
+Items are pulled from the snapshot index one page at a time and written out as
+they are encoded, so memory stays flat no matter how large the catalog is.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Literal, Sequence
+
+from app.models.game import Game
+from app.models.game_back_glass import GameBackGlass
+from app.models.game_table import GameTable
+from app.services.game_index import GameQuery
+from app.utils.dates import dt_to_iso
+
+ExportKind = Literal["games", "tables", "backglasses"]
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_KINDS: tuple[str, ...] = ("games", "tables", "backglasses")
+MIMETYPES: Dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Items fetched from the index per page (and encoded per emitted chunk).
+PAGE_SIZE = 500
+
+
+def _join(values: Sequence[str] | None) -> str:
+    return "; ".join(v for v in (values or []) if v)
+
+
+def _game_row(g: Game, is_dead: Callable[[str], bool] | None = None) -> Dict[str, Any]:
+    return {
+        "id": g.id,
+        "name": g.name,
+        "manufacturer": g.manufacturer,
+        "year": g.year,
+        "createdAt": dt_to_iso(g.createdAt),
+        "updatedAt": dt_to_iso(g.updatedAt),
+        "tableCount": len(g.tableFiles),
+        "backglassCount": len(g.b2sFiles),
+    }
+
+
+def _table_row(t: GameTable, is_dead: Callable[[str], bool] | None = None) -> Dict[str, Any]:
+    return {
+        "id": t.id,
+        "gameId": t.gameId,
+        "gameName": t.gameName,
+        "gameManufacturer": t.gameManufacturer,
+        "gameYear": t.gameYear,
+        "version": t.version,
+        "tableFormat": t.tableFormat,
+        "authors": _join(t.authors),
+        "imgUrl": t.imgUrl,
+        "url": t.best_url(is_dead),
+        "createdAt": dt_to_iso(t.createdAt),
+        "updatedAt": dt_to_iso(t.updatedAt),
+    }
+
+
+def _backglass_row(b: GameBackGlass, is_dead: Callable[[str], bool] | None = None) -> Dict[str, Any]:
+    return {
+        "id": b.id,
+        "gameId": b.gameId,
+        "gameName": b.gameName,
+        "gameManufacturer": b.gameManufacturer,
+        "gameYear": b.gameYear,
+        "version": b.version,
+        "features": _join(b.features),
+        "authors": _join(b.authors),
+        "imgUrl": b.imgUrl,
+        "url": b.best_url(is_dead),
+        "createdAt": dt_to_iso(b.createdAt),
+        "updatedAt": dt_to_iso(b.updatedAt),
+    }
+
+
+# CSV rows are flat; NDJSON lines use the same shape as the listing endpoints.
+_CSV_ROWS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "games": _game_row,
+    "tables": _table_row,
+    "backglasses": _backglass_row,
+}
+
+
+def iter_items(index: Any, kind: ExportKind, query: GameQuery, page_size: int = PAGE_SIZE) -> Iterator[List[Any]]:
+    """Yield pages of matching items, newest first (same order as the listings).
+
+    The index is scanned once; pages are cut from that single pass rather than
+    re-running the query at growing offsets.
+    """
+    if kind == "games":
+        items = index.iter_games(query, sort="updatedAt")
+    elif kind == "tables":
+        items = index.iter_tables(query, sort="createdAt")
+    else:
+        items = index.iter_backglasses(query, sort="createdAt")
+
+    while True:
+        page = list(islice(items, page_size))
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+
+
+def _csv_header(kind: ExportKind) -> List[str]:
+    blank = {"games": Game, "tables": GameTable, "backglasses": GameBackGlass}[kind](id="")
+    return list(_CSV_ROWS[kind](blank))
+
+
+def stream_export(
+    index: Any,
+    kind: ExportKind,
+    query: GameQuery,
+    fmt: ExportFormat,
+    is_dead: Callable[[str], bool] | None = None,
+) -> Iterator[str]:
+    """Yield the encoded export one page-sized chunk at a time."""
+    if fmt == "csv":
+        to_row = _CSV_ROWS[kind]
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=_csv_header(kind), lineterminator="\n")
+        writer.writeheader()
+        for page in iter_items(index, kind, query):
+            writer.writerows(to_row(item, is_dead) for item in page)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue()
+        return
+
+    for page in iter_items(index, kind, query):
+        yield "".join(json.dumps(item.to_dict(), separators=(",", ":")) + "\n" for item in page)
@@ -0,0 +1,247 @@
+"""Append-only log of what each sync changed.
+
+After a sync downloads a new version, every game, table and backglass record
+is fingerprinted and compared with the fingerprints of the previous version.
+One compact NDJSON line per sync is appended to `CHANGELOG_DIR/changes.ndjson`:
+
+    {"v": <lastUpdated>, "prev": <lastUpdated|null>, "at": <unix time>,
+     "c": [["t", "a", "<table id>", "<game id>"], ...]}
+
+with kinds `g | t | b` and operations `a` (added), `u` (updated), `r` (removed).
+The first line of a new log (`prev: null`) is the baseline and lists nothing.
+
+The log keeps the newest `max(CHANGELOG_VERSIONS, HISTORY_VERSIONS)` lines, so
+it reaches back at least as far as any version `asOf` can serve; older lines
+are dropped when a sync appends past that. Readers keep an in-memory index of
+each line's version and byte offset, extended from the last indexed offset as
+lines are appended, and parse only the lines a request needs.
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import IO, Any, Dict, List, Tuple
+
+from app.configs.settings import Settings
+from app.services.vpsdb_mapper import VpsDbMapper
+from app.utils.dates import epoch_to_dt
+
+KINDS: Dict[str, str] = {"g": "games", "t": "tables", "b": "backglasses"}
+_OPS: Dict[str, str] = {"a": "added", "u": "updated", "r": "removed"}
+
+# key "<kind>:<id>" -> (fingerprint, game id)
+Fingerprints = Dict[str, Tuple[str, str]]
+
+
+def _digest(record: Dict[str, Any]) -> str:
+    body = json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def fingerprint(items: List[Dict[str, Any]]) -> Fingerprints:
+    """Fingerprint games (without their children), tables and backglasses separately."""
+    out: Fingerprints = {}
+    for it in items:
+        gid = str(it.get("id") or "")
+        if not gid:
+            continue
+        out[f"g:{gid}"] = (_digest({k: v for k, v in it.items() if k not in ("tableFiles", "b2sFiles")}), gid)
+        for kind, key in (("t", "tableFiles"), ("b", "b2sFiles")):
+            for child in it.get(key) or []:
+                if isinstance(child, dict) and child.get("id"):
+                    out[f"{kind}:{child['id']}"] = (_digest(child), gid)
+    return out
+
+
+def diff(old: Fingerprints, new: Fingerprints) -> List[List[str]]:
+    """Return `[kind, op, id, game id]` rows turning `old` into `new`."""
+    rows: List[List[str]] = []
+    for key, (h, gid) in new.items():
+        prev = old.get(key)
+        if prev is None or prev[0] != h:
+            kind, _, item_id = key.partition(":")
+            rows.append([kind, "a" if prev is None else "u", item_id, gid])
+    for key, (_, gid) in old.items():
+        if key not in new:
+            kind, _, item_id = key.partition(":")
+            rows.append([kind, "r", item_id, gid])
+    return rows
+
+
+@dataclass
+class ChangeSet:
+    """Net changes since a point in time (ids per kind and operation)."""
+
+    since: datetime
+    version: int | None
+    complete: bool
+    changes: Dict[str, Dict[str, Dict[str, str]]] = field(
+        default_factory=lambda: {kind: {op: {} for op in _OPS.values()} for kind in KINDS.values()}
+    )
+
+
+class ChangeLog:
+    """Writes per-sync diffs and answers "what changed since" from them."""
+
+    def __init__(self, settings: Settings):
+        self._settings = settings
+        self._dir = settings.CHANGELOG_DIR
+        self._log_path = os.path.join(self._dir, "changes.ndjson")
+        self._fp_path = os.path.join(self._dir, "fingerprints.json")
+        self._mapper = VpsDbMapper()
+        self._last_version: int | None = None
+        # Offset index of the log file identified by `_index_file` (device, inode).
+        self._index_lock = threading.Lock()
+        self._index_file: Tuple[int, int] | None = None
+        self._index_end = 0
+        self._index_versions: List[int] = []
+        self._index_offsets: List[int] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self._settings.CHANGELOG_ENABLED
+
+    @property
+    def retention(self) -> int:
+        """Log lines kept: enough to answer `since` for every version history can serve."""
+        return max(self._settings.CHANGELOG_VERSIONS, self._settings.HISTORY_VERSIONS)
+
+    # ---------- Writing (sync side) ----------
+
+    def has_version(self, timestamp: int) -> bool:
+        """True when the log already covers `timestamp` (or a newer version)."""
+        if self._last_version is None:
+            self._last_version = self._read_fingerprints()[0]
+        return self._last_version is not None and self._last_version >= timestamp
+
+    def record(self, raw: Any, timestamp: int) -> None:
+        """Append the diff between the last recorded version and `raw` (version `timestamp`)."""
+        import fcntl
+
+        items = [it for chunk in self._mapper.partition(raw, 1) for it in chunk]
+        new = fingerprint(items)
+        os.makedirs(self._dir, exist_ok=True)
+        with open(os.path.join(self._dir, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            prev_version, old = self._read_fingerprints()
+            if prev_version is not None and prev_version >= timestamp:
+                self._last_version = prev_version
+                return
+            rows = diff(old, new) if prev_version is not None else []
+            line = {"v": int(timestamp), "prev": prev_version, "at": round(time.time(), 3), "c": rows}
+            with open(self._log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(line, separators=(",", ":")) + "\n")
+            self._compact()
+
+            tmp_path = f"{self._fp_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": int(timestamp), "items": new}, f, separators=(",", ":"))
+            os.replace(tmp_path, self._fp_path)
+            self._last_version = int(timestamp)
+        print(f"Change log: version {timestamp} ({len(rows)} changes since {prev_version})")
+
+    def _compact(self) -> None:
+        """Drop the oldest lines beyond `retention` (caller holds the directory lock)."""
+        with open(self._log_path, "rb") as f:
+            lines = f.readlines()
+        if len(lines) <= self.retention:
+            return
+        tmp_path = f"{self._log_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.writelines(lines[-self.retention :])
+        # A new file: readers see the inode change and rebuild their index.
+        os.replace(tmp_path, self._log_path)
+        print(f"Change log: dropped {len(lines) - self.retention} old version(s)")
+
+    def _read_fingerprints(self) -> Tuple[int | None, Fingerprints]:
+        try:
+            with open(self._fp_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None, {}
+        return int(payload["version"]), {k: (v[0], v[1]) for k, v in payload["items"].items()}
+
+    # ---------- Reading (request side) ----------
+
+    @property
+    def indexed_entry_count(self) -> int:
+        """Log lines in the in-memory offset index."""
+        return len(self._index_versions)
+
+    def _update_index(self, f: IO[bytes]) -> None:
+        """Index lines appended to `f` since the last call (all of them for a new file)."""
+        st = os.fstat(f.fileno())
+        ident = (st.st_dev, st.st_ino)
+        if ident != self._index_file or st.st_size < self._index_end:
+            self._index_file, self._index_end = ident, 0
+            self._index_versions, self._index_offsets = [], []
+        if st.st_size == self._index_end:
+            return
+        f.seek(self._index_end)
+        offset = self._index_end
+        for line in f:
+            # A line being appended right now may be partial; it is picked up next time.
+            if not line.endswith(b"\n"):
+                break
+            self._index_versions.append(int(json.loads(line)["v"]))
+            self._index_offsets.append(offset)
+            offset += len(line)
+        self._index_end = offset
+
+    def entries(self, since: datetime | None = None, up_to: int | None = None) -> Tuple[List[int], List[dict]]:
+        """Return the logged versions up to `up_to` and the lines among them published after `since`.
+
+        Only those lines are read and parsed; the offset index skips the rest.
+        """
+        try:
+            f = open(self._log_path, "rb")
+        except FileNotFoundError:
+            return [], []
+        with f, self._index_lock:
+            self._update_index(f)
+            versions, offsets = self._index_versions, self._index_offsets
+            hi = len(versions) if up_to is None else bisect.bisect_right(versions, up_to)
+            lo = 0
+            if since is not None:
+                lo = bisect.bisect_right(versions, since, hi=hi, key=lambda v: epoch_to_dt(v) or since)
+            lines: List[dict] = []
+            if lo < hi:
+                f.seek(offsets[lo])
+                lines = [json.loads(f.readline()) for _ in range(hi - lo)]
+            return versions[:hi], lines
+
+    def since(self, since: datetime, up_to: int | None = None) -> ChangeSet:
+        """Net changes after `since`, up to version `up_to` (the served snapshot).
+
+        `complete` is False when the log starts after `since`; the caller must
+        then refetch everything instead of applying the changes.
+        """
+        versions, entries = self.entries(since, up_to)
+        start = epoch_to_dt(versions[0]) if versions else None
+        result = ChangeSet(
+            since=since,
+            version=versions[-1] if versions else None,
+            complete=start is not None and start <= since,
+        )
+
+        # First and last operation per entity decide the net effect.
+        net: Dict[Tuple[str, str], Tuple[str, str, str]] = {}
+        for e in entries:
+            for kind, op, item_id, gid in e["c"]:
+                first = net.get((kind, item_id), (op, op, gid))[0]
+                net[(kind, item_id)] = (first, op, gid)
+
+        for (kind, item_id), (first, last, gid) in net.items():
+            if last == "r":
+                op = None if first == "a" else "r"
+            else:
+                op = "a" if first == "a" else "u"
+            if op is not None:
+                result.changes[KINDS[kind]][_OPS[op]][item_id] = gid
+        return result
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from app.models.game import Game
+from app.models.game_back_glass import GameBackGlass
+from app.models.game_table import GameTable
+from app.utils.strings import norm_key
+
+FACET_NAMES: Tuple[str, ...] = ("manufacturer", "year", "decade", "format", "feature", "author")
+
+
+@dataclass
+class _Counter:
+    """Case-insensitive counter that remembers the first-seen display spelling."""
+
+    counts: Dict[str, int] = field(default_factory=dict)
+    labels: Dict[str, object] = field(default_factory=dict)
+
+    def add(self, value: object) -> None:
+        key = norm_key(value)
+        if not key:
+            return
+        if key not in self.counts:
+            self.counts[key] = 0
+            self.labels[key] = value.strip() if isinstance(value, str) else value
+        self.counts[key] += 1
+
+    def ranked(self) -> List[Tuple[object, int]]:
+        """Return (value, count) pairs sorted by count desc, then value."""
+        keys = sorted(self.counts, key=lambda k: (-self.counts[k], k))
+        return [(self.labels[k], self.counts[k]) for k in keys]
+
+
+@dataclass(frozen=True)
+class GameFacets:
+    """Ranked facet counts for one set of games; built once and sliced per request."""
+
+    totals: Dict[str, int]
+    ranked: Dict[str, List[Tuple[object, int]]]
+
+    @classmethod
+    def build(
+        cls,
+        games: Iterable[Game],
+        tables: Iterable[GameTable],
+        backglasses: Iterable[GameBackGlass],
+    ) -> "GameFacets":
+        """Count every facet dimension in a single pass over each entity type.
+
+        Game facets (manufacturer/year/decade) count games, `format` counts tables,
+        `feature` counts backglasses and `author` counts both.
+        """
+        counters = {name: _Counter() for name in FACET_NAMES}
+        totals = {"games": 0, "tables": 0, "backglasses": 0}
+
+        for g in games:
+            totals["games"] += 1
+            counters["manufacturer"].add(g.manufacturer)
+            if g.year is not None:
+                counters["year"].add(g.year)
+                counters["decade"].add(f"{g.year // 10 * 10}s")
+
+        for t in tables:
+            totals["tables"] += 1
+            counters["format"].add(t.tableFormat)
+            for a in t.authors:
+                counters["author"].add(a)
+
+        for b in backglasses:
+            totals["backglasses"] += 1
+            for x in b.features:
+                counters["feature"].add(x)
+            for a in b.authors:
+                counters["author"].add(a)
+
+        return cls(totals=totals, ranked={name: c.ranked() for name, c in counters.items()})
+
+    def top(self, names: Sequence[str] | None = None, limit: int = 10) -> Dict[str, List[dict]]:
+        """Return the top-N values for the requested facets."""
+        selected = [n for n in (names or FACET_NAMES) if n in self.ranked]
+        return {n: [{"value": v, "count": c} for v, c in self.ranked[n][:limit]] for n in selected}
@@ -0,0 +1,175 @@
+"""Sparse fieldsets and child inclusion for `/api/games`.
+
+- `fields=id,name,updatedAt,tableFiles.version,tableFiles.urls` lists the game
+  fields to return and, with a `tableFiles.`/`b2sFiles.` prefix, child fields
+  (a bare `tableFiles` means all of its fields).
+- `include=tableFiles,b2sFiles` selects which children are serialized
+  (`include=` with no value drops both).
+- `tableFilesLimit` / `b2sFilesLimit` keep the N most recently updated children.
+
+Without any of these every field is serialized, as `Game.to_dict()` does.
+Only the selected fields are computed (no date formatting or URL lists for
+fields nobody asked for).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from flask import request
+
+from app.models.game import Game
+from app.utils.comparators import sort_backglasses_by_updated_at, sort_tables_by_updated_at
+from app.utils.dates import dt_to_iso
+
+Getter = Callable[[Any], Any]
+
+CHILDREN = ("tableFiles", "b2sFiles")
+
+
+class InvalidFieldsError(ValueError):
+    """Raised for unknown names in `fields`/`include` or a bad per-child limit."""
+
+
+def _parent(item: Any) -> dict:
+    return {"id": item.gameId, "name": item.gameName, "manufacturer": item.gameManufacturer, "year": item.gameYear}
+
+
+_GAME_FIELDS: Dict[str, Getter] = {
+    "id": lambda g: g.id,
+    "name": lambda g: g.name,
+    "manufacturer": lambda g: g.manufacturer,
+    "year": lambda g: g.year,
+    "createdAt": lambda g: dt_to_iso(g.createdAt),
+    "updatedAt": lambda g: dt_to_iso(g.updatedAt),
+}
+
+_TABLE_FIELDS: Dict[str, Getter] = {
+    "id": lambda t: t.id,
+    "version": lambda t: t.version,
+    "tableFormat": lambda t: t.tableFormat,
+    "authors": lambda t: t.authors,
+    "imgUrl": lambda t: t.imgUrl,
+    "urls": lambda t: [u.to_dict() for u in t.urls],
+    "createdAt": lambda t: dt_to_iso(t.createdAt),
+    "updatedAt": lambda t: dt_to_iso(t.updatedAt),
+    "game": _parent,
+}
+
+_BACKGLASS_FIELDS: Dict[str, Getter] = {
+    "id": lambda b: b.id,
+    "version": lambda b: b.version,
+    "authors": lambda b: b.authors,
+    "features": lambda b: b.features,
+    "imgUrl": lambda b: b.imgUrl,
+    "urls": lambda b: [u.to_dict() for u in b.urls],
+    "createdAt": lambda b: dt_to_iso(b.createdAt),
+    "updatedAt": lambda b: dt_to_iso(b.updatedAt),
+    "game": _parent,
+}
+
+_CHILD_FIELDS = {"tableFiles": _TABLE_FIELDS, "b2sFiles": _BACKGLASS_FIELDS}
+_CHILD_SORT = {"tableFiles": sort_tables_by_updated_at, "b2sFiles": sort_backglasses_by_updated_at}
+
+
+def _pick(available: Dict[str, Getter], names: Sequence[str], label: str) -> List[Tuple[str, Getter]]:
+    by_lower = {k.lower(): k for k in available}
+    out: List[Tuple[str, Getter]] = []
+    for name in names:
+        key = by_lower.get(name.lower())
+        if key is None:
+            raise InvalidFieldsError(f"Unknown {label} field '{name}' (expected one of: {', '.join(available)})")
+        if all(k != key for k, _ in out):
+            out.append((key, available[key]))
+    return out
+
+
+def _split(raw: str) -> List[str]:
+    return [p.strip() for p in raw.split(",") if p.strip()]
+
+
+@dataclass(frozen=True)
+class ChildSelection:
+    """Serialized fields and optional count limit for one child list."""
+
+    fields: Tuple[Tuple[str, Getter], ...]
+    limit: int | None
+
+
+@dataclass(frozen=True)
+class GameFieldset:
+    """Which game fields and children to serialize; build once per request, apply per game."""
+
+    game_fields: Tuple[Tuple[str, Getter], ...]
+    children: Dict[str, ChildSelection]
+
+    @classmethod
+    def parse(
+        cls, fields: str | None, include: str | None, limits: Dict[str, str | None] | None = None
+    ) -> "GameFieldset":
+        """Build from raw `fields`, `include` and per-child limit values (None = not given)."""
+        fields = fields if fields and fields.strip() else None
+        game_names: List[str] = []
+        child_names: Dict[str, List[str]] = {c: [] for c in CHILDREN}
+        named_children: List[str] = []
+        for name in _split(fields or ""):
+            head, dot, rest = name.partition(".")
+            child = next((c for c in CHILDREN if c.lower() == head.lower()), None)
+            if child is None:
+                game_names.append(name)
+                continue
+            named_children.append(child)
+            if dot:
+                child_names[child].append(rest)
+
+        if include is not None:
+            included = []
+            for name in _split(include):
+                child = next((c for c in CHILDREN if c.lower() == name.lower()), None)
+                if child is None:
+                    raise InvalidFieldsError(f"Unknown include '{name}' (expected: {', '.join(CHILDREN)})")
+                included.append(child)
+        elif fields is not None:
+            included = named_children
+        else:
+            included = list(CHILDREN)
+
+        children: Dict[str, ChildSelection] = {}
+        for child in CHILDREN:
+            if child not in included:
+                continue
+            names = child_names[child]
+            selected = _pick(_CHILD_FIELDS[child], names, child) if names else list(_CHILD_FIELDS[child].items())
+            children[child] = ChildSelection(tuple(selected), _parse_limit(child, (limits or {}).get(child)))
+
+        game_fields = _pick(_GAME_FIELDS, game_names, "game") if fields is not None else list(_GAME_FIELDS.items())
+        return cls(game_fields=tuple(game_fields), children=children)
+
+    @classmethod
+    def from_request(cls) -> "GameFieldset":
+        return cls.parse(
+            request.args.get("fields"),
+            request.args.get("include"),
+            {c: request.args.get(f"{c}Limit") for c in CHILDREN},
+        )
+
+    def serialize(self, game: Game) -> dict:
+        out = {key: get(game) for key, get in self.game_fields}
+        for child, selection in self.children.items():
+            items = getattr(game, child)
+            if selection.limit is not None and len(items) > selection.limit:
+                items = _CHILD_SORT[child](items)[: selection.limit]
+            out[child] = [{key: get(it) for key, get in selection.fields} for it in items]
+        return out
+
+
+def _parse_limit(child: str, raw: str | None) -> int | None:
+    if raw is None or raw == "":
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        raise InvalidFieldsError(f"{child}Limit must be a non-negative integer") from None
+    if value < 0:
+        raise InvalidFieldsError(f"{child}Limit must be a non-negative integer")
+    return value
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Dict, Generic, Iterable, Iterator, List, Literal, Sequence, Tuple, TypeVar
+
+from app.models.game import Game, SortField
+from app.models.game_back_glass import GameBackGlass
+from app.models.game_item_url import GameItemUrl
+from app.models.game_table import GameTable
+from app.utils.comparators import (
+    sort_backglasses_by_created_at,
+    sort_backglasses_by_updated_at,
+    sort_games_by_created_at,
+    sort_games_by_updated_at,
+    sort_tables_by_created_at,
+    sort_tables_by_updated_at,
+)
+from app.utils.query import get_csv_list, get_optional_int, get_str, parse_bool
+from app.utils.strings import norm_key
+
+T = TypeVar("T")
+MatchMode = Literal["all", "any"]
+
+
+@dataclass(frozen=True)
+class GameQuery:
+    """Filter criteria shared by the listings, widgets and facets.
+
+    Values within one dimension are OR-ed; dimensions are AND-ed (`match="all"`)
+    or OR-ed (`match="any"`). Dimensions that do not apply to an entity type
+    (e.g. `features` for tables) are ignored for that type's listing; facets
+    still apply them through the parent game (see `GameSnapshot.facets_for`).
+    """
+
+    formats: Tuple[str, ...] = ()
+    features: Tuple[str, ...] = ()
+    manufacturers: Tuple[str, ...] = ()
+    authors: Tuple[str, ...] = ()
+    year_from: int | None = None
+    year_to: int | None = None
+    has_url: bool | None = None
+    match: MatchMode = "all"
+
+    @classmethod
+    def from_request(cls) -> "GameQuery":
+        """Build a query from the current request's args."""
+        match = (get_str("match", "all") or "all").strip().lower()
+        return cls(
+            formats=tuple(sorted(get_csv_list("format"))),
+            features=tuple(sorted(get_csv_list("feature"))),
+            manufacturers=tuple(sorted(get_csv_list("manufacturer"))),
+            authors=tuple(sorted(get_csv_list("author"))),
+            year_from=get_optional_int("yearFrom"),
+            year_to=get_optional_int("yearTo"),
+            has_url=parse_bool(get_str("hasUrl", None), default=None),
+            match="any" if match == "any" else "all",
+        )
+
+    def is_empty(self) -> bool:
+        """Return True when no filter is set."""
+        return not (
+            self.formats
+            or self.features
+            or self.manufacturers
+            or self.authors
+            or self.year_from is not None
+            or self.year_to is not None
+            or self.has_url is not None
+        )
+
+
+def _bitmap_from_positions(positions: Sequence[int], size: int) -> int:
+    """Pack item positions into an int bitmap in linear time."""
+    buf = bytearray((size + 7) // 8)
+    for i in positions:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _iter_bits(bitmap: int) -> Iterator[int]:
+    """Yield set bit positions from lowest to highest."""
+    bits = bin(bitmap)[:1:-1]
+    i = bits.find("1")
+    while i != -1:
+        yield i
+        i = bits.find("1", i + 1)
+
+
+def _has_working_url(urls: Iterable[GameItemUrl]) -> bool:
+    return any(u.url and not u.broken for u in urls)
+
+
+def _keys(*values: object) -> Tuple[object, ...]:
+    """Normalize string values and drop blanks; non-strings pass through."""
+    out = []
+    for v in values:
+        k = norm_key(v) if isinstance(v, str) else v
+        if k is not None and k != "":
+            out.append(k)
+    return tuple(out)
+
+
+class _BitmapIndex(Generic[T]):
+    """Per-value bitmaps over items kept in one sort order (bit i == items[i])."""
+
+    def __init__(self, items: List[T], dims: Dict[str, Callable[[T], Iterable[object]]]):
+        self.items = items
+        self.all = (1 << len(items)) - 1
+
+        positions: Dict[str, Dict[object, List[int]]] = {d: {} for d in dims}
+        for i, item in enumerate(items):
+            for d, values_of in dims.items():
+                by_value = positions[d]
+                for v in set(values_of(item)):
+                    by_value.setdefault(v, []).append(i)
+
+        self.bitmaps = {
+            d: {v: _bitmap_from_positions(p, len(items)) for v, p in by_value.items()} for d, by_value in positions.items()
+        }
+        self.cardinality = {d: {v: len(p) for v, p in by_value.items()} for d, by_value in positions.items()}
+
+    def values(self, dim: str) -> Iterable[object]:
+        """Return the distinct indexed values of a dimension."""
+        return self.bitmaps.get(dim, {}).keys()
+
+    def select(self, clauses: Sequence[Tuple[str, Sequence[object]]], match: MatchMode = "all") -> int:
+        """Evaluate clauses into a bitmap.
+
+        For AND, clauses are intersected cheapest-first by estimated cardinality
+        (sum of per-value counts) so selective filters short-circuit early.
+        """
+        if not clauses:
+            return self.all
+
+        plans = []
+        for dim, values in clauses:
+            bitmaps = self.bitmaps.get(dim, {})
+            present = [v for v in values if v in bitmaps]
+            estimate = sum(self.cardinality[dim][v] for v in present)
+            plans.append((estimate, dim, present))
+
+        if match == "any":
+            result = 0
+            for _, dim, present in plans:
+                for v in present:
+                    result |= self.bitmaps[dim][v]
+            return result
+
+        result = self.all
+        for estimate, dim, present in sorted(plans, key=lambda p: p[0]):
+            if estimate == 0:
+                return 0
+            union = 0
+            for v in present:
+                union |= self.bitmaps[dim][v]
+            result &= union
+            if not result:
+                return 0
+        return result
+
+    def scan(self, bitmap: int, offset: int = 0) -> Iterator[T]:
+        """Yield matching items in index order from `offset`, walking the bitmap once."""
+        if bitmap == self.all:
+            return islice(self.items, offset, None)
+        return (self.items[i] for i in islice(_iter_bits(bitmap), offset, None))
+
+    def take(self, bitmap: int, limit: int | None = None, offset: int = 0) -> List[T]:
+        """Materialize matching items in index order."""
+        if bitmap == self.all:
+            return self.items[offset : offset + limit] if limit else self.items[offset:]
+        return list(islice(self.scan(bitmap, offset), limit or None))
+
+
+_TABLE_DIMS: Dict[str, Callable[[GameTable], Iterable[object]]] = {
+    "format": lambda t: _keys(t.tableFormat),
+    "manufacturer": lambda t: _keys(t.gameManufacturer),
+    "year": lambda t: _keys(t.gameYear),
+    "author": lambda t: _keys(*t.authors),
+    "hasUrl": lambda t: (_has_working_url(t.urls),),
+}
+
+_BACKGLASS_DIMS: Dict[str, Callable[[GameBackGlass], Iterable[object]]] = {
+    "feature": lambda b: _keys(*b.features),
+    "manufacturer": lambda b: _keys(b.gameManufacturer),
+    "year": lambda b: _keys(b.gameYear),
+    "author": lambda b: _keys(*b.authors),
+    "hasUrl": lambda b: (_has_working_url(b.urls),),
+}
+
+_GAME_DIMS: Dict[str, Callable[[Game], Iterable[object]]] = {
+    "format": lambda g: _keys(*(t.tableFormat for t in g.tableFiles)),
+    "feature": lambda g: _keys(*(x for b in g.b2sFiles for x in b.features)),
+    "manufacturer": lambda g: _keys(g.manufacturer),
+    "year": lambda g: _keys(g.year),
+    "author": lambda g: _keys(*(a for c in (*g.tableFiles, *g.b2sFiles) for a in c.authors)),
+    "hasUrl": lambda g: (any(_has_working_url(c.urls) for c in (*g.tableFiles, *g.b2sFiles)),),
+}
+
+
+def _clauses(index: _BitmapIndex, query: GameQuery) -> List[Tuple[str, Sequence[object]]]:
+    """Translate a query into (dimension, values) clauses supported by an index."""
+    dims = index.bitmaps
+    clauses: List[Tuple[str, Sequence[object]]] = []
+    for dim, values in (
+        ("format", query.formats),
+        ("feature", query.features),
+        ("manufacturer", query.manufacturers),
+        ("author", query.authors),
+    ):
+        if values and dim in dims:
+            clauses.append((dim, values))
+
+    if query.year_from is not None or query.year_to is not None:
+        lo = query.year_from if query.year_from is not None else -(10**9)
+        hi = query.year_to if query.year_to is not None else 10**9
+        clauses.append(("year", [y for y in index.values("year") if lo <= y <= hi]))
+
+    if query.has_url is not None:
+        clauses.append(("hasUrl", [query.has_url]))
+    return clauses
+
+
+class GameIndex:
+    """Bitmap indexes over games, tables and backglasses; built once per snapshot."""
+
+    def __init__(self, games: Sequence[Game]):
+        tables = [t for g in games for t in g.tableFiles]
+        bgs = [b for g in games for b in g.b2sFiles]
+        self._by_id = {}
+        for g in games:
+            self._by_id.setdefault(g.id, g)
+
+        self._games = {
+            "createdAt": _BitmapIndex(sort_games_by_created_at(games), _GAME_DIMS),
+            "updatedAt": _BitmapIndex(sort_games_by_updated_at(games), _GAME_DIMS),
+        }
+        self._tables = {
+            "createdAt": _BitmapIndex(sort_tables_by_created_at(tables), _TABLE_DIMS),
+            "updatedAt": _BitmapIndex(sort_tables_by_updated_at(tables), _TABLE_DIMS),
+        }
+        self._backglasses = {
+            "createdAt": _BitmapIndex(sort_backglasses_by_created_at(bgs), _BACKGLASS_DIMS),
+            "updatedAt": _BitmapIndex(sort_backglasses_by_updated_at(bgs), _BACKGLASS_DIMS),
+        }
+
+    @staticmethod
+    def _run(
+        indexes: Dict[str, _BitmapIndex[T]], query: GameQuery, limit: int | None, sort: SortField, offset: int
+    ) -> List[T]:
+        index = indexes["createdAt" if sort == "createdAt" else "updatedAt"]
+        return index.take(index.select(_clauses(index, query), query.match), limit, offset)
+
+    @staticmethod
+    def _scan(indexes: Dict[str, _BitmapIndex[T]], query: GameQuery, sort: SortField, offset: int) -> Iterator[T]:
+        index = indexes["createdAt" if sort == "createdAt" else "updatedAt"]
+        return index.scan(index.select(_clauses(index, query), query.match), offset)
+
+    def games(
+        self, query: GameQuery, limit: int | None = None, sort: SortField = "updatedAt", offset: int = 0
+    ) -> List[Game]:
+        """Return matching games, newest first."""
+        return self._run(self._games, query, limit, sort, offset)
+
+    def games_by_ids(self, ids: Sequence[str]) -> List[Game]:
+        """Return games for ids, in the order given."""
+        return [self._by_id[i] for i in ids if i in self._by_id]
+
+    def tables(
+        self, query: GameQuery, limit: int | None = None, sort: SortField = "createdAt", offset: int = 0
+    ) -> List[GameTable]:
+        """Return matching tables, newest first."""
+        return self._run(self._tables, query, limit, sort, offset)
+
+    def backglasses(
+        self, query: GameQuery, limit: int | None = None, sort: SortField = "updatedAt", offset: int = 0
+    ) -> List[GameBackGlass]:
+        """Return matching backglasses, newest first."""
+        return self._run(self._backglasses, query, limit, sort, offset)
+
+    # Lazy counterparts for callers that read far into a result (exports, feeds):
+    # the match bitmap is evaluated and walked once instead of once per page.
+
+    def iter_games(self, query: GameQuery, sort: SortField = "updatedAt", offset: int = 0) -> Iterator[Game]:
+        """Yield matching games, newest first."""
+        return self._scan(self._games, query, sort, offset)
+
+    def iter_tables(self, query: GameQuery, sort: SortField = "createdAt", offset: int = 0) -> Iterator[GameTable]:
+        """Yield matching tables, newest first."""
+        return self._scan(self._tables, query, sort, offset)
+
+    def iter_backglasses(
+        self, query: GameQuery, sort: SortField = "updatedAt", offset: int = 0
+    ) -> Iterator[GameBackGlass]:
+        """Yield matching backglasses, newest first."""
+        return self._scan(self._backglasses, query, sort, offset)
@@ -1,29 +1,40 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List
+from typing import TYPE_CHECKING, List
 
 from flask import current_app
 
 from app.models.game import Game
-from app.services.vpsdb_loader import VpsDbLoader
-from app.services.vpsdb_mapper import VpsDbMapper
+from app.services.game_snapshot import GameSnapshot, SnapshotProvider
+from app.services.request_timing import timed
+from app.services.snapshot_history import HistoryNotFoundError, SnapshotHistory
+
+if TYPE_CHECKING:
+    from app.services.sqlite_store import SqliteSnapshot
 
 
 @dataclass
 class GameRepository:
     """Repository that provides mapped Game models."""
 
-    loader: VpsDbLoader
-    mapper: VpsDbMapper
+    provider: SnapshotProvider
+    history: SnapshotHistory | None = None
 
     @classmethod
     def from_flask_app(cls) -> "GameRepository":
-        """Create repository from Flask app settings."""
-        settings = current_app.config["SETTINGS"]
-        return cls(loader=VpsDbLoader(settings), mapper=VpsDbMapper())
+        """Create repository from the app-wide snapshot provider and history."""
+        return cls(provider=current_app.extensions["vpsdb_snapshots"], history=current_app.extensions.get("vpsdb_history"))
+
+    def snapshot(self, as_of: str | None = None) -> "GameSnapshot | SqliteSnapshot":
+        """Return the current mapped snapshot, or the one that was current at `as_of`."""
+        with timed("snapshot"):
+            if as_of is None:
+                return self.provider.current()
+            if self.history is None:
+                raise HistoryNotFoundError("Snapshot history is not available")
+            return self.history.snapshot_as_of(as_of)
 
     def list_games(self) -> List[Game]:
-        """Load and map all games."""
-        raw = self.loader.load_raw()
-        return self.mapper.map_games(raw)
+        """Return all mapped games (hydrated from SQL with the sqlite backend)."""
+        return self.snapshot().games
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, List, Tuple
+
+from app.configs.settings import Settings
+from app.models.game import Game
+from app.services.game_facets import GameFacets
+from app.services.game_index import GameIndex, GameQuery
+from app.services.vpsdb_loader import VpsDbLoader
+from app.services.vpsdb_mapper import VpsDbMapper
+from app.services.widget_view import WidgetViewRows
+
+if TYPE_CHECKING:
+    from app.services.sqlite_store import SqliteSnapshot
+
+VersionKey = Tuple[int, int, int]
+
+# Filtered facet results kept per snapshot (the unfiltered one is always kept).
+_MAX_FILTERED_FACETS = 64
+
+
+@dataclass(frozen=True)
+class GameSnapshot:
+    """Mapped games for one local dataset version plus data derived from them.
+
+    Never modified after `build` (only the filtered-facet cache changes, under
+    its lock), so request threads share it without locking.
+    """
+
+    version: VersionKey
+    built_at: float
+    games: List[Game]
+    index: GameIndex
+    facets: GameFacets
+    widget_rows: WidgetViewRows
+    _filtered_facets: "OrderedDict[GameQuery, GameFacets]" = field(default_factory=OrderedDict, repr=False)
+    _facet_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @classmethod
+    def build(cls, version: VersionKey, games: List[Game], prefill_rows: bool = True) -> "GameSnapshot":
+        """Build a snapshot and everything precomputed alongside it.
+
+        `prefill_rows=False` leaves the widget rows to be filled (bounded) as they
+        are requested, for short-lived snapshots such as past versions.
+        """
+        index = GameIndex(games)
+        empty = GameQuery()
+        tables, backglasses = index.tables(empty), index.backglasses(empty)
+        facets = GameFacets.build(index.games(empty), tables, backglasses)
+        widget_rows = WidgetViewRows.build(tables, backglasses) if prefill_rows else WidgetViewRows()
+        return cls(version=version, built_at=time.time(), games=games, index=index, facets=facets, widget_rows=widget_rows)
+
+    @property
+    def timestamp(self) -> int:
+        """Upstream lastUpdated epoch of the data in this snapshot."""
+        return self.version[0]
+
+    @property
+    def game_count(self) -> int:
+        return len(self.games)
+
+    def facets_for(self, query: GameQuery) -> GameFacets:
+        """Return facets restricted by a query, cached per snapshot (one result per query for all callers)."""
+        if query.is_empty():
+            return self.facets
+
+        with self._facet_lock:
+            cached = self._filtered_facets.get(query)
+            if cached is not None:
+                self._filtered_facets.move_to_end(query)
+                return cached
+
+        games = self.index.games(query)
+        # Children are counted only under matching games: a dimension a child type does not
+        # have (e.g. `format` for backglasses) still restricts it through its game.
+        ids = {g.id for g in games}
+        tables = [t for t in self.index.tables(query) if t.gameId in ids]
+        backglasses = [b for b in self.index.backglasses(query) if b.gameId in ids]
+        built = GameFacets.build(games, tables, backglasses)
+        with self._facet_lock:
+            # A concurrent request may have stored the same facets first; every caller gets that one.
+            built = self._filtered_facets.setdefault(query, built)
+            while len(self._filtered_facets) > _MAX_FILTERED_FACETS:
+                self._filtered_facets.popitem(last=False)
+        return built
+
+    def __getstate__(self) -> dict:
+        # Pickled by the ingest worker; locks and caches are per process.
+        state = dict(self.__dict__)
+        state["_filtered_facets"] = OrderedDict()
+        del state["_facet_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        object.__setattr__(self, "_facet_lock", threading.Lock())
+
+
+class SnapshotUnavailableError(RuntimeError):
+    """Raised when no snapshot is loaded and there is no local copy to load."""
+
+
+class SnapshotProvider:
+    """Process-wide holder that rebuilds the snapshot only when the local copy changes.
+
+    The provider never talks to upstream; syncing is done by `BackgroundSync`.
+    Readers just load `_snapshot`; a rebuild happens under `_build_lock` and is
+    published with a single reference assignment, so it is safe for threaded
+    workers without locking on the read path.
+    """
+
+    def __init__(self, settings: Settings, loader: VpsDbLoader | None = None, mapper: VpsDbMapper | None = None):
+        self._settings = settings
+        self._loader = loader or VpsDbLoader(settings)
+        self._mapper = mapper or VpsDbMapper()
+        self._snapshot: GameSnapshot | SqliteSnapshot | None = None
+        self._checked_at = 0.0
+        self._build_lock = threading.Lock()
+
+    @property
+    def loader(self) -> VpsDbLoader:
+        return self._loader
+
+    def peek(self) -> "GameSnapshot | SqliteSnapshot | None":
+        """Return the loaded snapshot without checking the local copy."""
+        return self._snapshot
+
+    def current(self) -> "GameSnapshot | SqliteSnapshot":
+        """Return the current snapshot, re-checking the local copy once per TTL.
+
+        While a rebuild is running, callers keep getting the previous snapshot;
+        only the very first load makes callers wait.
+        """
+        snap = self._snapshot
+        if snap is not None and time.time() - self._checked_at < self._settings.CACHE_TTL_SECONDS:
+            return snap
+
+        if not self._build_lock.acquire(blocking=snap is None):
+            return snap  # type: ignore[return-value]
+        try:
+            return self._check_and_build()
+        finally:
+            self._build_lock.release()
+
+    def refresh(self) -> "GameSnapshot | SqliteSnapshot":
+        """Re-check the local copy now (used after a sync downloaded new data)."""
+        with self._build_lock:
+            return self._check_and_build()
+
+    def _load_games(self) -> List[Game]:
+        return self._mapper.map_games(self._loader.read_local())
+
+    def _build(self, version: VersionKey) -> "GameSnapshot | SqliteSnapshot":
+        if self._settings.INGEST_PROCESSES > 0:
+            from app.services.ingest_worker import build_off_process
+
+            try:
+                return build_off_process(self._settings, version)
+            except Exception as e:
+                print(f"Off-process ingestion failed, building in-process: {e}")
+
+        if self._settings.STORE_BACKEND == "sqlite":
+            from app.services.sqlite_store import SqliteSnapshot
+
+            return SqliteSnapshot.open_or_build(self._settings, version, self._load_games)
+        return GameSnapshot.build(version, self._load_games())
+
+    def _check_and_build(self) -> "GameSnapshot | SqliteSnapshot":
+        snap = self._snapshot
+        version = self._loader.local_version()
+        if version == (0, 0, 0):
+            if snap is None:
+                raise SnapshotUnavailableError("No local VPSDB copy has been loaded yet")
+            return snap
+
+        if snap is None or snap.version != version:
+            snap = self._build(version)
+            self._snapshot = snap
+
+        self._checked_at = time.time()
+        return snap
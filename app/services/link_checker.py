@@ -0,0 +1,402 @@
+"""Background health checks for table and backglass download URLs.
+
+Every URL in the current snapshot is checked with HEAD (falling back to a
+streamed GET when HEAD is refused), with bounded overall concurrency and a
+per-host limit. Results are cached on disk with a TTL, so restarts and other
+workers reuse them; only one worker per host runs a check pass at a time.
+
+Only 404/410 count as dead right away. A DNS or connection failure leaves the
+URL `unreachable`, which is retried on the next pass instead of being trusted
+for the TTL; `LINK_CHECK_DEAD_AFTER` consecutive failures make it dead.
+Timeouts and other statuses are recorded but never demote a URL.
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Set
+from urllib.parse import urlsplit
+
+from flask import current_app
+
+from app.configs.settings import Settings
+from app.services.game_index import GameQuery
+from app.services.game_snapshot import SnapshotProvider
+
+if TYPE_CHECKING:
+    import requests
+
+_USER_AGENT = "vpsdb-widget-api-linkcheck/1.0"
+_DEAD_STATUSES = (404, 410)
+# HEAD is not supported everywhere; retry these with a streamed GET.
+_HEAD_REFUSED = (400, 403, 405, 501)
+# How often workers that are not checking pick up results written by others.
+_RELOAD_SECONDS = 60.0
+# Results are flushed to disk every this many checks during a pass.
+_SAVE_EVERY = 200
+
+
+@dataclass(frozen=True)
+class LinkResult:
+    """Outcome of one URL check (`state` is `ok | dead | unreachable | error | timeout`).
+
+    `failures` counts consecutive connection failures up to this check.
+    """
+
+    state: str
+    status: int | None
+    checked_at: float
+    latency_ms: float | None = None
+    error: str | None = None
+    failures: int = 0
+
+    def to_dict(self) -> dict:
+        """Serialize to JSON-friendly dict."""
+        return {
+            "state": self.state,
+            "status": self.status,
+            "checkedAt": self.checked_at,
+            "latencyMs": self.latency_ms,
+            "error": self.error,
+            "failures": self.failures,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "LinkResult":
+        return cls(
+            state=d.get("state", "error"),
+            status=d.get("status"),
+            checked_at=float(d.get("checkedAt") or 0.0),
+            latency_ms=d.get("latencyMs"),
+            error=d.get("error"),
+            failures=int(d.get("failures") or 0),
+        )
+
+
+class LinkCache:
+    """URL -> last result, persisted as one JSON file and replaced atomically."""
+
+    def __init__(self, path: str, ttl_seconds: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._results: Dict[str, LinkResult] = {}
+        self._mtime_ns: int | None = None
+
+    def load(self) -> None:
+        """Re-read the file if another process (or a restart) changed it."""
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime_ns == self._mtime_ns:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable link cache {self.path}: {e}")
+            return
+        results = {url: LinkResult.from_dict(d) for url, d in (raw.get("results") or {}).items()}
+        with self._lock:
+            self._results = results
+            self._mtime_ns = mtime_ns
+
+    def get(self, url: str) -> LinkResult | None:
+        return self._results.get(url)
+
+    def is_fresh(self, url: str, now: float) -> bool:
+        r = self._results.get(url)
+        # Unreachable URLs are retried every pass until they recover or turn dead.
+        return r is not None and r.state != "unreachable" and now - r.checked_at < self.ttl_seconds
+
+    def update(self, results: Dict[str, LinkResult]) -> None:
+        with self._lock:
+            merged = dict(self._results)
+            merged.update(results)
+            self._results = merged
+
+    def save(self, keep: Set[str] | None = None) -> None:
+        """Write all results (only URLs in `keep`, when given) to disk."""
+        with self._lock:
+            if keep is not None:
+                self._results = {u: r for u, r in self._results.items() if u in keep}
+            payload = {"results": {u: r.to_dict() for u, r in self._results.items()}}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._mtime_ns = os.stat(self.path).st_mtime_ns
+
+    def snapshot(self) -> Dict[str, LinkResult]:
+        return self._results
+
+    @property
+    def revision(self) -> int | None:
+        """Changes whenever the loaded results change (the file's mtime)."""
+        return self._mtime_ns
+
+
+def collect_urls(snapshot) -> List[str]:
+    """All distinct table/backglass URLs in a snapshot, in listing order."""
+    empty = GameQuery()
+    seen: Dict[str, None] = {}
+    for items in (snapshot.index.tables(empty), snapshot.index.backglasses(empty)):
+        for item in items:
+            for u in item.urls:
+                if u.url and u.url.startswith(("http://", "https://")):
+                    seen.setdefault(u.url, None)
+    return list(seen)
+
+
+@dataclass
+class LinkCheckRun:
+    """Observable state of the last check pass in this worker."""
+
+    running: bool = False
+    last_started_at: float | None = None
+    last_finished_at: float | None = None
+    last_checked: int = 0
+    last_skipped: str | None = None
+    last_error: str | None = None
+
+    def to_dict(self) -> dict:
+        """Serialize to JSON-friendly dict."""
+        return {
+            "running": self.running,
+            "lastStartedAt": self.last_started_at,
+            "lastFinishedAt": self.last_finished_at,
+            "lastChecked": self.last_checked,
+            "lastSkipped": self.last_skipped,
+            "lastError": self.last_error,
+        }
+
+
+class LinkChecker:
+    """Periodically checks every item URL off the request path.
+
+    `is_dead` is cheap (a dict lookup) and is what `best_url` callers pass in.
+    """
+
+    def __init__(self, settings: Settings, provider: SnapshotProvider):
+        self._settings = settings
+        self._provider = provider
+        self.cache = LinkCache(settings.LINK_CHECK_CACHE_PATH, settings.LINK_CHECK_TTL_SECONDS)
+        self.run_state = LinkCheckRun()
+        self._stop = threading.Event()
+        self._local = threading.local()
+        self._known: tuple = (None, [])
+
+    # ---------- Request path ----------
+
+    def is_dead(self, url: str) -> bool:
+        r = self.cache.get(url)
+        return r is not None and r.state == "dead"
+
+    @property
+    def revision(self) -> int | None:
+        """Changes when dead-link verdicts may have changed; part of cached-row keys."""
+        return self.cache.revision
+
+    def stats(self) -> dict:
+        """Counts by state, coverage of the current snapshot and the worst hosts."""
+        results = self.cache.snapshot()
+        now = time.time()
+        states = Counter(r.state for r in results.values())
+        dead_hosts = Counter(urlsplit(u).hostname or "" for u, r in results.items() if r.state == "dead")
+        latencies = sorted(r.latency_ms for r in results.values() if r.state == "ok" and r.latency_ms is not None)
+        known = self._known_urls()
+        return {
+            "enabled": True,
+            "pid": os.getpid(),
+            "urls": len(known),
+            "checked": sum(1 for u in known if u in results),
+            "stale": sum(1 for u in known if u in results and now - results[u].checked_at >= self.cache.ttl_seconds),
+            "states": {s: states.get(s, 0) for s in ("ok", "dead", "unreachable", "error", "timeout")},
+            "okLatencyMs": {
+                "p50": latencies[len(latencies) // 2] if latencies else None,
+                "p95": latencies[int(len(latencies) * 0.95)] if latencies else None,
+            },
+            "deadHosts": [{"host": h, "dead": n} for h, n in dead_hosts.most_common(10)],
+            "settings": {
+                "concurrency": self._settings.LINK_CHECK_CONCURRENCY,
+                "perHost": self._settings.LINK_CHECK_PER_HOST,
+                "ttlSeconds": self._settings.LINK_CHECK_TTL_SECONDS,
+                "intervalSeconds": self._settings.LINK_CHECK_INTERVAL_SECONDS,
+                "deadAfter": self._settings.LINK_CHECK_DEAD_AFTER,
+            },
+            "run": self.run_state.to_dict(),
+        }
+
+    def _known_urls(self) -> List[str]:
+        snapshot = self._provider.peek()
+        if snapshot is None:
+            return []
+        version, urls = self._known
+        if version != snapshot.version:
+            urls = collect_urls(snapshot)
+            self._known = (snapshot.version, urls)
+        return urls
+
+    # ---------- Background loop ----------
+
+    def start(self) -> None:
+        """Start the background loop (daemon thread)."""
+        self.cache.load()
+        threading.Thread(target=self._loop, name="link-checker", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        next_run = time.time() + min(30.0, self._settings.LINK_CHECK_INTERVAL_SECONDS)
+        while not self._stop.wait(min(_RELOAD_SECONDS, max(1.0, next_run - time.time()))):
+            self.cache.load()
+            if time.time() < next_run:
+                continue
+            try:
+                self.run_once()
+            except Exception as e:
+                self.run_state.last_error = str(e) or e.__class__.__name__
+                print(f"Link check failed: {e}")
+            next_run = time.time() + self._settings.LINK_CHECK_INTERVAL_SECONDS
+
+    def run_once(self) -> int:
+        """Check every URL whose cached result is missing or expired; return how many were checked."""
+        import fcntl
+
+        snapshot = self._provider.peek()
+        if snapshot is None:
+            self.run_state.last_skipped = "no snapshot"
+            return 0
+
+        lock_path = f"{self.cache.path}.lock"
+        os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+        with open(lock_path, "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self.run_state.last_skipped = "another worker is checking"
+                return 0
+            try:
+                return self._check_all(self._known_urls())
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _check_all(self, urls: List[str]) -> int:
+        self.cache.load()
+        now = time.time()
+        due = [u for u in urls if not self.cache.is_fresh(u, now)]
+
+        state = self.run_state
+        state.running, state.last_started_at, state.last_skipped, state.last_error = True, now, None, None
+        host_limits: Dict[str, threading.Semaphore] = defaultdict(
+            lambda: threading.Semaphore(self._settings.LINK_CHECK_PER_HOST)
+        )
+        hosts_lock = threading.Lock()
+
+        def check(url: str) -> tuple:
+            host = urlsplit(url).hostname or ""
+            with hosts_lock:
+                limit = host_limits[host]
+            with limit:
+                return url, self._settle(self.cache.get(url), self.check(url))
+
+        checked = 0
+        try:
+            pending: Dict[str, LinkResult] = {}
+            with ThreadPoolExecutor(max_workers=self._settings.LINK_CHECK_CONCURRENCY, thread_name_prefix="link-check") as pool:
+                for url, result in pool.map(check, _interleave_hosts(due)):
+                    pending[url] = result
+                    checked += 1
+                    if len(pending) >= _SAVE_EVERY:
+                        self.cache.update(pending)
+                        self.cache.save()
+                        pending = {}
+            self.cache.update(pending)
+            self.cache.save(keep=set(urls))
+        finally:
+            state.running = False
+            state.last_finished_at = time.time()
+            state.last_checked = checked
+        return checked
+
+    def _session(self) -> "requests.Session":
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+
+            session = requests.Session()
+            session.headers["User-Agent"] = _USER_AGENT
+            self._local.session = session
+        return session
+
+    def check(self, url: str) -> LinkResult:
+        """Check one URL (HEAD, then a streamed GET if HEAD is refused)."""
+        import requests
+
+        timeout = self._settings.LINK_CHECK_TIMEOUT_SECONDS
+        session = self._session()
+        started = time.perf_counter()
+        try:
+            resp = session.head(url, timeout=timeout, allow_redirects=True)
+            if resp.status_code in _HEAD_REFUSED:
+                resp = session.get(url, timeout=timeout, allow_redirects=True, stream=True)
+                resp.close()
+        except requests.Timeout:
+            return LinkResult(state="timeout", status=None, checked_at=time.time(), error="timeout")
+        except requests.ConnectionError as e:
+            return LinkResult(state="unreachable", status=None, checked_at=time.time(), error=str(e)[:200], failures=1)
+        except requests.RequestException as e:
+            return LinkResult(state="error", status=None, checked_at=time.time(), error=str(e)[:200])
+
+        latency_ms = round((time.perf_counter() - started) * 1000.0, 1)
+        if resp.status_code < 400:
+            state = "ok"
+        elif resp.status_code in _DEAD_STATUSES:
+            state = "dead"
+        else:
+            state = "error"
+        return LinkResult(state=state, status=resp.status_code, checked_at=time.time(), latency_ms=latency_ms)
+
+
+    def _settle(self, previous: LinkResult | None, result: LinkResult) -> LinkResult:
+        """Count a connection failure onto the previous ones; enough in a row make the URL dead."""
+        if result.state != "unreachable":
+            return result
+        failures = 1
+        if previous is not None and previous.failures:
+            failures = previous.failures + 1
+        state = "dead" if failures >= self._settings.LINK_CHECK_DEAD_AFTER else "unreachable"
+        return dataclasses.replace(result, state=state, failures=failures)
+
+
+def dead_link_filter() -> Callable[[str], bool] | None:
+    """The running app's `is_dead` check for `best_url`, or None when checking is off."""
+    checker = current_app.extensions.get("link_checker")
+    return checker.is_dead if checker is not None else None
+
+
+def link_revision() -> int | None:
+    """The running app's link-health revision (None when checking is off)."""
+    checker = current_app.extensions.get("link_checker")
+    return checker.revision if checker is not None else None
+
+
+def _interleave_hosts(urls: Iterable[str]) -> List[str]:
+    """Round-robin URLs across hosts so one big host does not hog the pool."""
+    by_host: Dict[str, List[str]] = defaultdict(list)
+    for u in urls:
+        by_host[urlsplit(u).hostname or ""].append(u)
+    queues = list(by_host.values())
+    out: List[str] = []
+    for i in range(max((len(q) for q in queues), default=0)):
+        out.extend(q[i] for q in queues if i < len(q))
+    return out
@@ -0,0 +1,196 @@
+"""Reload the snapshot as soon as the local copy changes on disk.
+
+For deployments where one process (the sidecar, see `app.tools.sync_sidecar`,
+or the sync leader, see `sync_leader`) keeps the shared local copy fresh and
+the workers only read it. Each worker watches the directories of
+`LOCAL_JSON_PATH` (all compression variants), `LOCAL_TIMESTAMP_PATH` and the
+manifest: with inotify on Linux, otherwise by polling mtime, size and inode.
+Changes are debounced (a sync writes the copy, the timestamp and then the
+manifest) and then trigger one `SnapshotProvider.refresh()`, unless the
+manifest does not describe the file on disk yet.
+"""
+from __future__ import annotations
+
+import os
+import select
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Set, Tuple
+
+from app.configs.settings import Settings
+from app.services.game_snapshot import SnapshotProvider
+from app.services.vpsdb_manifest import manifest_matches, read_manifest
+from app.utils import compression
+
+# inotify(7) constants.
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+Fingerprint = Tuple[Tuple[str, int, int, int] | None, ...]
+
+
+@dataclass
+class WatchState:
+    """Observable state of the watcher (reported by /ready)."""
+
+    mode: str = "off"
+    events: int = 0
+    reloads: int = 0
+    last_event_at: float | None = None
+    last_reload_at: float | None = None
+    last_error: str | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "mode": self.mode,
+            "events": self.events,
+            "reloads": self.reloads,
+            "lastEventAt": self.last_event_at,
+            "lastReloadAt": self.last_reload_at,
+            "lastError": self.last_error,
+        }
+
+
+def _inotify_open(dirs: Iterable[str]) -> int:
+    """Return an inotify fd watching `dirs`; raises OSError where inotify is unavailable."""
+    import ctypes
+    import ctypes.util
+
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    for d in dirs:
+        if libc.inotify_add_watch(fd, os.fsencode(d), _WATCH_MASK) < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, f"inotify_add_watch failed for {d}")
+    return fd
+
+
+def _event_names(data: bytes) -> Iterable[str | None]:
+    """File names in a buffer of inotify events (None for a queue overflow)."""
+    offset = 0
+    while offset + _EVENT.size <= len(data):
+        _, mask, _, length = _EVENT.unpack_from(data, offset)
+        offset += _EVENT.size
+        name = data[offset : offset + length].rstrip(b"\0")
+        offset += length
+        yield None if mask & _IN_Q_OVERFLOW else os.fsdecode(name)
+
+
+class LocalFileWatcher:
+    """Background thread that refreshes the snapshot provider when the local copy changes."""
+
+    def __init__(self, settings: Settings, provider: SnapshotProvider):
+        self._settings = settings
+        self._provider = provider
+        self._paths = [
+            *(compression.compressed_path(settings.LOCAL_JSON_PATH, c) for c in compression.SUFFIXES),
+            settings.LOCAL_TIMESTAMP_PATH,
+            settings.MANIFEST_PATH,
+        ]
+        self._names: Set[str] = {os.path.basename(p) for p in self._paths}
+        self._dirs: List[str] = sorted({os.path.dirname(os.path.abspath(p)) for p in self._paths})
+        self._debounce = settings.WATCH_DEBOUNCE_MS / 1000.0
+        self._stop = threading.Event()
+        self.state = WatchState()
+
+    def start(self) -> None:
+        for d in self._dirs:
+            os.makedirs(d, exist_ok=True)
+        threading.Thread(target=self._loop, name="vpsdb-watch", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        if self._settings.WATCH_MODE in ("auto", "inotify"):
+            try:
+                fd = _inotify_open(self._dirs)
+            except (OSError, AttributeError) as e:
+                print(f"inotify unavailable ({e}); polling the local copy every {self._settings.WATCH_POLL_SECONDS}s")
+            else:
+                self.state.mode = "inotify"
+                try:
+                    self._watch_inotify(fd)
+                finally:
+                    os.close(fd)
+                return
+        self.state.mode = "poll"
+        self._watch_poll()
+
+    # ---------- Change detection ----------
+
+    def _watch_inotify(self, fd: int) -> None:
+        pending_since: float | None = None
+        while not self._stop.is_set():
+            timeout = 1.0 if pending_since is None else max(0.0, pending_since + self._debounce - time.monotonic())
+            readable, _, _ = select.select([fd], [], [], timeout)
+            if readable:
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                if any(name is None or name in self._names for name in _event_names(data)):
+                    pending_since = self._saw_change()
+            elif pending_since is not None:
+                pending_since = None
+                self._reload()
+
+    def _fingerprint(self) -> Fingerprint:
+        out = []
+        for p in self._paths:
+            try:
+                st = os.stat(p)
+            except OSError:
+                out.append(None)
+                continue
+            out.append((p, st.st_mtime_ns, st.st_size, st.st_ino))
+        return tuple(out)
+
+    def _watch_poll(self) -> None:
+        last = self._fingerprint()
+        pending_since: float | None = None
+        interval = self._settings.WATCH_POLL_SECONDS
+        while not self._stop.wait(min(interval, self._debounce) if pending_since is not None else interval):
+            current = self._fingerprint()
+            if current != last:
+                last = current
+                pending_since = self._saw_change()
+            elif pending_since is not None and time.monotonic() - pending_since >= self._debounce:
+                pending_since = None
+                self._reload()
+
+    # ---------- Reload ----------
+
+    def _saw_change(self) -> float:
+        self.state.events += 1
+        self.state.last_event_at = time.time()
+        return time.monotonic()
+
+    def _reload(self) -> None:
+        manifest = read_manifest(self._settings)
+        if manifest is not None and not manifest_matches(self._settings, manifest):
+            # Mid-publish (or a copy written without a manifest); the manifest write will wake us again.
+            self.state.last_error = f"manifest version {manifest.get('version')} does not match the local copy"
+            print(f"Not reloading: {self.state.last_error}")
+            return
+        try:
+            snap = self._provider.refresh()
+            self.state.reloads += 1
+            self.state.last_reload_at = time.time()
+            self.state.last_error = None
+            print(f"Local copy changed; serving version {snap.timestamp}")
+        except Exception as e:
+            self.state.last_error = str(e) or e.__class__.__name__
+            print(f"Reload after local copy change failed: {self.state.last_error}")
@@ -0,0 +1,212 @@
+"""Where a worker's memory goes: snapshot graph sizes, caches, RSS and allocation sites.
+
+Deep sizes walk the object graph from a set of roots and add up
+`sys.getsizeof` of every object reached once (shared objects are counted by
+whichever root reaches them first). They are approximations: allocator
+overhead and objects only reachable from C code are not included.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tracemalloc
+import types
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from flask import Flask
+
+from app.models.game import Game
+from app.services.game_snapshot import GameSnapshot
+
+# Not data: never descend into these.
+_SKIP_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    types.CodeType,
+    types.FrameType,
+)
+
+
+def deep_size(roots: Iterable[Any], seen: Set[int] | None = None) -> Tuple[int, Counter, Counter]:
+    """Return (bytes, count by type, bytes by type) of objects reachable from `roots`.
+
+    Objects whose id is in `seen` are skipped; `seen` is updated, so measuring
+    several roots in turn with one set attributes shared objects once.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    counts: Counter = Counter()
+    sizes: Counter = Counter()
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIP_TYPES):
+            continue
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        name = type(obj).__name__
+        total += size
+        counts[name] += 1
+        sizes[name] += size
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+            continue
+        else:
+            d = getattr(obj, "__dict__", None)
+            if d is not None:
+                stack.append(d)
+            for slot in getattr(type(obj), "__slots__", ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return total, counts, sizes
+
+
+def _by_type(counts: Counter, sizes: Counter, limit: int = 12) -> List[dict]:
+    return [{"type": name, "count": counts[name], "bytes": size} for name, size in sizes.most_common(limit)]
+
+
+def _entity_counts(games: List[Game]) -> Dict[str, int]:
+    tables = [t for g in games for t in g.tableFiles]
+    bgs = [b for g in games for b in g.b2sFiles]
+    return {
+        "games": len(games),
+        "tables": len(tables),
+        "backglasses": len(bgs),
+        "urls": sum(len(t.urls) for t in tables) + sum(len(b.urls) for b in bgs),
+    }
+
+
+def _process_memory() -> Dict[str, int | None]:
+    """Current and peak RSS in bytes (from /proc on Linux, else ru_maxrss)."""
+    out: Dict[str, int | None] = {"rssBytes": None, "peakRssBytes": None}
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    out["rssBytes"] = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    out["peakRssBytes"] = int(line.split()[1]) * 1024
+    except OSError:
+        import resource
+
+        # KiB on Linux, bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        out["peakRssBytes"] = peak if sys.platform == "darwin" else peak * 1024
+    return out
+
+
+def _snapshot_section(snapshot: Any, deep: bool, seen: Set[int]) -> dict:
+    section: Dict[str, Any] = {"loaded": snapshot is not None}
+    if snapshot is None:
+        return section
+    section["timestamp"] = snapshot.timestamp
+
+    if not isinstance(snapshot, GameSnapshot):
+        # SQLite backend: the model graph lives on disk.
+        section["backend"] = "sqlite"
+        section["counts"] = snapshot.row_counts()
+        section["widgetRows"] = len(snapshot.widget_rows)
+        section["fileBytes"] = os.path.getsize(snapshot.path)
+        if deep:
+            section["deepBytes"] = {"facets": deep_size([snapshot.facets], seen)[0]}
+        return section
+
+    section["backend"] = "memory"
+    section["counts"] = _entity_counts(snapshot.games)
+    if deep:
+        models, counts, sizes = deep_size(snapshot.games, seen)
+        index = deep_size([snapshot.index], seen)[0]
+        rows = deep_size([snapshot.widget_rows], seen)[0]
+        other = deep_size([snapshot], seen)[0]
+        section["deepBytes"] = {
+            "models": models,
+            "index": index,
+            "widgetRows": rows,
+            "facetsAndCaches": other,
+            "total": models + index + rows + other,
+        }
+        section["byType"] = _by_type(counts, sizes)
+    return section
+
+
+def _cache_section(app: Flask, deep: bool, seen: Set[int]) -> dict:
+    ext = app.extensions
+    caches: Dict[str, Any] = {}
+
+    rows = ext.get("widget_rows_cache")
+    if rows is not None:
+        caches["widgetRows"] = {"entries": len(rows), "bytes": rows.size_bytes}
+
+    history = ext.get("vpsdb_history")
+    if history is not None:
+        cached = history.cached_snapshots()
+        caches["historySnapshots"] = {"entries": len(cached)}
+        if cached and deep:
+            caches["historySnapshots"]["deepBytes"] = deep_size(cached, seen)[0]
+
+    changes = ext.get("vpsdb_changes")
+    if changes is not None:
+        caches["changeLog"] = {"indexedEntries": changes.indexed_entry_count}
+
+    checker = ext.get("link_checker")
+    if checker is not None:
+        results = checker.cache.snapshot()
+        caches["linkHealth"] = {"entries": len(results)}
+        if deep:
+            caches["linkHealth"]["deepBytes"] = deep_size([results], seen)[0]
+    return caches
+
+
+def _tracemalloc_section(top: int) -> dict:
+    if top <= 0:
+        return {"tracing": tracemalloc.is_tracing(), "skipped": True}
+    if not tracemalloc.is_tracing():
+        return {"tracing": False, "hint": "set TRACEMALLOC_FRAMES (or PYTHONTRACEMALLOC) to record allocation sites"}
+    current, peak = tracemalloc.get_traced_memory()
+    snap = tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        )
+    )
+    stats = snap.statistics("lineno")[:top]
+    return {
+        "tracing": True,
+        "tracedBytes": current,
+        "peakTracedBytes": peak,
+        "top": [
+            {"site": f"{s.traceback[0].filename}:{s.traceback[0].lineno}", "bytes": s.size, "count": s.count}
+            for s in stats
+        ],
+    }
+
+
+def memory_report(app: Flask, deep: bool = True, top: int = 20) -> dict:
+    """Everything `/admin/memory` returns, for the worker that runs it.
+
+    `deep=False` skips the graph walks; `top=0` skips the allocation sites.
+    """
+    # Allocation sites first, so the graph walk below does not show up in them.
+    allocations = _tracemalloc_section(top)
+    process = _process_memory()
+    seen: Set[int] = set()
+    snapshot = app.extensions["vpsdb_snapshots"].peek()
+    return {
+        "pid": os.getpid(),
+        **process,
+        "snapshot": _snapshot_section(snapshot, deep, seen),
+        "caches": _cache_section(app, deep, seen),
+        "tracemalloc": allocations,
+    }
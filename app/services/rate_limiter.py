@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from flask import Response, jsonify, request
+
+from app.configs.settings import Settings
+
+# Blueprint name -> budget class. Routes in other blueprints are never limited.
+ROUTE_CLASSES: Dict[str, str] = {
+    "api": "listing",
+    "table_widgets": "widget",
+    "backglass_widgets": "widget",
+    "activity_widgets": "widget",
+}
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Token bucket budget: `rate` tokens/second refill, up to `burst` tokens."""
+
+    rate: float
+    burst: float
+
+    @classmethod
+    def parse(cls, spec: str, default: "Budget") -> "Budget":
+        """Parse `rate/burst` (e.g. `2/20`); invalid specs fall back to the default."""
+        try:
+            rate, _, burst = spec.partition("/")
+            parsed = cls(rate=float(rate), burst=float(burst or rate))
+        except (AttributeError, ValueError):
+            return default
+        return parsed if parsed.rate > 0 and parsed.burst >= 1 else default
+
+
+def _refill(tokens: float, last: float, now: float, budget: Budget) -> float:
+    if last <= 0:
+        return budget.burst
+    return min(budget.burst, tokens + max(0.0, now - last) * budget.rate)
+
+
+def _decide(tokens: float, budget: Budget) -> Tuple[bool, float, float]:
+    """Return (allowed, tokens_left, retry_after_seconds)."""
+    if tokens >= 1.0:
+        return True, tokens - 1.0, 0.0
+    return False, tokens, (1.0 - tokens) / budget.rate
+
+
+class MemoryBucketStore:
+    """Per-process buckets, at most `max_keys` of them (least recently used are dropped first)."""
+
+    MAX_KEYS = 10_000
+
+    def __init__(self, max_keys: int = MAX_KEYS):
+        self._max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, budget: Budget, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (0.0, 0.0))
+            allowed, left, retry = _decide(_refill(tokens, last, now, budget), budget)
+            self._buckets[key] = (left, now)
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+            return allowed, retry
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SharedMemoryBucketStore:
+    """Buckets in a fixed-size mmap'd file shared by every worker on the host.
+
+    Keys hash into `slots` slots (colliding clients share a bucket); each slot is
+    locked with a byte-range `lockf` across processes plus a thread lock within one.
+    """
+
+    _SLOT = struct.Struct("dd")  # tokens, last refill time
+
+    def __init__(self, path: str, slots: int = 8192):
+        self._slots = slots
+        size = slots * self._SLOT.size
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, budget: Budget, now: float) -> Tuple[bool, float]:
+        import fcntl
+
+        slot = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") % self._slots
+        offset = slot * self._SLOT.size
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self._SLOT.size, offset, os.SEEK_SET)
+            try:
+                tokens, last = self._SLOT.unpack_from(self._map, offset)
+                allowed, left, retry = _decide(_refill(tokens, last, now, budget), budget)
+                self._SLOT.pack_into(self._map, offset, left, now)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._SLOT.size, offset, os.SEEK_SET)
+        return allowed, retry
+
+
+class RateLimiter:
+    """Token-bucket limiter keyed by route and client, installed as a before_request hook."""
+
+    def __init__(self, settings: Settings):
+        self._settings = settings
+        self.budgets = {
+            "listing": Budget.parse(settings.RATE_LIMIT_LISTING, Budget(rate=2.0, burst=20.0)),
+            "widget": Budget.parse(settings.RATE_LIMIT_WIDGET, Budget(rate=10.0, burst=60.0)),
+        }
+        if settings.RATE_LIMIT_BACKEND == "shm":
+            self._store = SharedMemoryBucketStore(settings.RATE_LIMIT_SHM_PATH)
+        else:
+            self._store = MemoryBucketStore()
+        self._api_keys = frozenset(settings.RATE_LIMIT_API_KEYS)
+        self._counter_lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def _client_key(self) -> str:
+        # Only configured keys get their own bucket; anything else a client sends is ignored,
+        # so rotating made-up keys does not buy fresh bursts.
+        api_key = request.headers.get("X-Api-Key")
+        if api_key and api_key in self._api_keys:
+            return f"key:{hashlib.blake2b(api_key.encode('utf-8'), digest_size=8).hexdigest()}"
+        if self._settings.RATE_LIMIT_TRUST_PROXY:
+            # The trusted proxy appends the address it saw; earlier entries are client-supplied.
+            forwarded = [a.strip() for a in request.headers.get("X-Forwarded-For", "").split(",") if a.strip()]
+            if forwarded:
+                return f"ip:{forwarded[-1]}"
+        return f"ip:{request.remote_addr or '-'}"
+
+    def _count(self, endpoint: str, outcome: str) -> None:
+        with self._counter_lock:
+            row = self.counters.setdefault(endpoint, {"allowed": 0, "limited": 0})
+            row[outcome] += 1
+
+    def before_request(self) -> Response | None:
+        """Return a 429 response when the caller's bucket for this route is empty."""
+        route_class = ROUTE_CLASSES.get(request.blueprint or "")
+        if route_class is None or request.endpoint is None:
+            return None
+
+        budget = self.budgets[route_class]
+        key = f"{request.endpoint}|{self._client_key()}"
+        allowed, retry_after = self._store.take(key, budget, time.time())
+        self._count(request.endpoint, "allowed" if allowed else "limited")
+        if allowed:
+            return None
+
+        resp = jsonify({"error": "rate limit exceeded", "retryAfter": round(retry_after, 3)})
+        resp.status_code = 429
+        resp.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return resp
+
+    def stats(self) -> dict:
+        """Per-worker limiter counters and the configured budgets."""
+        with self._counter_lock:
+            counters = {k: dict(v) for k, v in self.counters.items()}
+        return {
+            "pid": os.getpid(),
+            "backend": self._settings.RATE_LIMIT_BACKEND,
+            "budgets": {k: {"rate": b.rate, "burst": b.burst} for k, b in self.budgets.items()},
+            "routes": counters,
+            "totals": {
+                "allowed": sum(v["allowed"] for v in counters.values()),
+                "limited": sum(v["limited"] for v in counters.values()),
+            },
+        }
@@ -0,0 +1,125 @@
+"""In-flight coalescing of identical concurrent requests.
+
+The first GET for a route and normalized query string computes the response.
+Identical requests arriving while it runs wait (at most `COALESCE_WAIT_MS`)
+and are answered with a copy of its status, headers and body. Only workers
+that serve several requests at once (gthread, gevent) ever see duplicates.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, List, Tuple
+
+from flask import Response, g, request
+
+from app.configs.settings import Settings
+from app.services.request_timing import timed
+
+# Blueprints whose GET routes are coalesced.
+COALESCED_BLUEPRINTS = frozenset(("api", "table_widgets", "backglass_widgets", "activity_widgets"))
+
+# Per-request headers that must not be copied to the waiting requests.
+_OWN_HEADERS = frozenset(("server-timing", "timing-allow-origin", "content-length"))
+
+_Result = Tuple[int, List[Tuple[str, str]], bytes]
+
+
+class _Flight:
+    """One in-flight computation; `result` is None when it cannot be shared."""
+
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: _Result | None = None
+
+
+class RequestCoalescer:
+    """Installs before/after/teardown hooks that collapse duplicate in-flight requests."""
+
+    def __init__(self, settings: Settings):
+        self._wait_seconds = settings.COALESCE_WAIT_MS / 1000.0
+        self._lock = threading.Lock()
+        self._flights: Dict[tuple, _Flight] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, endpoint: str, outcome: str) -> None:
+        with self._lock:
+            row = self.counters.setdefault(endpoint, {"computed": 0, "collapsed": 0, "timedOut": 0, "unshared": 0})
+            row[outcome] += 1
+
+    @staticmethod
+    def _key() -> tuple | None:
+        if request.method != "GET" or request.blueprint not in COALESCED_BLUEPRINTS or request.endpoint is None:
+            return None
+        # Conditional requests get per-client answers (304 vs 200).
+        if request.if_none_match or request.if_modified_since:
+            return None
+        return request.path, tuple(sorted(request.args.items(multi=True)))
+
+    def before_request(self) -> Response | None:
+        """Become the leader for this key, or wait for the leader and reuse its response."""
+        key = self._key()
+        if key is None:
+            return None
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                self._flights[key] = _Flight()
+                g.coalesce_key = key
+        if flight is None:
+            self._count(request.endpoint, "computed")
+            return None
+
+        with timed("coalesce"):
+            finished = flight.done.wait(self._wait_seconds)
+        result = flight.result
+        if not finished or result is None:
+            # Compute it ourselves (without becoming a leader).
+            self._count(request.endpoint, "timedOut" if not finished else "unshared")
+            return None
+
+        self._count(request.endpoint, "collapsed")
+        status, headers, body = result
+        resp = Response(body, status=status, headers=headers)
+        resp.headers["X-Coalesced"] = "1"
+        return resp
+
+    def after_request(self, resp: Response) -> Response:
+        """Publish the leader's response to the requests waiting for it."""
+        key = g.pop("coalesce_key", None)
+        if key is not None:
+            result = None
+            if not resp.is_streamed and not resp.direct_passthrough:
+                headers = [(k, v) for k, v in resp.headers.items() if k.lower() not in _OWN_HEADERS]
+                result = (resp.status_code, headers, resp.get_data())
+            self._finish(key, result)
+        return resp
+
+    def teardown_request(self, exc: BaseException | None) -> None:
+        """Release the waiters when the leader failed before `after_request`."""
+        key = g.pop("coalesce_key", None)
+        if key is not None:
+            self._finish(key, None)
+
+    def _finish(self, key: tuple, result: _Result | None) -> None:
+        with self._lock:
+            flight = self._flights.pop(key, None)
+        if flight is not None:
+            flight.result = result
+            flight.done.set()
+
+    def stats(self) -> dict:
+        """Per-worker counters: computed (leaders), collapsed, timedOut and unshared waiters."""
+        with self._lock:
+            counters = {k: dict(v) for k, v in self.counters.items()}
+            in_flight = len(self._flights)
+        totals = {o: sum(v[o] for v in counters.values()) for o in ("computed", "collapsed", "timedOut", "unshared")}
+        return {
+            "pid": os.getpid(),
+            "waitMs": round(self._wait_seconds * 1000.0),
+            "inFlight": in_flight,
+            "routes": counters,
+            "totals": totals,
+        }
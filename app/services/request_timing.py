@@ -0,0 +1,83 @@
+"""Per-request stage timings: `Server-Timing` headers and a slow-request log.
+
+Code on the request path wraps its stages with `timed(name)` (a context
+manager, also usable as a decorator). Durations of the same stage add up.
+Outside a request, `timed` does nothing.
+"""
+from __future__ import annotations
+
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from flask import Response, g, has_request_context, request
+
+from app.configs.settings import Settings
+
+# Stage names in header/log order; unknown stages follow in first-seen order.
+STAGES = ("coalesce", "sync", "snapshot", "filter", "rows", "render")
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Add the wall time of the block to `stage` for the current request."""
+    stages: Dict[str, float] | None = getattr(g, "timing_stages", None) if has_request_context() else None
+    if stages is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[stage] = stages.get(stage, 0.0) + (time.perf_counter() - started)
+
+
+class RequestTiming:
+    """Installs the before/after request hooks that collect and report stage timings."""
+
+    def __init__(self, settings: Settings):
+        self._settings = settings
+
+    def before_request(self) -> None:
+        g.timing_started = time.perf_counter()
+        g.timing_stages = {}
+
+    def after_request(self, resp: Response) -> Response:
+        """Attach `Server-Timing` and log the breakdown when the request was slow.
+
+        For streamed responses this covers the time until the body starts.
+        """
+        started = getattr(g, "timing_started", None)
+        if started is None:
+            return resp
+        total = time.perf_counter() - started
+        stages: Dict[str, float] = g.timing_stages
+        ordered = [s for s in STAGES if s in stages] + [s for s in stages if s not in STAGES]
+
+        if self._settings.SERVER_TIMING_ENABLED:
+            parts = [f"{s};dur={stages[s] * 1000.0:.2f}" for s in ordered]
+            parts.append(f"total;dur={total * 1000.0:.2f}")
+            resp.headers["Server-Timing"] = ", ".join(parts)
+            # Lets dashboards embedding the widgets from another origin read the timings.
+            resp.headers["Timing-Allow-Origin"] = "*"
+
+        threshold_ms = self._settings.SLOW_REQUEST_MS
+        if threshold_ms > 0 and total * 1000.0 >= threshold_ms:
+            print(
+                json.dumps(
+                    {
+                        "event": "slow_request",
+                        "method": request.method,
+                        "route": request.url_rule.rule if request.url_rule is not None else request.path,
+                        "endpoint": request.endpoint,
+                        "status": resp.status_code,
+                        "query": request.args.to_dict(flat=False),
+                        "totalMs": round(total * 1000.0, 2),
+                        "stagesMs": {s: round(stages[s] * 1000.0, 2) for s in ordered},
+                    },
+                    separators=(",", ":"),
+                ),
+                flush=True,
+            )
+        return resp
@@ -0,0 +1,237 @@
+"""Deduplicated history of past dataset versions.
+
+Layout under `HISTORY_DIR`:
+    objects/<ab>/<sha256>.json   one raw game record (canonical JSON), stored once
+    versions/<lastUpdated>.json  manifest: the ordered list of record hashes
+
+A sync that changes a handful of games adds a manifest plus those few records.
+Reading a past version only touches its manifest and the records it lists.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Set
+
+from app.configs.settings import Settings
+from app.services.vpsdb_mapper import VpsDbMapper
+from app.utils.dates import epoch_to_dt
+
+# Historical snapshots kept built in memory per worker.
+_MAX_CACHED_SNAPSHOTS = 2
+# Past versions built at the same time per worker, and how long another one waits for a slot.
+_MAX_CONCURRENT_BUILDS = 1
+_BUILD_WAIT_SECONDS = 30.0
+
+
+class InvalidAsOfError(ValueError):
+    """Raised when an `asOf`/`since` value is neither an epoch nor an ISO-8601 date."""
+
+
+class HistoryNotFoundError(LookupError):
+    """Raised when history is disabled or holds no version at or before `asOf`."""
+
+
+class HistoryBusyError(RuntimeError):
+    """Raised when no past-version build slot frees up in time."""
+
+
+def parse_as_of(value: str, name: str = "asOf") -> datetime:
+    """Parse `asOf` (or another point-in-time param) as epoch (s/ms) or ISO-8601 date/datetime (UTC when naive)."""
+    v = (value or "").strip()
+    try:
+        dt = epoch_to_dt(int(v))
+    except ValueError:
+        try:
+            dt = datetime.fromisoformat(v.replace("Z", "+00:00"))
+        except ValueError:
+            dt = None
+        if dt is not None and dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+    if dt is None:
+        raise InvalidAsOfError(f"Invalid {name} {value!r}: expected epoch seconds/milliseconds or an ISO-8601 date")
+    return dt
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class SnapshotHistory:
+    """Records synced versions and rebuilds snapshots for past ones on demand."""
+
+    def __init__(self, settings: Settings):
+        self._settings = settings
+        self._root = settings.HISTORY_DIR
+        self._objects = os.path.join(self._root, "objects")
+        self._versions = os.path.join(self._root, "versions")
+        self._mapper = VpsDbMapper()
+        self._cache_lock = threading.Lock()
+        self._cache: "OrderedDict[int, Any]" = OrderedDict()
+        # Version -> build in progress; concurrent requests for it wait on the same one.
+        self._building: Dict[int, Future] = {}
+        self._build_slots = threading.BoundedSemaphore(_MAX_CONCURRENT_BUILDS)
+
+    @property
+    def enabled(self) -> bool:
+        return self._settings.HISTORY_VERSIONS > 0
+
+    # ---------- Writing (sync side) ----------
+
+    def has_version(self, timestamp: int) -> bool:
+        return os.path.exists(self._manifest_path(timestamp))
+
+    def record(self, raw: Any, timestamp: int) -> None:
+        """Store version `timestamp` of the parsed upstream JSON, then apply retention."""
+        import fcntl
+
+        items = [it for chunk in self._mapper.partition(raw, 1) for it in chunk]
+        os.makedirs(self._versions, exist_ok=True)
+        with open(os.path.join(self._root, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            hashes: List[str] = []
+            added = 0
+            for it in items:
+                body = json.dumps(it, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+                digest = hashlib.sha256(body).hexdigest()
+                path = self._object_path(digest)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    _write_atomic(path, body)
+                    added += 1
+                hashes.append(digest)
+
+            manifest = {"lastUpdated": int(timestamp), "recordedAt": time.time(), "games": hashes}
+            _write_atomic(self._manifest_path(timestamp), json.dumps(manifest, separators=(",", ":")).encode("utf-8"))
+            removed = self._prune()
+        print(f"History: recorded version {timestamp} ({len(hashes)} games, {added} new records, {removed} pruned)")
+
+    def _prune(self) -> int:
+        """Drop versions beyond retention and the records no remaining version uses."""
+        stamps = self.versions()
+        keep = stamps[-self._settings.HISTORY_VERSIONS :]
+        max_age_days = self._settings.HISTORY_MAX_AGE_DAYS
+        if max_age_days > 0:
+            cutoff = time.time() - max_age_days * 86400
+            # Never drop the newest version, however old it is.
+            keep = [ts for ts in keep if ts == stamps[-1] or self._recorded_at(ts) >= cutoff]
+        for ts in set(stamps) - set(keep):
+            os.remove(self._manifest_path(ts))
+        if len(keep) == len(stamps):
+            return 0
+
+        live: Set[str] = set()
+        for ts in keep:
+            live.update(self._manifest(ts)["games"])
+        removed = 0
+        for sub in os.listdir(self._objects) if os.path.isdir(self._objects) else []:
+            for name in os.listdir(os.path.join(self._objects, sub)):
+                if name.endswith(".json") and name[: -len(".json")] not in live:
+                    os.remove(os.path.join(self._objects, sub, name))
+                    removed += 1
+        return removed
+
+    # ---------- Reading (request side) ----------
+
+    def versions(self) -> List[int]:
+        """Recorded versions (upstream lastUpdated), oldest first."""
+        try:
+            names = os.listdir(self._versions)
+        except FileNotFoundError:
+            return []
+        return sorted(int(n[: -len(".json")]) for n in names if n.endswith(".json") and n[:-5].isdigit())
+
+    def resolve(self, as_of: datetime) -> int:
+        """Return the newest version published at or before `as_of`."""
+        match = None
+        for ts in self.versions():
+            dt = epoch_to_dt(ts)
+            if dt is not None and dt <= as_of:
+                match = ts
+        if match is None:
+            raise HistoryNotFoundError(f"No recorded version at or before {as_of.isoformat()}")
+        return match
+
+    def snapshot_as_of(self, as_of: str) -> Any:
+        """Return a (cached) in-memory snapshot for the version current at `as_of`.
+
+        Each version is built once however many requests ask for it at the same
+        time, and at most `_MAX_CONCURRENT_BUILDS` versions are built at once.
+        """
+        if not self.enabled:
+            raise HistoryNotFoundError("Snapshot history is disabled (VPSDB_HISTORY_VERSIONS=0)")
+        ts = self.resolve(parse_as_of(as_of))
+        with self._cache_lock:
+            snap = self._cache.get(ts)
+            if snap is not None:
+                self._cache.move_to_end(ts)
+                return snap
+            pending = self._building.get(ts)
+            leader = pending is None
+            if leader:
+                pending = self._building[ts] = Future()
+
+        if not leader:
+            return pending.result()
+        try:
+            snap = self._build(ts)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._cache_lock:
+                self._building.pop(ts, None)
+        pending.set_result(snap)
+        return snap
+
+    def _build(self, ts: int) -> Any:
+        from app.services.game_snapshot import GameSnapshot
+
+        if not self._build_slots.acquire(timeout=_BUILD_WAIT_SECONDS):
+            raise HistoryBusyError("Another past version is being built; retry shortly")
+        try:
+            items = [self._read_object(h) for h in self._manifest(ts)["games"]]
+            snap = GameSnapshot.build((ts, 0, 0), self._mapper.map_games(items), prefill_rows=False)
+        finally:
+            self._build_slots.release()
+        with self._cache_lock:
+            self._cache[ts] = snap
+            while len(self._cache) > _MAX_CACHED_SNAPSHOTS:
+                self._cache.popitem(last=False)
+        return snap
+
+    def cached_snapshots(self) -> List[Any]:
+        """Past-version snapshots currently held in memory."""
+        with self._cache_lock:
+            return list(self._cache.values())
+
+    # ---------- Internals ----------
+
+    def _manifest_path(self, timestamp: int) -> str:
+        return os.path.join(self._versions, f"{int(timestamp)}.json")
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self._objects, digest[:2], f"{digest}.json")
+
+    def _manifest(self, timestamp: int) -> Dict[str, Any]:
+        with open(self._manifest_path(timestamp), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _recorded_at(self, timestamp: int) -> float:
+        try:
+            return float(self._manifest(timestamp).get("recordedAt") or 0.0)
+        except (OSError, ValueError):
+            return 0.0
+
+    def _read_object(self, digest: str) -> Dict[str, Any]:
+        with open(self._object_path(digest), "r", encoding="utf-8") as f:
+            return json.load(f)
@@ -0,0 +1,608 @@
+"""SQLite-backed snapshot store for low-memory deployments.
+
+`vpsdb.json` is ingested once per dataset version into an indexed SQLite file in
+`STORAGE_DIR`; queries then run as SQL and only the requested page is turned
+into model objects. Workers share the file through the OS page cache (mmap)
+instead of each holding the full mapped `Game` graph.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from app.configs.settings import Settings
+from app.models.game import Game, SortField
+from app.models.game_back_glass import GameBackGlass
+from app.models.game_item_url import GameItemUrl
+from app.models.game_table import GameTable
+from app.services.game_facets import FACET_NAMES, GameFacets
+from app.services.game_index import GameQuery
+from app.services.widget_view import WidgetViewRows
+from app.utils.strings import norm_key
+
+SCHEMA_VERSION = "1"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MIN_KEY = -(2**62)
+_CHUNK = 500
+_MAX_FILTERED_FACETS = 64
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+
+CREATE TABLE games (
+    rid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    name TEXT,
+    manufacturer TEXT,
+    manufacturer_norm TEXT,
+    year INTEGER,
+    created_at TEXT,
+    updated_at TEXT,
+    created_key INTEGER NOT NULL,
+    updated_key INTEGER NOT NULL,
+    has_url INTEGER NOT NULL
+);
+
+CREATE TABLE table_files (
+    rid INTEGER PRIMARY KEY,
+    game_rid INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    version TEXT,
+    table_format TEXT,
+    format_norm TEXT,
+    img_url TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    created_key INTEGER NOT NULL,
+    updated_key INTEGER NOT NULL,
+    game_id TEXT,
+    game_name TEXT,
+    game_manufacturer TEXT,
+    game_manufacturer_norm TEXT,
+    game_year INTEGER,
+    has_url INTEGER NOT NULL
+);
+
+CREATE TABLE b2s_files (
+    rid INTEGER PRIMARY KEY,
+    game_rid INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    version TEXT,
+    img_url TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    created_key INTEGER NOT NULL,
+    updated_key INTEGER NOT NULL,
+    game_id TEXT,
+    game_name TEXT,
+    game_manufacturer TEXT,
+    game_manufacturer_norm TEXT,
+    game_year INTEGER,
+    has_url INTEGER NOT NULL
+);
+
+CREATE TABLE urls (kind TEXT NOT NULL, item_rid INTEGER NOT NULL, url TEXT NOT NULL, broken INTEGER NOT NULL, priority INTEGER NOT NULL);
+CREATE TABLE authors (kind TEXT NOT NULL, item_rid INTEGER NOT NULL, game_rid INTEGER NOT NULL, pos INTEGER NOT NULL, author TEXT NOT NULL, author_norm TEXT NOT NULL);
+CREATE TABLE features (bg_rid INTEGER NOT NULL, game_rid INTEGER NOT NULL, pos INTEGER NOT NULL, feature TEXT NOT NULL, feature_norm TEXT NOT NULL);
+
+CREATE INDEX ix_games_created ON games (created_key DESC, rid);
+CREATE INDEX ix_games_updated ON games (updated_key DESC, rid);
+CREATE INDEX ix_games_mfr ON games (manufacturer_norm);
+CREATE INDEX ix_games_year ON games (year);
+CREATE INDEX ix_tables_created ON table_files (created_key DESC, rid);
+CREATE INDEX ix_tables_updated ON table_files (updated_key DESC, rid);
+CREATE INDEX ix_tables_game ON table_files (game_rid);
+CREATE INDEX ix_tables_format ON table_files (format_norm);
+CREATE INDEX ix_tables_mfr ON table_files (game_manufacturer_norm);
+CREATE INDEX ix_tables_year ON table_files (game_year);
+CREATE INDEX ix_bgs_created ON b2s_files (created_key DESC, rid);
+CREATE INDEX ix_bgs_updated ON b2s_files (updated_key DESC, rid);
+CREATE INDEX ix_bgs_game ON b2s_files (game_rid);
+CREATE INDEX ix_bgs_mfr ON b2s_files (game_manufacturer_norm);
+CREATE INDEX ix_bgs_year ON b2s_files (game_year);
+CREATE INDEX ix_urls_item ON urls (kind, item_rid, priority);
+CREATE INDEX ix_authors_item ON authors (kind, item_rid, pos);
+CREATE INDEX ix_authors_norm ON authors (author_norm, kind);
+CREATE INDEX ix_features_bg ON features (bg_rid, pos);
+CREATE INDEX ix_features_norm ON features (feature_norm);
+"""
+
+
+def _dt_key(dt: datetime | None) -> int:
+    """Exact microsecond sort key; None sorts last (matches comparators)."""
+    if not isinstance(dt, datetime):
+        return _MIN_KEY
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _iso(dt: datetime | None) -> str | None:
+    return dt.isoformat() if dt is not None else None
+
+
+def _from_iso(v: str | None) -> datetime | None:
+    return datetime.fromisoformat(v) if v else None
+
+
+def _has_working_url(urls: Iterable[GameItemUrl]) -> int:
+    return int(any(u.url and not u.broken for u in urls))
+
+
+def _version_str(version: Tuple[int, int, int]) -> str:
+    return ":".join(str(v) for v in version)
+
+
+def _chunks(values: Sequence, size: int = _CHUNK) -> Iterable[Sequence]:
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+# ---------- Ingestion ----------
+
+
+def ingest(path: str, version: Tuple[int, int, int], games: List[Game]) -> None:
+    """Write mapped games into a fresh SQLite file and atomically move it into place."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(_SCHEMA)
+
+        game_rows, table_rows, bg_rows, url_rows, author_rows, feature_rows = [], [], [], [], [], []
+        t_rid = 0
+        b_rid = 0
+        for g_rid, g in enumerate(games):
+            game_rows.append(
+                (
+                    g_rid, g.id, g.name, g.manufacturer, norm_key(g.manufacturer) or None, g.year,
+                    _iso(g.createdAt), _iso(g.updatedAt), _dt_key(g.createdAt), _dt_key(g.updatedAt),
+                    int(any(_has_working_url(c.urls) for c in (*g.tableFiles, *g.b2sFiles))),
+                )
+            )
+            for t in g.tableFiles:
+                table_rows.append(
+                    (
+                        t_rid, g_rid, t.id, t.version, t.tableFormat, norm_key(t.tableFormat) or None, t.imgUrl,
+                        _iso(t.createdAt), _iso(t.updatedAt), _dt_key(t.createdAt), _dt_key(t.updatedAt),
+                        t.gameId, t.gameName, t.gameManufacturer, norm_key(t.gameManufacturer) or None, t.gameYear,
+                        _has_working_url(t.urls),
+                    )
+                )
+                url_rows.extend(("t", t_rid, u.url, int(u.broken), u.priority) for u in t.urls)
+                author_rows.extend(("t", t_rid, g_rid, i, a, norm_key(a)) for i, a in enumerate(t.authors))
+                t_rid += 1
+            for b in g.b2sFiles:
+                bg_rows.append(
+                    (
+                        b_rid, g_rid, b.id, b.version, b.imgUrl,
+                        _iso(b.createdAt), _iso(b.updatedAt), _dt_key(b.createdAt), _dt_key(b.updatedAt),
+                        b.gameId, b.gameName, b.gameManufacturer, norm_key(b.gameManufacturer) or None, b.gameYear,
+                        _has_working_url(b.urls),
+                    )
+                )
+                url_rows.extend(("b", b_rid, u.url, int(u.broken), u.priority) for u in b.urls)
+                author_rows.extend(("b", b_rid, g_rid, i, a, norm_key(a)) for i, a in enumerate(b.authors))
+                feature_rows.extend((b_rid, g_rid, i, x, norm_key(x)) for i, x in enumerate(b.features))
+                b_rid += 1
+
+        conn.executemany("INSERT INTO games VALUES (?,?,?,?,?,?,?,?,?,?,?)", game_rows)
+        conn.executemany("INSERT INTO table_files VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", table_rows)
+        conn.executemany("INSERT INTO b2s_files VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", bg_rows)
+        conn.executemany("INSERT INTO urls VALUES (?,?,?,?,?)", url_rows)
+        conn.executemany("INSERT INTO authors VALUES (?,?,?,?,?,?)", author_rows)
+        conn.executemany("INSERT INTO features VALUES (?,?,?,?,?)", feature_rows)
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [("schema", SCHEMA_VERSION), ("version", _version_str(version)), ("built_at", str(time.time()))],
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, path)
+
+
+def _read_meta(path: str) -> Dict[str, str]:
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}
+
+
+# ---------- Query translation ----------
+
+
+def _in(column: str, values: Sequence[object]) -> Tuple[str, List[object]]:
+    return f"{column} IN ({','.join('?' * len(values))})", list(values)
+
+
+def _year_clause(column: str, query: GameQuery) -> Tuple[str, List[object]] | None:
+    if query.year_from is None and query.year_to is None:
+        return None
+    lo = query.year_from if query.year_from is not None else -(10**9)
+    hi = query.year_to if query.year_to is not None else 10**9
+    return f"{column} BETWEEN ? AND ?", [lo, hi]
+
+
+def _where(kind: str, query: GameQuery) -> Tuple[str, List[object]]:
+    """Build a WHERE clause for games/table_files/b2s_files aliased as `x`."""
+    parts: List[Tuple[str, List[object]]] = []
+
+    if kind == "games":
+        if query.formats:
+            sql, p = _in("t.format_norm", query.formats)
+            parts.append((f"EXISTS (SELECT 1 FROM table_files t WHERE t.game_rid = x.rid AND {sql})", p))
+        if query.features:
+            sql, p = _in("f.feature_norm", query.features)
+            parts.append((f"EXISTS (SELECT 1 FROM features f WHERE f.game_rid = x.rid AND {sql})", p))
+        if query.manufacturers:
+            parts.append(_in("x.manufacturer_norm", query.manufacturers))
+        year = _year_clause("x.year", query)
+        if query.authors:
+            sql, p = _in("a.author_norm", query.authors)
+            parts.append((f"EXISTS (SELECT 1 FROM authors a WHERE a.game_rid = x.rid AND {sql})", p))
+    else:
+        code = "t" if kind == "table_files" else "b"
+        if query.formats and kind == "table_files":
+            parts.append(_in("x.format_norm", query.formats))
+        if query.features and kind == "b2s_files":
+            sql, p = _in("f.feature_norm", query.features)
+            parts.append((f"EXISTS (SELECT 1 FROM features f WHERE f.bg_rid = x.rid AND {sql})", p))
+        if query.manufacturers:
+            parts.append(_in("x.game_manufacturer_norm", query.manufacturers))
+        year = _year_clause("x.game_year", query)
+        if query.authors:
+            sql, p = _in("a.author_norm", query.authors)
+            parts.append(
+                (f"EXISTS (SELECT 1 FROM authors a WHERE a.kind = '{code}' AND a.item_rid = x.rid AND {sql})", p)
+            )
+
+    if year is not None:
+        parts.append(year)
+    if query.has_url is not None:
+        parts.append(("x.has_url = ?", [int(query.has_url)]))
+
+    if not parts:
+        return "1", []
+    joiner = " OR " if query.match == "any" else " AND "
+    return joiner.join(f"({sql})" for sql, _ in parts), [p for _, params in parts for p in params]
+
+
+class SqliteGameIndex:
+    """SQL implementation of the `GameIndex` query interface."""
+
+    def __init__(self, connect):
+        self._connect = connect
+
+    def _execute(
+        self, kind: str, query: GameQuery, limit: int | None, sort: SortField, offset: int
+    ) -> sqlite3.Cursor:
+        key = "created_key" if sort == "createdAt" else "updated_key"
+        where, params = _where(kind, query)
+        sql = f"SELECT x.* FROM {kind} x WHERE {where} ORDER BY x.{key} DESC, x.rid"
+        if limit or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit or -1, offset])
+        return self._connect().execute(sql, params)
+
+    def _select(self, kind: str, query: GameQuery, limit: int | None, sort: SortField, offset: int) -> List[sqlite3.Row]:
+        return self._execute(kind, query, limit, sort, offset).fetchall()
+
+    def _scan(
+        self, kind: str, query: GameQuery, sort: SortField, offset: int, hydrate: Callable[[Sequence[sqlite3.Row]], List]
+    ) -> Iterator:
+        """Run the query once and hydrate its rows in batches (doubling up to `_CHUNK`)."""
+        cursor = self._execute(kind, query, None, sort, offset)
+        batch = 32
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                return
+            yield from hydrate(rows)
+            batch = min(batch * 2, _CHUNK)
+
+    def games(
+        self, query: GameQuery, limit: int | None = None, sort: SortField = "updatedAt", offset: int = 0
+    ) -> List[Game]:
+        return self._hydrate_games(self._select("games", query, limit, sort, offset))
+
+    def tables(
+        self, query: GameQuery, limit: int | None = None, sort: SortField = "createdAt", offset: int = 0
+    ) -> List[GameTable]:
+        return self._hydrate_tables(self._select("table_files", query, limit, sort, offset))
+
+    def backglasses(
+        self, query: GameQuery, limit: int | None = None, sort: SortField = "updatedAt", offset: int = 0
+    ) -> List[GameBackGlass]:
+        return self._hydrate_backglasses(self._select("b2s_files", query, limit, sort, offset))
+
+    def iter_games(self, query: GameQuery, sort: SortField = "updatedAt", offset: int = 0) -> Iterator[Game]:
+        return self._scan("games", query, sort, offset, self._hydrate_games)
+
+    def iter_tables(self, query: GameQuery, sort: SortField = "createdAt", offset: int = 0) -> Iterator[GameTable]:
+        return self._scan("table_files", query, sort, offset, self._hydrate_tables)
+
+    def iter_backglasses(
+        self, query: GameQuery, sort: SortField = "updatedAt", offset: int = 0
+    ) -> Iterator[GameBackGlass]:
+        return self._scan("b2s_files", query, sort, offset, self._hydrate_backglasses)
+
+    def games_by_ids(self, ids: Sequence[str]) -> List[Game]:
+        """Return games for ids, in the order given."""
+        rows: List[sqlite3.Row] = []
+        for chunk in _chunks(list(ids)):
+            sql, params = _in("id", chunk)
+            rows.extend(self._connect().execute(f"SELECT * FROM games WHERE {sql}", params).fetchall())
+        by_id = {g.id: g for g in self._hydrate_games(rows)}
+        return [by_id[i] for i in ids if i in by_id]
+
+    # ---------- Hydration ----------
+
+    def _children(self, sql: str, rids: Sequence[int], extra: Sequence[object] = ()) -> Dict[int, List[sqlite3.Row]]:
+        out: Dict[int, List[sqlite3.Row]] = {}
+        for chunk in _chunks(list(rids)):
+            in_sql, params = _in("item_rid", chunk)
+            for r in self._connect().execute(sql.format(in_sql=in_sql), [*extra, *params]):
+                out.setdefault(r[0], []).append(r)
+        return out
+
+    def _item_children(self, code: str, rids: Sequence[int]):
+        urls = self._children(
+            "SELECT item_rid, url, broken, priority FROM urls WHERE kind = ? AND {in_sql} ORDER BY item_rid, priority",
+            rids,
+            (code,),
+        )
+        authors = self._children(
+            "SELECT item_rid, author FROM authors WHERE kind = ? AND {in_sql} ORDER BY item_rid, pos", rids, (code,)
+        )
+        return urls, authors
+
+    def _hydrate_tables(self, rows: Sequence[sqlite3.Row]) -> List[GameTable]:
+        rids = [r["rid"] for r in rows]
+        urls, authors = self._item_children("t", rids)
+        return [
+            GameTable(
+                id=r["id"],
+                version=r["version"],
+                tableFormat=r["table_format"],
+                authors=[a[1] for a in authors.get(r["rid"], [])],
+                imgUrl=r["img_url"],
+                urls=[GameItemUrl(url=u[1], broken=bool(u[2]), priority=u[3]) for u in urls.get(r["rid"], [])],
+                createdAt=_from_iso(r["created_at"]),
+                updatedAt=_from_iso(r["updated_at"]),
+                gameId=r["game_id"],
+                gameName=r["game_name"],
+                gameManufacturer=r["game_manufacturer"],
+                gameYear=r["game_year"],
+            )
+            for r in rows
+        ]
+
+    def _hydrate_backglasses(self, rows: Sequence[sqlite3.Row]) -> List[GameBackGlass]:
+        rids = [r["rid"] for r in rows]
+        urls, authors = self._item_children("b", rids)
+        features: Dict[int, List[str]] = {}
+        for chunk in _chunks(rids):
+            in_sql, params = _in("bg_rid", chunk)
+            for rid, feature in self._connect().execute(
+                f"SELECT bg_rid, feature FROM features WHERE {in_sql} ORDER BY bg_rid, pos", params
+            ):
+                features.setdefault(rid, []).append(feature)
+        return [
+            GameBackGlass(
+                id=r["id"],
+                version=r["version"],
+                authors=[a[1] for a in authors.get(r["rid"], [])],
+                features=features.get(r["rid"], []),
+                imgUrl=r["img_url"],
+                urls=[GameItemUrl(url=u[1], broken=bool(u[2]), priority=u[3]) for u in urls.get(r["rid"], [])],
+                createdAt=_from_iso(r["created_at"]),
+                updatedAt=_from_iso(r["updated_at"]),
+                gameId=r["game_id"],
+                gameName=r["game_name"],
+                gameManufacturer=r["game_manufacturer"],
+                gameYear=r["game_year"],
+            )
+            for r in rows
+        ]
+
+    def _hydrate_games(self, rows: Sequence[sqlite3.Row]) -> List[Game]:
+        games = {
+            r["rid"]: Game(
+                id=r["id"],
+                name=r["name"],
+                manufacturer=r["manufacturer"],
+                year=r["year"],
+                createdAt=_from_iso(r["created_at"]),
+                updatedAt=_from_iso(r["updated_at"]),
+            )
+            for r in rows
+        }
+        for kind, attr, hydrate in (
+            ("table_files", "tableFiles", self._hydrate_tables),
+            ("b2s_files", "b2sFiles", self._hydrate_backglasses),
+        ):
+            child_rows: List[sqlite3.Row] = []
+            for chunk in _chunks(list(games)):
+                in_sql, params = _in("game_rid", chunk)
+                child_rows.extend(
+                    self._connect().execute(f"SELECT * FROM {kind} WHERE {in_sql} ORDER BY rid", params).fetchall()
+                )
+            for row, child in zip(child_rows, hydrate(child_rows)):
+                getattr(games[row["game_rid"]], attr).append(child)
+        return list(games.values())
+
+
+class SqliteSnapshot:
+    """Snapshot backed by an on-disk SQLite file instead of an in-memory model graph."""
+
+    def __init__(self, path: str, version: Tuple[int, int, int], built_at: float):
+        self.path = path
+        self.version = version
+        self.built_at = built_at
+        # Keep the inode we opened: a later re-ingest replaces the path, not this file.
+        self._fd = os.open(path, os.O_RDONLY)
+        self._local = threading.local()
+        self.index = SqliteGameIndex(self._connect)
+        self.facets = self._facets(GameQuery())
+        self._filtered_facets: "OrderedDict[GameQuery, GameFacets]" = OrderedDict()
+        self._facet_lock = threading.Lock()
+        # Filled as widgets request rows (models are hydrated per query).
+        self.widget_rows = WidgetViewRows()
+
+    @classmethod
+    def open_or_build(
+        cls, settings: Settings, version: Tuple[int, int, int], load_games
+    ) -> "SqliteSnapshot":
+        """Reuse the SQLite file for this version, or ingest it (once across workers)."""
+        meta = cls.ensure_file(settings, version, load_games)
+        return cls(settings.SQLITE_PATH, version, float(meta.get("built_at", time.time())))
+
+    @staticmethod
+    def ensure_file(settings: Settings, version: Tuple[int, int, int], load_games) -> Dict[str, str]:
+        """Make sure the SQLite file holds `version`, ingesting under a cross-process lock."""
+        path = settings.SQLITE_PATH
+        wanted = _version_str(version)
+
+        def current() -> Dict[str, str]:
+            meta = _read_meta(path)
+            return meta if meta.get("version") == wanted and meta.get("schema") == SCHEMA_VERSION else {}
+
+        meta = current()
+        if not meta:
+            import fcntl
+
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(f"{path}.lock", "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                meta = current()
+                if not meta:
+                    ingest(path, version, load_games())
+                    meta = current()
+        return meta
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:/dev/fd/{self._fd}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA mmap_size = 268435456")
+            conn.execute("PRAGMA cache_size = -2000")
+            self._local.conn = conn
+        return conn
+
+    def __del__(self):
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+    @property
+    def timestamp(self) -> int:
+        return self.version[0]
+
+    @property
+    def game_count(self) -> int:
+        return int(self._connect().execute("SELECT COUNT(*) FROM games").fetchone()[0])
+
+    def row_counts(self) -> Dict[str, int]:
+        """Stored games, tables, backglasses and URLs."""
+        conn = self._connect()
+        return {
+            name: int(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0])
+            for name, table in (("games", "games"), ("tables", "table_files"), ("backglasses", "b2s_files"), ("urls", "urls"))
+        }
+
+    @property
+    def games(self) -> List[Game]:
+        """Hydrate every game (expensive; listings should use `index`)."""
+        return self.index.games(GameQuery(), sort="updatedAt")
+
+    def facets_for(self, query: GameQuery) -> GameFacets:
+        """Return facets restricted by a query, cached per snapshot (one result per query for all callers)."""
+        if query.is_empty():
+            return self.facets
+        with self._facet_lock:
+            cached = self._filtered_facets.get(query)
+            if cached is not None:
+                self._filtered_facets.move_to_end(query)
+                return cached
+        built = self._facets(query)
+        with self._facet_lock:
+            built = self._filtered_facets.setdefault(query, built)
+            while len(self._filtered_facets) > _MAX_FILTERED_FACETS:
+                self._filtered_facets.popitem(last=False)
+        return built
+
+    def _facets(self, query: GameQuery) -> GameFacets:
+        """Compute facet counts with GROUP BY over the rows matching the query."""
+        conn = self._connect()
+        g_where, g_params = _where("games", query)
+        t_where, t_params = _where("table_files", query)
+        b_where, b_params = _where("b2s_files", query)
+        g_set = f"SELECT x.rid FROM games x WHERE {g_where}"
+        # Children only count under matching games (see `GameSnapshot.facets_for`).
+        t_set = f"SELECT x.rid FROM table_files x WHERE ({t_where}) AND x.game_rid IN ({g_set})"
+        b_set = f"SELECT x.rid FROM b2s_files x WHERE ({b_where}) AND x.game_rid IN ({g_set})"
+        t_params = [*t_params, *g_params]
+        b_params = [*b_params, *g_params]
+
+        def ranked(sql: str, params: List[object]) -> List[Tuple[object, int]]:
+            return [(label, count) for label, count, _ in conn.execute(sql, params)]
+
+        facets = {
+            "manufacturer": ranked(
+                f"SELECT TRIM(manufacturer), COUNT(*) c, manufacturer_norm k FROM games WHERE rid IN ({g_set}) "
+                "AND manufacturer_norm IS NOT NULL GROUP BY k ORDER BY c DESC, k",
+                g_params,
+            ),
+            "year": ranked(
+                f"SELECT year, COUNT(*) c, CAST(year AS TEXT) k FROM games WHERE rid IN ({g_set}) "
+                "AND year IS NOT NULL GROUP BY k ORDER BY c DESC, k",
+                g_params,
+            ),
+            "decade": ranked(
+                f"SELECT (year / 10 * 10) || 's' d, COUNT(*) c, (year / 10 * 10) || 's' k FROM games "
+                f"WHERE rid IN ({g_set}) AND year IS NOT NULL GROUP BY k ORDER BY c DESC, k",
+                g_params,
+            ),
+            "format": ranked(
+                f"SELECT TRIM(table_format), COUNT(*) c, format_norm k FROM table_files WHERE rid IN ({t_set}) "
+                "AND format_norm IS NOT NULL GROUP BY k ORDER BY c DESC, k",
+                t_params,
+            ),
+            "feature": ranked(
+                f"SELECT TRIM(feature), COUNT(*) c, feature_norm k FROM features WHERE bg_rid IN ({b_set}) "
+                "AND feature_norm != '' GROUP BY k ORDER BY c DESC, k",
+                b_params,
+            ),
+            "author": ranked(
+                f"SELECT TRIM(author), COUNT(*) c, author_norm k FROM authors "
+                f"WHERE ((kind = 't' AND item_rid IN ({t_set})) OR (kind = 'b' AND item_rid IN ({b_set}))) "
+                "AND author_norm != '' GROUP BY k ORDER BY c DESC, k",
+                [*t_params, *b_params],
+            ),
+        }
+        totals = {
+            "games": conn.execute(f"SELECT COUNT(*) FROM ({g_set})", g_params).fetchone()[0],
+            "tables": conn.execute(f"SELECT COUNT(*) FROM ({t_set})", t_params).fetchone()[0],
+            "backglasses": conn.execute(f"SELECT COUNT(*) FROM ({b_set})", b_params).fetchone()[0],
+        }
+        return GameFacets(totals=totals, ranked={n: facets[n] for n in FACET_NAMES})
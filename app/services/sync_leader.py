@@ -0,0 +1,146 @@
+"""One upstream sync leader per shared storage dir, across processes and containers.
+
+Every process that mounts `STORAGE_DIR` competes for `.sync.lease`, a small
+JSON file naming a holder and an expiry. Changes to it are made under an
+flock on `.sync.lease.lock`. The holder renews the lease every third of
+`VPSDB_SYNC_LEASE_TTL_SECONDS` and is the only process that checks upstream.
+The other processes (followers) only reload when the leader publishes a new
+manifest. If the leader dies, its lease expires and the next follower to
+tick takes over.
+
+The flock is only reliable when all containers share one kernel (bind mounts
+or local volumes on one host). On network filesystems, keep one sync sidecar
+instead (see `app.tools.sync_sidecar`).
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+from app.configs.settings import Settings
+from app.services.vpsdb_manifest import holder_id
+from app.utils.file_lock import file_lock
+
+
+class SyncLease:
+    """The lease file: acquire/renew, release and read."""
+
+    def __init__(self, settings: Settings):
+        self._path = os.path.join(settings.STORAGE_DIR, ".sync.lease")
+        self._lock_path = os.path.join(settings.STORAGE_DIR, ".sync.lease.lock")
+        self._ttl = float(settings.SYNC_LEASE_TTL_SECONDS)
+        self.holder = holder_id()
+
+    def read(self) -> Dict[str, Any] | None:
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return payload if isinstance(payload, dict) else None
+
+    def try_acquire(self) -> Dict[str, Any] | None:
+        """Take or renew the lease; return it when this process holds it, else None."""
+        os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+        with file_lock(self._lock_path):
+            now = time.time()
+            current = self.read()
+            if current is not None and current.get("holder") != self.holder and current.get("expiresAt", 0) > now:
+                return None
+            ours = current is not None and current.get("holder") == self.holder
+            lease = {
+                "holder": self.holder,
+                "acquiredAt": current.get("acquiredAt", now) if ours else now,
+                "renewedAt": now,
+                "expiresAt": now + self._ttl,
+            }
+            tmp_path = f"{self._path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(lease, f)
+            os.replace(tmp_path, self._path)
+            return lease
+
+    def release(self) -> None:
+        """Give the lease up (when held), so a follower can take over without waiting for the TTL."""
+        with file_lock(self._lock_path):
+            current = self.read()
+            if current is not None and current.get("holder") == self.holder:
+                os.remove(self._path)
+
+
+@dataclass
+class LeadershipState:
+    """Observable leadership of this process (reported by /ready)."""
+
+    leader: bool = False
+    expires_at: float | None = None
+    changes: int = 0
+    last_error: str | None = None
+
+    def to_dict(self) -> dict:
+        return {"leader": self.leader, "expiresAt": self.expires_at, "changes": self.changes, "lastError": self.last_error}
+
+
+class SyncLeadership:
+    """Background thread that keeps the lease and runs the leader's syncs."""
+
+    def __init__(self, settings: Settings):
+        self._lease = SyncLease(settings)
+        self._interval = max(1.0, settings.SYNC_LEASE_TTL_SECONDS / 3.0)
+        self._stop = threading.Event()
+        self.state = LeadershipState()
+
+    @property
+    def holder(self) -> str:
+        return self._lease.holder
+
+    @property
+    def is_leader(self) -> bool:
+        """Held and not yet expired (a leader that failed to renew steps down by itself)."""
+        expires = self.state.expires_at
+        return self.state.leader and expires is not None and time.time() < expires
+
+    def start(self, on_leader_tick: Callable[[], Any]) -> None:
+        """Compete for the lease now, then every TTL/3; `on_leader_tick` runs on every tick while leading."""
+        self._tick()
+        atexit.register(self.stop)
+        threading.Thread(target=self._loop, args=(on_leader_tick,), name="vpsdb-lease", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self.state.leader:
+            try:
+                self._lease.release()
+            except OSError:
+                pass
+            self.state.leader = False
+
+    def _loop(self, on_leader_tick: Callable[[], Any]) -> None:
+        while True:
+            if self.is_leader:
+                on_leader_tick()
+            if self._stop.wait(self._interval):
+                return
+            self._tick()
+
+    def _tick(self) -> None:
+        try:
+            lease = self._lease.try_acquire()
+            self.state.last_error = None
+        except OSError as e:
+            lease = None
+            self.state.last_error = str(e)
+        leader = lease is not None
+        if leader != self.state.leader:
+            self.state.changes += 1
+            print(f"Sync leadership {'acquired' if leader else 'lost'} by {self.holder}")
+        self.state.leader = leader
+        self.state.expires_at = lease["expiresAt"] if lease else None
+
+    def stats(self) -> dict:
+        return {**self.state.to_dict(), "holder": self.holder, "lease": self._lease.read()}
@@ -1,54 +1,39 @@
 from __future__ import annotations
 
 import json
-import time
-from dataclasses import dataclass
+import os
 from typing import Any
 
 from app.configs.settings import Settings
 from app.services.vpsdb_sync_service import VpsDbSyncService
-
-
-@dataclass
-class CachedPayload:
-    """Simple in-memory cache payload."""
-    loaded_at: float
-    data: Any
+from app.utils import compression
 
 
 class VpsDbLoader:
-    """Loads VPSDB JSON from a **local** copy, syncing from remote when needed."""
+    """Reads the **local** VPSDB copy; syncing is done by `BackgroundSync`."""
 
     def __init__(self, settings: Settings):
         self._settings = settings
-        self._cache: CachedPayload | None = None
         self._sync = VpsDbSyncService(settings)
 
-    def _cache_valid(self) -> bool:
-        """Return True when cache exists and is within TTL."""
-        if not self._cache:
-            return False
-        age = time.time() - self._cache.loaded_at
-        return age < self._settings.CACHE_TTL_SECONDS
-
-    def load_raw(self) -> Any:
-        """Return the raw parsed JSON with caching."""
-        if self._cache_valid():
-            return self._cache.data
-
-        data = self._load_uncached()
-        self._cache = CachedPayload(loaded_at=time.time(), data=data)
-        return data
-
-    def _load_uncached(self) -> Any:
-        """Load JSON from disk, syncing first if configured."""
-        if self._settings.SYNC_ON_START:
-            # Best-effort sync; failures should not prevent running if local exists.
-            try:
-                self._sync.sync_if_needed()
-            except Exception:
-                if not self._sync.local_json_exists():
-                    raise
-
-        with open(self._settings.LOCAL_JSON_PATH, "r", encoding="utf-8") as f:
+    def _local_copy(self) -> tuple[str, str] | None:
+        return compression.find_existing(self._settings.LOCAL_JSON_PATH, self._settings.LOCAL_COMPRESSION)
+
+    def read_local(self) -> Any:
+        """Parse the local JSON copy (decompressing while reading)."""
+        found = self._local_copy()
+        if found is None:
+            raise FileNotFoundError(self._settings.LOCAL_JSON_PATH)
+        with compression.open_text_reader(*found) as f:
             return json.load(f)
+
+    def local_version(self) -> tuple[int, int, int]:
+        """Return a cheap version key for the local copy (timestamp, mtime, size)."""
+        found = self._local_copy()
+        try:
+            st = os.stat(found[0]) if found else None
+        except OSError:
+            st = None
+        if st is None:
+            return (0, 0, 0)
+        return (self._sync.read_local_timestamp(), st.st_mtime_ns, st.st_size)
@@ -0,0 +1,75 @@
+"""Version manifest published next to the local copy after every sync.
+
+`vpsdb.manifest.json` names the data file, its dataset version, size and
+SHA-256. It is written last (after the copy and the timestamp), so a process
+watching it sees a complete version, and can check that the file on disk is
+the one the manifest describes before reloading.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict
+
+from app.configs.settings import Settings
+from app.utils import compression
+
+
+def holder_id() -> str:
+    """Identifies this process across containers sharing the volume."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(settings: Settings) -> Dict[str, Any] | None:
+    """The published manifest, or None when there is none (or it is unreadable)."""
+    try:
+        with open(settings.MANIFEST_PATH, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def publish_manifest(settings: Settings, version: int, publisher: str) -> Dict[str, Any] | None:
+    """Describe the current local copy in the manifest (atomically); None when there is no copy."""
+    found = compression.find_existing(settings.LOCAL_JSON_PATH, settings.LOCAL_COMPRESSION)
+    if found is None:
+        return None
+    path, codec = found
+    payload = {
+        "version": int(version),
+        "file": os.path.basename(path),
+        "compression": codec,
+        "bytes": os.path.getsize(path),
+        "sha256": file_sha256(path),
+        "publishedAt": time.time(),
+        "publisher": publisher,
+    }
+    tmp_path = f"{settings.MANIFEST_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, settings.MANIFEST_PATH)
+    return payload
+
+
+def manifest_matches(settings: Settings, manifest: Dict[str, Any]) -> bool:
+    """True when the file the manifest names exists with the listed size and checksum."""
+    path = os.path.join(os.path.dirname(os.path.abspath(settings.LOCAL_JSON_PATH)), str(manifest.get("file", "")))
+    try:
+        if os.path.getsize(path) != manifest.get("bytes"):
+            return False
+        return file_sha256(path) == manifest.get("sha256")
+    except OSError:
+        return False
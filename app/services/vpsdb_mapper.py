@@ -16,16 +16,27 @@ class VpsDbMapper:
         items = self._extract_items(raw)
         return [g for g in (self._map_game(it) for it in items) if g is not None]
 
-    def _extract_items(self, raw: Any) -> List[Dict[str, Any]]:
-        """Extract the top-level array from common container shapes."""
+    def partition(self, raw: Any, parts: int) -> List[List[Dict[str, Any]]]:
+        """Split the top-level game array into `parts` contiguous chunks (order preserved)."""
+        items = self._extract_items(raw)
+        size = max(1, -(-len(items) // max(1, parts)))
+        return [items[i : i + size] for i in range(0, len(items), size)]
+
+    @staticmethod
+    def game_array(raw: Any) -> List[Any] | None:
+        """The top-level game array of a supported container shape, or None for any other payload."""
         if isinstance(raw, list):
-            return [x for x in raw if isinstance(x, dict)]
+            return raw
         if isinstance(raw, dict):
             for key in ("data", "items", "games"):
                 v = raw.get(key)
                 if isinstance(v, list):
-                    return [x for x in v if isinstance(x, dict)]
-        return []
+                    return v
+        return None
+
+    def _extract_items(self, raw: Any) -> List[Dict[str, Any]]:
+        """Extract the top-level array from common container shapes."""
+        return [x for x in self.game_array(raw) or [] if isinstance(x, dict)]
 
     def _map_game(self, it: Dict[str, Any]) -> Game | None:
         """Map a single game dict."""
@@ -2,10 +2,23 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 from dataclasses import dataclass
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from app.clients.vpsdb_client import VpsDbClient
+from typing import Any
+
+from app.clients.vpsdb_client import Mirror, VpsDbClient
 from app.configs.settings import Settings
+from app.services.change_log import ChangeLog
+from app.services.snapshot_history import SnapshotHistory
+from app.services.vpsdb_manifest import holder_id, publish_manifest, read_manifest
+from app.services.vpsdb_mapper import VpsDbMapper
+from app.utils import compression
+from app.utils.file_lock import file_lock
+
+
+def _tmp_path_for(path: str) -> str:
+    """A temp file next to `path`, unique per process and thread."""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
 
 
 @dataclass
@@ -16,6 +29,12 @@ class SyncResult:
     remote_timestamp: int
 
 
+def check_db_payload(raw: Any) -> None:
+    """Reject a downloaded DB whose shape the mapper cannot read (that mirror counts as failing)."""
+    if VpsDbMapper.game_array(raw) is None:
+        raise ValueError("Unexpected vpsdb.json payload shape")
+
+
 class VpsDbSyncService:
     """Keeps a local VPS DB JSON copy in sync with the remote source."""
 
@@ -24,7 +43,11 @@ class VpsDbSyncService:
         self._client = VpsDbClient(
             last_updated_url=settings.VPSDB_LASTUPDATED_URL,
             db_url=settings.VPSDB_REMOTE_URL,
+            mirrors=[Mirror(db_url=db, last_updated_url=lu) for db, lu in settings.VPSDB_MIRRORS],
+            hedge_after_seconds=settings.VPSDB_HEDGE_AFTER_MS / 1000.0,
         )
+        self._history = SnapshotHistory(settings)
+        self._changes = ChangeLog(settings)
 
     def ensure_storage_dir(self) -> None:
         """Ensure the storage directory exists."""
@@ -47,12 +70,14 @@ class VpsDbSyncService:
         """Write the local associated epoch timestamp."""
         self.ensure_storage_dir()
         payload = {"lastUpdated": int(epoch)}
-        with open(self._settings.LOCAL_TIMESTAMP_PATH, "w", encoding="utf-8") as f:
+        tmp_path = _tmp_path_for(self._settings.LOCAL_TIMESTAMP_PATH)
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(payload, f)
+        os.replace(tmp_path, self._settings.LOCAL_TIMESTAMP_PATH)
 
     def local_json_exists(self) -> bool:
-        """Return True when the local JSON file exists."""
-        return os.path.exists(self._settings.LOCAL_JSON_PATH)
+        """Return True when the local JSON file exists (in any compression)."""
+        return compression.find_existing(self._settings.LOCAL_JSON_PATH, self._settings.LOCAL_COMPRESSION) is not None
 
     def sync_if_needed(self) -> SyncResult:
         """Sync local file if the remote timestamp is newer.
@@ -61,29 +86,101 @@ class VpsDbSyncService:
         - If remote lastUpdated > local lastUpdated, download and update both files.
         """
         self.ensure_storage_dir()
+        # One sync at a time per storage dir: other workers wait, then see the new local timestamp.
+        with file_lock(os.path.join(self._settings.STORAGE_DIR, ".sync.lock")):
+            return self._sync_locked()
+
+    def _sync_locked(self) -> SyncResult:
         local_ts = self.read_local_timestamp()
         remote_ts = self._client.fetch_remote_timestamp()
 
         needs_download = (not self.local_json_exists()) or (remote_ts > local_ts)
         if not needs_download:
+            if local_ts:
+                self._record_version(None, local_ts)
+                self._ensure_manifest(local_ts)
             return SyncResult(updated=False, local_timestamp=local_ts, remote_timestamp=remote_ts)
 
-        json_text = self._client.fetch_db_json_text()
+        json_text, raw = self._client.fetch_db_json(validate=check_db_payload)
+        # Write (compressed) next to the target and swap in, so readers never see a partial file.
+        codec = self._settings.LOCAL_COMPRESSION
+        target = compression.compressed_path(self._settings.LOCAL_JSON_PATH, codec)
+        tmp_path = _tmp_path_for(target)
         try:
-            with self.open_file_with_tenacity(self._settings.LOCAL_JSON_PATH) as f:
+            with self.open_file_with_tenacity(tmp_path, codec=codec) as f:
                 f.write(json_text)
+            os.replace(tmp_path, target)
         except Exception as e:
             print(f"Failed to open file after all retries: {e}")
+            return SyncResult(updated=False, local_timestamp=local_ts, remote_timestamp=remote_ts)
+        if self._settings.LOCAL_COMPRESSION_PRUNE:
+            self._remove_other_copies(codec)
 
         self.write_local_timestamp(remote_ts)
+        self._record_version(raw, remote_ts)
+        self._publish_manifest(remote_ts)
         return SyncResult(updated=True, local_timestamp=remote_ts, remote_timestamp=remote_ts)
 
-    @retry(
-        stop=stop_after_attempt(5),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=retry_if_exception_type((FileNotFoundError, IOError, PermissionError))
-    )
-    def open_file_with_tenacity(self, filepath: str, mode: str ='w', encoding:str ='utf-8'):
+    def _record_version(self, raw: Any, timestamp: int) -> None:
+        """Add a version to the snapshot history and change log (the local copy when no data is given)."""
+        want_history = self._history.enabled and not self._history.has_version(timestamp)
+        want_changes = self._changes.enabled and not self._changes.has_version(timestamp)
+        if not (want_history or want_changes):
+            return
+        if raw is None:
+            try:
+                found = compression.find_existing(self._settings.LOCAL_JSON_PATH, self._settings.LOCAL_COMPRESSION)
+                if found is None:
+                    return
+                with compression.open_text_reader(*found) as f:
+                    raw = json.load(f)
+            except Exception as e:
+                print(f"Failed to read version {timestamp} for history/change log: {e}")
+                return
+
+        for wanted, target, label in ((want_history, self._history, "snapshot history"), (want_changes, self._changes, "change log")):
+            if not wanted:
+                continue
+            try:
+                target.record(raw, timestamp)
+            except Exception as e:
+                print(f"Failed to record {label} for {timestamp}: {e}")
+
+    def _publish_manifest(self, timestamp: int) -> None:
+        """Announce the new local copy to watching processes (written last, after copy and timestamp)."""
+        try:
+            publish_manifest(self._settings, timestamp, holder_id())
+        except OSError as e:
+            print(f"Failed to publish manifest for {timestamp}: {e}")
+
+    def _ensure_manifest(self, timestamp: int) -> None:
+        """Publish a manifest for a local copy that has none (e.g. written before manifests existed)."""
+        manifest = read_manifest(self._settings)
+        if manifest is None or manifest.get("version") != timestamp:
+            self._publish_manifest(timestamp)
+
+    def _remove_other_copies(self, keep: str) -> None:
+        """Delete copies stored with a previous compression setting (only when VPSDB_LOCAL_COMPRESSION_PRUNE is set)."""
+        for codec in compression.SUFFIXES:
+            path = compression.compressed_path(self._settings.LOCAL_JSON_PATH, codec)
+            if codec != keep and os.path.exists(path):
+                os.remove(path)
+
+    def open_file_with_tenacity(self, filepath: str, mode: str ='w', encoding:str ='utf-8', codec: str = "none"):
         """Function to open a file with automatic retries on specific IO exceptions."""
+        # tenacity is only needed when a sync writes files; keep it out of worker boot.
+        from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+        for attempt in Retrying(
+            stop=stop_after_attempt(5),
+            wait=wait_exponential(multiplier=1, min=1, max=10),
+            retry=retry_if_exception_type((FileNotFoundError, IOError, PermissionError)),
+        ):
+            with attempt:
+                return self._open_file(filepath, mode, encoding, codec)
+
+    def _open_file(self, filepath: str, mode: str, encoding: str, codec: str):
         print(f"Attempting to open file: {filepath}")
-        return open(filepath, mode, encoding)
+        if codec != "none":
+            return compression.open_text_writer(filepath, codec, self._settings.LOCAL_COMPRESSION_LEVEL)
+        return open(filepath, mode, encoding=encoding)
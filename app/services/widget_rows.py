@@ -0,0 +1,95 @@
+"""Compact JSON rows for client-side rendered widgets.
+
+`/widgets/<kind>/rows` returns the same rows the HTML widgets render, as
+column names plus one array per row:
+
+    {"v": <lastUpdated>, "title": "Recent Tables", "sort": "createdAt",
+     "cols": ["name", "manufacturer", ...], "rows": [["Attack from Mars", ...], ...]}
+
+The encoded bytes are cached per (route, snapshot version, link-health
+revision, normalized query), so a repeated view costs a dict lookup. Theme
+and layout parameters are not part of the key: the browser applies them.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Tuple
+
+from flask import Response, current_app, request
+
+from app.configs.settings import Settings
+from app.services.link_checker import link_revision
+from app.services.request_timing import timed
+
+# Presentation-only parameters; the client handles them.
+_CLIENT_PARAMS = frozenset(("theme", "header", "footer", "view", "title"))
+
+
+class WidgetRowsCache:
+    """Bounded LRU of encoded row payloads and their ETags."""
+
+    def __init__(self, settings: Settings):
+        self._max_entries = settings.WIDGET_ROWS_CACHE_ENTRIES
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, Tuple[bytes, str]]" = OrderedDict()
+
+    def get_or_build(self, key: tuple, build: Callable[[], bytes]) -> Tuple[bytes, str]:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                return hit
+        body = build()
+        entry = (body, hashlib.blake2b(body, digest_size=12).hexdigest())
+        if self._max_entries > 0:
+            with self._lock:
+                # Keep the first of concurrent builds, so every caller sees one ETag.
+                entry = self._entries.setdefault(key, entry)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Encoded payload bytes held."""
+        return sum(len(body) for body, _ in list(self._entries.values()))
+
+
+def encode_rows(version: int, title: str, sort: str, rows: List[dict]) -> bytes:
+    """Column-name header plus positional rows (keys are not repeated per row)."""
+    cols = list(rows[0].keys()) if rows else []
+    payload = {"v": version, "title": title, "sort": sort, "cols": cols, "rows": [[r[c] for c in cols] for r in rows]}
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _cache_key(snapshot) -> tuple:
+    links = link_revision()
+    args = tuple(sorted((k, v) for k, v in request.args.items(multi=True) if k not in _CLIENT_PARAMS))
+    return request.endpoint, snapshot.version, links, args
+
+
+def rows_response(snapshot, title: str, sort: str, build_rows: Callable[[], List[dict]]) -> Response:
+    """Serve the cached row payload of `snapshot` for this request (304 on a matching ETag).
+
+    `build_rows` runs only on a cache miss.
+    """
+
+    def build() -> bytes:
+        rows = build_rows()
+        with timed("render"):
+            return encode_rows(snapshot.timestamp, title, sort, rows)
+
+    body, etag = current_app.extensions["widget_rows_cache"].get_or_build(_cache_key(snapshot), build)
+    settings: Settings = current_app.config["SETTINGS"]
+    resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = f"public, max-age={settings.WIDGET_ROWS_MAX_AGE_SECONDS}"
+    # The widget script runs on the embedding page's origin.
+    resp.headers["Access-Control-Allow-Origin"] = "*"
+    return resp.make_conditional(request)
@@ -0,0 +1,167 @@
+"""Display rows for the widgets, built once per snapshot.
+
+A widget row is the flattened, formatted view of one table or backglass
+(names, truncated authors, ISO dates, best link). The in-memory snapshot
+builds every row in `GameSnapshot.build`, so a widget request only selects
+items from the index and looks their rows up. The SQLite snapshot hydrates
+models per query, so it fills a bounded set of rows as they are requested.
+
+Only `url` depends on anything outside the snapshot (the link checker's
+dead-link verdicts): each row remembers the link-health revision its url was
+picked under and is re-linked on the first lookup after that changes.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from app.utils.dates import dt_to_iso
+from app.utils.strings import truncate
+
+# Rows kept by a lazily filled (SQLite) snapshot; the in-memory one keeps all.
+_MAX_LAZY_ROWS = 4096
+
+IsDead = Callable[[str], bool] | None
+RowKey = Tuple[str, str]
+
+
+def _get_attr(obj: Any, name: str, default: Any = "") -> Any:
+    """Safely get an attribute if it exists."""
+    return getattr(obj, name, default)
+
+
+def _game_field(item: Any, field: str) -> Any:
+    """
+    Try multiple locations for game metadata:
+    1) flattened attrs (gameManufacturer/gameYear)
+    2) nested dict attr 'game' if present
+    3) default
+    """
+    if field == "manufacturer":
+        v = _get_attr(item, "gameManufacturer", None)
+        if v:
+            return v
+    if field == "year":
+        v = _get_attr(item, "gameYear", None)
+        if v is not None and v != "":
+            return v
+
+    game_obj = _get_attr(item, "game", None)
+    if isinstance(game_obj, dict):
+        return game_obj.get(field, "")
+
+    return ""
+
+
+def _best_url(item: Any, is_dead: IsDead) -> str:
+    return (item.best_url(is_dead) if hasattr(item, "best_url") else "") or ""
+
+
+def table_row(t: Any, is_dead: IsDead = None) -> dict:
+    """Display row for table widgets."""
+    created_dt = _get_attr(t, "createdAt", None) or _get_attr(t, "updatedAt", None)
+    updated_dt = _get_attr(t, "updatedAt", None)
+    authors = _get_attr(t, "authors", []) or []
+    first_author = authors[0] if authors else ""
+
+    return {
+        "name": _get_attr(t, "gameName", "") or "",
+        "manufacturer": _game_field(t, "manufacturer") or "",
+        "year": _game_field(t, "year") or "",
+        "version": _get_attr(t, "version", "") or "",
+        "format": _get_attr(t, "tableFormat", "") or "",
+        "authors": truncate(first_author, 40),
+        "createdAt": (dt_to_iso(created_dt) or "")[:10],
+        "updatedAt": (dt_to_iso(updated_dt) or "")[:10],
+        "url": _best_url(t, is_dead),
+        "imgUrl": _get_attr(t, "imgUrl", "") or "",
+    }
+
+
+def backglass_row(b: Any, is_dead: IsDead = None) -> dict:
+    """Display row for backglass widgets."""
+    created_dt = _get_attr(b, "createdAt", None) or _get_attr(b, "updatedAt", None)
+    updated_dt = _get_attr(b, "updatedAt", None)
+    authors = _get_attr(b, "authors", []) or []
+    first_author = authors[0] if authors else ""
+
+    return {
+        "name": _get_attr(b, "gameName", "") or "",
+        "manufacturer": _game_field(b, "manufacturer") or "",
+        "year": _game_field(b, "year") or "",
+        "version": _get_attr(b, "version", "") or "",
+        "features": truncate(", ".join(_get_attr(b, "features", []) or []), 40),
+        "authors": truncate(first_author, 40),
+        "createdAt": (dt_to_iso(created_dt) or "")[:10],
+        "updatedAt": (dt_to_iso(updated_dt) or "")[:10],
+        "url": _best_url(b, is_dead),
+        "imgUrl": _get_attr(b, "imgUrl", "") or "",
+    }
+
+
+_BUILDERS: Dict[str, Callable[[Any, IsDead], dict]] = {"table": table_row, "backglass": backglass_row}
+
+
+class WidgetViewRows:
+    """Widget rows of one snapshot, keyed by item kind and id.
+
+    Rows are shared between requests and must not be modified; callers that
+    add fields copy them first.
+    """
+
+    def __init__(self, max_entries: int | None = _MAX_LAZY_ROWS):
+        self._max_entries = max_entries
+        # key -> (link-health revision the url was picked under, row)
+        self._rows: Dict[RowKey, Tuple[int | None, dict]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, tables: Iterable[Any], backglasses: Iterable[Any]) -> "WidgetViewRows":
+        """Every row up front (no dead-link filter yet), for the in-memory snapshot."""
+        view = cls(max_entries=None)
+        for kind, items in (("table", tables), ("backglass", backglasses)):
+            build = _BUILDERS[kind]
+            for item in items:
+                if item.id:
+                    view._rows[(kind, item.id)] = (None, build(item, None))
+        return view
+
+    def rows(self, kind: str, items: Iterable[Any], is_dead: IsDead = None, revision: int | None = None) -> List[dict]:
+        """Rows for `items` (in order), building or re-linking only the ones not current yet."""
+        build = _BUILDERS[kind]
+        out: List[dict] = []
+        for item in items:
+            key = (kind, item.id)
+            entry = self._rows.get(key)
+            if entry is not None and entry[0] == revision:
+                out.append(entry[1])
+                continue
+            if entry is not None:
+                row = {**entry[1], "url": _best_url(item, is_dead)}
+            else:
+                row = build(item, is_dead)
+            if item.id:
+                self._store(key, (revision, row))
+            out.append(row)
+        return out
+
+    def _store(self, key: RowKey, entry: Tuple[int | None, dict]) -> None:
+        with self._lock:
+            self._rows[key] = entry
+            if self._max_entries is not None:
+                while len(self._rows) > self._max_entries:
+                    # Oldest insertion first; a plain dict keeps lock-free reads safe.
+                    self._rows.pop(next(iter(self._rows)))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getstate__(self) -> dict:
+        # Pickled with the snapshot by the ingest worker; locks are per process.
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
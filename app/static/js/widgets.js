@@ -0,0 +1,213 @@
+/*
+ * Client-side rendered widgets.
+ *
+ * The rows come from /widgets/<tables|backglasses>/rows (compact, cacheable JSON);
+ * the markup matches the server-rendered templates and reuses css/widget.css.
+ *
+ * Embed in a page:
+ *   <div data-vpsdb-widget="tables" data-view="list" data-theme="dark"
+ *        data-params="limit=10&sort=updated&format=vpx"></div>
+ *   <script src="https://<host>/static/js/widgets.js" async></script>
+ *
+ * Or in an iframe: /static/widget.html?widget=tables&view=images&theme=dark&limit=10
+ */
+(function () {
+  "use strict";
+
+  var script = document.currentScript;
+  var scriptUrl = script && script.src ? script.src : window.location.href;
+  var rowsBase = new URL("../../widgets/", scriptUrl);
+  var cssUrl = new URL("../css/widget.css", scriptUrl).href;
+
+  var KINDS = {
+    tables: { extra: "format", extraLabel: "Format" },
+    backglasses: { extra: "features", extraLabel: "Features" }
+  };
+  // Handled here; everything else is passed on to the rows endpoint.
+  var LAYOUT_PARAMS = ["widget", "view", "theme", "header", "footer", "title"];
+
+  function flag(value, fallback) {
+    if (value === null || value === undefined || value === "") return fallback;
+    return ["1", "true", "yes", "y", "on"].indexOf(String(value).toLowerCase()) !== -1;
+  }
+
+  function safeUrl(value) {
+    try {
+      var u = new URL(value);
+      return u.protocol === "http:" || u.protocol === "https:" ? u.href : "";
+    } catch (e) {
+      return "";
+    }
+  }
+
+  function el(tag, className, text) {
+    var node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+  }
+
+  function ensureStylesheet() {
+    var links = document.querySelectorAll('link[rel="stylesheet"]');
+    for (var i = 0; i < links.length; i++) {
+      if (links[i].href === cssUrl) return;
+    }
+    var link = document.createElement("link");
+    link.rel = "stylesheet";
+    link.href = cssUrl;
+    document.head.appendChild(link);
+  }
+
+  function toObjects(payload) {
+    return payload.rows.map(function (values) {
+      var row = {};
+      payload.cols.forEach(function (col, i) { row[col] = values[i]; });
+      return row;
+    });
+  }
+
+  function renderList(kind, rows, sort) {
+    var table = el("table", "mini-table");
+    var head = el("tr");
+    var dateLabel = sort === "createdAt" ? "Created" : "Updated";
+    ["Name", "Manufacturer", "Year", "Version", KINDS[kind].extraLabel, "Authors", dateLabel].forEach(function (label) {
+      head.appendChild(el("th", "", label));
+    });
+    table.appendChild(el("thead")).appendChild(head);
+
+    var body = table.appendChild(el("tbody"));
+    rows.forEach(function (r) {
+      var tr = el("tr", "click-row");
+      var href = safeUrl(r.url);
+      tr.appendChild(el("td", "name", r.name));
+      tr.appendChild(el("td", "manufacturer", r.manufacturer));
+      tr.appendChild(el("td", "year", r.year));
+      tr.appendChild(el("td", "version", r.version));
+      tr.appendChild(el("td", kind === "tables" ? "format" : "muted", r[KINDS[kind].extra]));
+      tr.appendChild(el("td", "muted", r.authors));
+      tr.appendChild(el("td", "muted", sort === "createdAt" ? r.createdAt : r.updatedAt));
+      if (href) {
+        tr.addEventListener("click", function () {
+          window.open(href, "_blank", "noopener,noreferrer");
+        });
+      }
+      body.appendChild(tr);
+    });
+    return table;
+  }
+
+  function renderImages(kind, rows) {
+    var row = el("div", "image-row");
+    rows.forEach(function (r) {
+      var img = safeUrl(r.imgUrl);
+      if (!img) return;
+      var tile = el("a", "image-tile");
+      tile.href = safeUrl(r.url) || "#";
+      tile.target = "_blank";
+      tile.rel = "noopener noreferrer";
+      tile.title = r.name + " " + r.version;
+
+      var image = el("img");
+      image.src = img;
+      image.alt = r.name;
+      image.loading = "lazy";
+      tile.appendChild(image);
+
+      var caption = el("div", "image-caption");
+      caption.appendChild(el("div", "cap-title", r.name));
+      caption.appendChild(el("div", "cap-sub muted", kind === "tables" ? r.version + " • " + r.format : r.version));
+      tile.appendChild(caption);
+      row.appendChild(tile);
+    });
+    return row;
+  }
+
+  function renderCard(target, options) {
+    var card = el("div", "card");
+    var header = el("div", "card-header");
+    var title = el("div", "card-title", options.title || "Widget");
+    header.appendChild(title);
+    var body = el("div", "card-body");
+    body.appendChild(el("div", "card-status", "Loading…"));
+    var footer = el("div", "card-footer");
+    footer.appendChild(el("span", "", "Pinball Widget API"));
+
+    if (options.header) card.appendChild(header);
+    card.appendChild(body);
+    if (options.footer) card.appendChild(footer);
+    target.replaceChildren(card);
+    return { title: title, body: body };
+  }
+
+  /*
+   * Render a widget into `target`.
+   * options: {widget: "tables"|"backglasses", view: "list"|"images", theme, header, footer, title, params}
+   */
+  function mount(target, options) {
+    var kind = KINDS[options.widget] ? options.widget : "tables";
+    var view = options.view === "images" ? "images" : "list";
+    var parts = renderCard(target, {
+      title: options.title,
+      header: flag(options.header, true),
+      footer: flag(options.footer, true)
+    });
+    target.classList.add("vpsdb-widget");
+    target.setAttribute("data-theme", options.theme || "light");
+
+    var url = new URL(kind + "/rows", rowsBase);
+    new URLSearchParams(options.params || "").forEach(function (value, key) {
+      if (LAYOUT_PARAMS.indexOf(key) === -1) url.searchParams.append(key, value);
+    });
+
+    return fetch(url.href, { credentials: "omit" })
+      .then(function (resp) {
+        if (!resp.ok) throw new Error("HTTP " + resp.status);
+        return resp.json();
+      })
+      .then(function (payload) {
+        if (!options.title) parts.title.textContent = payload.title;
+        var rows = toObjects(payload);
+        var content = view === "images" ? renderImages(kind, rows) : renderList(kind, rows, payload.sort);
+        parts.body.replaceChildren(content);
+      })
+      .catch(function () {
+        parts.body.replaceChildren(el("div", "card-status", "Could not load rows."));
+      });
+  }
+
+  function mountAll() {
+    ensureStylesheet();
+    document.querySelectorAll("[data-vpsdb-widget]").forEach(function (node) {
+      if (node.getAttribute("data-vpsdb-location") !== null) {
+        // Standalone page (static/widget.html): everything comes from its own query string.
+        var q = new URLSearchParams(window.location.search);
+        var theme = q.get("theme") || "light";
+        document.documentElement.setAttribute("data-theme", theme);
+        document.body.className = "theme-" + theme;
+        mount(node, {
+          widget: q.get("widget"), view: q.get("view"), theme: theme,
+          header: q.get("header"), footer: q.get("footer"), title: q.get("title"),
+          params: window.location.search
+        });
+        return;
+      }
+      mount(node, {
+        widget: node.getAttribute("data-vpsdb-widget"),
+        view: node.getAttribute("data-view"),
+        theme: node.getAttribute("data-theme"),
+        header: node.getAttribute("data-header"),
+        footer: node.getAttribute("data-footer"),
+        title: node.getAttribute("data-title"),
+        params: node.getAttribute("data-params")
+      });
+    });
+  }
+
+  window.VpsdbWidgets = { mount: mount, mountAll: mountAll };
+
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", mountAll);
+  } else {
+    mountAll();
+  }
+})();
@@ -0,0 +1,187 @@
+"""Sync correctness and request tail latency under upstream fault profiles.
+
+For every profile (see `app.tools.upstream_stub.PROFILES`) a fresh storage dir
+is synced from a healthy stub, then:
+
+1. Correctness: a new upstream version is published, the faults are switched
+   on and `VpsDbSyncService.sync_if_needed()` runs up to `--sync-attempts`
+   times. The local copy must still parse, its timestamp must match its
+   content, and it must be the version the profile allows (the old one for
+   truncated bodies or regressed timestamps, the new one once a burst of
+   errors is over).
+2. Tail latency: the app is created in process with request-triggered syncs
+   allowed on every request (`VPSDB_SYNC_MIN_INTERVAL_SECONDS=0`) while another
+   version is pending upstream, and the loadgen mix runs against it. Requests
+   must not fail and p99 must stay within `--p99-budget-ms`, however slow or
+   broken upstream is.
+
+Examples:
+    python -m app.tools.faultbench ./data/vpsdb.json
+    python -m app.tools.faultbench ./data/vpsdb.json --profiles slow,truncated-undeclared -d 10
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+from collections import Counter
+from typing import List
+
+from app.configs.settings import Settings
+from app.services.vpsdb_loader import VpsDbLoader
+from app.services.vpsdb_sync_service import VpsDbSyncService
+from app.tools.loadgen import DEFAULT_MIX, _inprocess_fetch_factory, parse_mix, report, run_load
+from app.tools.upstream_stub import PROFILES, FaultProfile, UpstreamStub
+
+_MARKER = " (faultbench v2)"
+_T1 = 1_700_000_000_000
+_T2 = _T1 + 60_000
+_T3 = _T2 + 60_000
+
+
+def expected_version(profile: FaultProfile, attempts: int) -> str | None:
+    """The local version the profile must leave behind ("v1", "v2"; None = either)."""
+    if profile.truncate_ratio > 0 or profile.timestamp_regression_ms > 0:
+        return "v1"
+    if profile.error_rate > 0:
+        return None
+    # Each failed attempt consumes one burst error (on lastUpdated.json).
+    return "v2" if attempts > profile.error_burst else "v1"
+
+
+def _v2_body(db_body: bytes) -> bytes:
+    data = json.loads(db_body)
+    data[0]["name"] = f"{data[0].get('name') or ''}{_MARKER}"
+    return json.dumps(data).encode("utf-8")
+
+
+def check_sync(stub: UpstreamStub, profile: FaultProfile, attempts: int) -> dict:
+    """Publish v2 behind `profile` and verify what the sync service leaves on disk."""
+    settings = Settings.from_env()
+    svc = VpsDbSyncService(settings)
+    outcomes = []
+    for _ in range(attempts):
+        try:
+            result = svc.sync_if_needed()
+        except Exception as e:
+            outcomes.append(f"error:{e.__class__.__name__}")
+            continue
+        outcomes.append("updated" if result.updated else "unchanged")
+        if result.updated:
+            break
+
+    problems = []
+    try:
+        local = VpsDbLoader(settings).read_local()
+        version = "v2" if str(local[0].get("name") or "").endswith(_MARKER) else "v1"
+    except Exception as e:
+        version = "corrupt"
+        problems.append(f"local copy unreadable: {e}")
+    timestamp = svc.read_local_timestamp()
+    if version != "corrupt" and timestamp != {"v1": _T1, "v2": _T2}[version]:
+        problems.append(f"timestamp {timestamp} does not match local {version}")
+    expect = expected_version(profile, attempts)
+    if expect is not None and version != expect:
+        problems.append(f"expected local {expect}, found {version}")
+    return {"attempts": outcomes, "local": version, "expected": expect or "either", "problems": problems}
+
+
+def measure_latency(stub: UpstreamStub, concurrency: int, duration: float) -> dict:
+    """Run the loadgen mix in process while syncs against the faulty stub are pending."""
+    before = Counter(stub.counters)
+    stats, wall = run_load(_inprocess_fetch_factory(), parse_mix(DEFAULT_MIX), concurrency, duration)
+    total = report(stats, wall)["TOTAL"]
+    upstream = Counter(stub.counters)
+    upstream.subtract(before)
+    return {**total, "upstreamRequests": {k: v for k, v in upstream.items() if v}}
+
+
+def run_profile(json_path: str, profile: FaultProfile, args: argparse.Namespace) -> dict:
+    storage_dir = tempfile.mkdtemp(prefix=f"vpsdb-faultbench-{profile.name}-")
+    stub = UpstreamStub(json_path, last_updated=_T1, seed=args.seed).start()
+    try:
+        os.environ.update(stub.env(storage_dir))
+        os.environ["VPSDB_SYNC_MIN_INTERVAL_SECONDS"] = "0"
+        VpsDbSyncService(Settings.from_env()).sync_if_needed()
+        v1_body = stub.db_body
+
+        stub.publish(_v2_body(v1_body), _T2)
+        stub.faults = profile
+        result = {"profile": profile.to_dict(), "sync": check_sync(stub, profile, args.sync_attempts)}
+
+        if args.duration > 0:
+            stub.publish(v1_body, _T3)
+            stub.faults = profile
+            latency = measure_latency(stub, args.concurrency, args.duration)
+            result["latency"] = latency
+            if latency["errors"]:
+                result["sync"]["problems"].append(f"{latency['errors']} failed requests")
+            if latency["p99_ms"] > args.p99_budget_ms:
+                result["sync"]["problems"].append(f"p99 {latency['p99_ms']} ms > budget {args.p99_budget_ms} ms")
+        return result
+    finally:
+        stub.stop()
+
+
+def _attempts_summary(outcomes: List[str]) -> str:
+    """`error:HTTPError x2, updated` style run-length summary."""
+    runs: List[List] = []
+    for o in outcomes:
+        if runs and runs[-1][0] == o:
+            runs[-1][1] += 1
+        else:
+            runs.append([o, 1])
+    return ", ".join(o if n == 1 else f"{o} x{n}" for o, n in runs)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.faultbench", description=__doc__.splitlines()[0])
+    parser.add_argument("json_path", help="vpsdb.json for the upstream stub")
+    parser.add_argument("--profiles", default=",".join(PROFILES), help=f"Comma-separated ({', '.join(PROFILES)})")
+    parser.add_argument("--faults", default=None, help="Extra custom profile as JSON fault fields")
+    parser.add_argument("--sync-attempts", type=int, default=3, help="sync_if_needed calls per correctness check")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("-d", "--duration", type=float, default=5.0, help="Seconds of load per profile (0 = skip)")
+    parser.add_argument("--p99-budget-ms", type=float, default=250.0, help="Allowed request p99 under any profile")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for jitter and random errors")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    profiles = []
+    for name in (n.strip() for n in args.profiles.split(",") if n.strip()):
+        if name not in PROFILES:
+            parser.error(f"unknown profile '{name}' (known: {', '.join(PROFILES)})")
+        profiles.append(PROFILES[name])
+    if args.faults:
+        profiles.append(FaultProfile.from_dict(json.loads(args.faults)))
+
+    # The app and sync service log with print(); keep stdout for the results.
+    with contextlib.redirect_stdout(sys.stderr):
+        results = [run_profile(args.json_path, p, args) for p in profiles]
+    failed = [r for r in results if r["sync"]["problems"]]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 1 if failed else 0
+
+    cols = ("local", "expected", "p50_ms", "p95_ms", "p99_ms", "max_ms", "requests")
+    width = max(len(r["profile"]["name"]) for r in results) + 2
+    print("profile".ljust(width) + "attempts".ljust(40) + "".join(c.rjust(10) for c in cols))
+    for r in results:
+        row = {**r["sync"], **r.get("latency", {})}
+        print(
+            r["profile"]["name"].ljust(width)
+            + _attempts_summary(r["sync"]["attempts"]).ljust(40)
+            + "".join(str(row.get(c, "-")).rjust(10) for c in cols)
+        )
+    for r in failed:
+        for problem in r["sync"]["problems"]:
+            print(f"FAIL {r['profile']['name']}: {problem}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
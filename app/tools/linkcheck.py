@@ -0,0 +1,40 @@
+"""Run one link check pass over the local copy and print the link health stats.
+
+Uses the same settings (env vars) and on-disk cache as the app, so results are
+picked up by running workers.
+
+Examples:
+    python -m app.tools.linkcheck
+    LINK_CHECK_TTL_SECONDS=0 python -m app.tools.linkcheck   # recheck everything
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from typing import List
+
+from app.configs.settings import Settings
+from app.services.game_snapshot import SnapshotProvider
+from app.services.link_checker import LinkChecker
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.linkcheck", description=__doc__.splitlines()[0])
+    parser.parse_args(argv)
+
+    settings = Settings.from_env()
+    provider = SnapshotProvider(settings)
+    provider.current()
+    checker = LinkChecker(settings, provider)
+
+    started = time.perf_counter()
+    checked = checker.run_once()
+    print(f"checked {checked} urls in {time.perf_counter() - started:.1f}s")
+    print(json.dumps(checker.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
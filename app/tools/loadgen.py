@@ -0,0 +1,287 @@
+"""Load generator with per-route latency percentiles.
+
+Examples:
+    python -m app.tools.loadgen --upstream-stub ./data/vpsdb.json -c 8 -d 20
+    python -m app.tools.loadgen --gunicorn --workers 2 --upstream-stub ./data/vpsdb.json
+    python -m app.tools.loadgen --url http://127.0.0.1:8000 --mix tables=1,widget_tables_list=3
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+ROUTES: Dict[str, str] = {
+    "games": "/api/games?limit=50",
+    "tables": "/api/tables?limit=50",
+    "backglasses": "/api/backglasses?limit=50",
+    "widget_tables_list": "/widgets/tables/list?limit=10",
+    "widget_tables_images": "/widgets/tables/images?limit=10",
+    "widget_backglasses_list": "/widgets/backglasses/list?limit=10",
+    "widget_backglasses_images": "/widgets/backglasses/images?limit=10",
+}
+
+DEFAULT_MIX = "games=1,tables=2,backglasses=2,widget_tables_list=4,widget_tables_images=2,widget_backglasses_list=4,widget_backglasses_images=2"
+
+# (status_code, body_length); raising means a transport error
+Fetch = Callable[[str], Tuple[int, int]]
+
+
+@dataclass
+class RouteStats:
+    """Latency samples and error counts for one route."""
+
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    bytes: int = 0
+
+    def percentile(self, p: float) -> float:
+        """Nearest-rank percentile in milliseconds."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        k = max(0, min(len(ordered) - 1, int(round(p / 100.0 * len(ordered))) - 1))
+        return ordered[k] * 1000.0
+
+
+def parse_mix(spec: str) -> List[Tuple[str, str, int]]:
+    """Parse `name=weight,...`; unknown names are treated as literal paths."""
+    out: List[Tuple[str, str, int]] = []
+    for part in (p.strip() for p in spec.split(",") if p.strip()):
+        name, _, weight = part.rpartition("=") if "=" in part else (part, "", "1")
+        name = name or part
+        path = ROUTES.get(name, name)
+        if not path.startswith("/"):
+            raise SystemExit(f"Unknown route '{name}' (known: {', '.join(ROUTES)})")
+        out.append((name, path, max(0, int(weight or 1))))
+    return [m for m in out if m[2] > 0]
+
+
+def _with_query(path: str, extra: str) -> str:
+    if not extra:
+        return path
+    return f"{path}{'&' if '?' in path else '?'}{extra.lstrip('?&')}"
+
+
+def run_load(
+    make_fetch: Callable[[], Fetch],
+    mix: List[Tuple[str, str, int]],
+    concurrency: int,
+    duration: float,
+    requests_total: int | None = None,
+    extra_query: str = "",
+    seed: int = 1,
+) -> Tuple[Dict[str, RouteStats], float]:
+    """Drive the mix from `concurrency` threads; return per-route stats and wall time."""
+    names = [m[0] for m in mix]
+    paths = {m[0]: _with_query(m[1], extra_query) for m in mix}
+    weights = [m[2] for m in mix]
+    stats = {n: RouteStats() for n in names}
+    lock = threading.Lock()
+    budget = [requests_total] if requests_total else None
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_id: int) -> None:
+        rnd = random.Random(seed + worker_id)
+        fetch = make_fetch()
+        local = {n: RouteStats() for n in names}
+        while time.perf_counter() < deadline:
+            if budget is not None:
+                with lock:
+                    if budget[0] <= 0:
+                        break
+                    budget[0] -= 1
+            name = rnd.choices(names, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                status, size = fetch(paths[name])
+            except Exception:
+                status, size = 0, 0
+            elapsed = time.perf_counter() - t0
+            s = local[name]
+            s.latencies.append(elapsed)
+            s.bytes += size
+            if status != 200:
+                s.errors += 1
+        with lock:
+            for n, s in local.items():
+                stats[n].latencies.extend(s.latencies)
+                stats[n].errors += s.errors
+                stats[n].bytes += s.bytes
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return stats, time.perf_counter() - started
+
+
+def report(stats: Dict[str, RouteStats], wall: float) -> dict:
+    """Summarize stats into throughput and p50/p95/p99 per route plus a total."""
+    rows = {}
+    total = RouteStats()
+    for name, s in stats.items():
+        total.latencies.extend(s.latencies)
+        total.errors += s.errors
+        total.bytes += s.bytes
+        rows[name] = s
+    rows["TOTAL"] = total
+
+    return {
+        name: {
+            "requests": len(s.latencies),
+            "errors": s.errors,
+            "rps": round(len(s.latencies) / wall, 1) if wall else 0.0,
+            "p50_ms": round(s.percentile(50), 2),
+            "p95_ms": round(s.percentile(95), 2),
+            "p99_ms": round(s.percentile(99), 2),
+            "max_ms": round(max(s.latencies) * 1000.0, 2) if s.latencies else 0.0,
+            "avg_bytes": int(s.bytes / len(s.latencies)) if s.latencies else 0,
+        }
+        for name, s in rows.items()
+    }
+
+
+def print_report(summary: dict, wall: float) -> None:
+    cols = ("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "max_ms", "avg_bytes")
+    width = max(len(n) for n in summary) + 2
+    print(f"wall time: {wall:.2f}s")
+    print("route".ljust(width) + "".join(c.rjust(11) for c in cols))
+    for name, row in summary.items():
+        print(name.ljust(width) + "".join(str(row[c]).rjust(11) for c in cols))
+
+
+def _inprocess_fetch_factory() -> Callable[[], Fetch]:
+    from app import create_app
+    from app.services.game_snapshot import SnapshotUnavailableError
+
+    app = create_app()
+    deadline = time.time() + 60
+    while True:
+        try:
+            app.extensions["vpsdb_snapshots"].current()
+            break
+        except SnapshotUnavailableError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.1)
+
+    def make() -> Fetch:
+        client = app.test_client()
+
+        def fetch(path: str) -> Tuple[int, int]:
+            resp = client.get(path)
+            return resp.status_code, len(resp.get_data())
+
+        return fetch
+
+    return make
+
+
+def http_fetch_factory(base_url: str) -> Callable[[], Fetch]:
+    import requests
+
+    def make() -> Fetch:
+        session = requests.Session()
+
+        def fetch(path: str) -> Tuple[int, int]:
+            resp = session.get(base_url + path, timeout=30)
+            return resp.status_code, len(resp.content)
+
+        return fetch
+
+    return make
+
+
+def spawn_gunicorn(workers: int, worker_class: str, threads: int, port: int, extra: List[str] | None = None) -> subprocess.Popen:
+    """Start gunicorn on 127.0.0.1:`port` with the current environment and wait until /ready."""
+    from app.tools.upstream_stub import wait_for
+
+    cmd = [
+        sys.executable, "-m", "gunicorn",
+        "-w", str(workers),
+        "-k", worker_class,
+        "--threads", str(threads),
+        "-b", f"127.0.0.1:{port}",
+        *(extra or []),
+        "app.wsgi:app",
+    ]
+    proc = subprocess.Popen(cmd, env=os.environ.copy())
+    try:
+        wait_for(f"http://127.0.0.1:{port}/ready", timeout=60)
+    except BaseException:
+        proc.terminate()
+        raise
+    return proc
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.loadgen", description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Base URL of a running server (default: in-process Flask test client)")
+    target.add_argument("--gunicorn", action="store_true", help="Spawn a local gunicorn for the run")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers (with --gunicorn)")
+    parser.add_argument("--worker-class", default="sync", help="gunicorn worker class (with --gunicorn)")
+    parser.add_argument("--threads", type=int, default=1, help="gunicorn threads per worker (with --gunicorn)")
+    parser.add_argument("--port", type=int, default=8099, help="gunicorn port (with --gunicorn)")
+    parser.add_argument("--upstream-stub", metavar="VPSDB_JSON", help="Serve this vpsdb.json from a local upstream stub")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("-n", "--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Seconds of unreported warmup")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted routes, e.g. tables=2,widget_tables_list=5")
+    parser.add_argument("--query", default="", help="Extra query string appended to every route, e.g. format=vpx")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    stub = None
+    proc = None
+    try:
+        if args.upstream_stub:
+            from app.tools.upstream_stub import UpstreamStub
+
+            stub = UpstreamStub(args.upstream_stub).start()
+            os.environ.update(stub.env(tempfile.mkdtemp(prefix="vpsdb-loadgen-")))
+
+        if args.gunicorn:
+            base_url = f"http://127.0.0.1:{args.port}"
+            proc = spawn_gunicorn(args.workers, args.worker_class, args.threads, args.port)
+            make_fetch = http_fetch_factory(base_url)
+        elif args.url:
+            make_fetch = http_fetch_factory(args.url.rstrip("/"))
+        else:
+            make_fetch = _inprocess_fetch_factory()
+
+        if args.warmup > 0:
+            run_load(make_fetch, mix, args.concurrency, args.warmup, extra_query=args.query, seed=args.seed)
+        stats, wall = run_load(
+            make_fetch, mix, args.concurrency, args.duration, args.requests, extra_query=args.query, seed=args.seed
+        )
+        summary = report(stats, wall)
+        if args.json:
+            print(json.dumps({"wallSeconds": round(wall, 3), "routes": summary}, indent=2))
+        else:
+            print_report(summary, wall)
+        return 1 if summary["TOTAL"]["errors"] else 0
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+        if stub is not None:
+            stub.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
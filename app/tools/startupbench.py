@@ -0,0 +1,248 @@
+"""Measure worker cold start: imports, app factory and time to the first response.
+
+Each run is a fresh interpreter started with `-X importtime` that imports the
+`app` package, imports `app.wsgi` (which runs `create_app`) and answers
+`GET /health` through the test client. Medians are compared with the
+committed baseline; the run fails when the baseline is missing, when the
+factory got slower than the tolerance allows or when boot imports a
+third-party package outside `BOOT_PACKAGES`.
+
+By default every run gets an empty storage dir and unreachable upstream URLs,
+so no local copy is loaded and no network is used while measuring.
+
+Examples:
+    python -m app.tools.startupbench                   # compare with the baseline
+    python -m app.tools.startupbench --update-baseline # record a new baseline (commit it)
+    python -m app.tools.startupbench --gunicorn        # also time gunicorn until /health answers
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, List, Tuple
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "startup_baseline.json")
+# Third-party packages boot may import. `org` is `copy` probing for Jython's `org.python.core`.
+BOOT_PACKAGES = ("app", "blinker", "click", "flask", "itsdangerous", "jinja2", "markupsafe", "org", "werkzeug")
+_MARKER = "STARTUPBENCH "
+
+# Runs in the measured interpreter; prints one marked JSON line.
+_PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+import app.wsgi
+t2 = time.perf_counter()
+status = app.wsgi.app.test_client().get("/health").status_code
+t3 = time.perf_counter()
+print("%s" + json.dumps({
+    "importMs": (t1 - t0) * 1000.0,
+    "createAppMs": (t2 - t1) * 1000.0,
+    "firstResponseMs": (t3 - t0) * 1000.0,
+    "status": status,
+}), flush=True)
+""" % _MARKER
+
+# Compared with the baseline (lower is better).
+METRICS = ("factoryMs", "firstResponseMs")
+
+
+def _env(isolated: bool) -> Dict[str, str]:
+    env = os.environ.copy()
+    if isolated:
+        tmp = tempfile.mkdtemp(prefix="vpsdb-startupbench-")
+        env.update(
+            {
+                "VPSDB_STORAGE_DIR": tmp,
+                "VPSDB_REMOTE_URL": f"file://{tmp}/missing-vpsdb.json",
+                "VPSDB_LASTUPDATED_URL": f"file://{tmp}/missing-lastUpdated.json",
+                "VPSDB_MIRRORS": "",
+            }
+        )
+    return env
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every `-X importtime` line after interpreter startup."""
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        except ValueError:
+            continue
+        if name.strip() == "site":
+            # Everything so far was interpreter startup (site, .pth files), not the app.
+            out = []
+            continue
+        out.append((name.strip(), int(self_us), int(cumulative_us)))
+    return out
+
+
+def third_party_packages(imports: List[Tuple[str, int, int]]) -> List[str]:
+    """Top-level non-stdlib packages among `imports`."""
+    names = {name.split(".")[0] for name, _, _ in imports}
+    return sorted(n for n in names if n not in sys.stdlib_module_names and not n.startswith("_"))
+
+
+def run_once(isolated: bool) -> dict:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        env=_env(isolated),
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    process_ms = (time.perf_counter() - started) * 1000.0
+    lines = [line for line in proc.stdout.splitlines() if line.startswith(_MARKER)]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"probe failed (exit {proc.returncode}):\n{proc.stderr[-2000:]}")
+    result = json.loads(lines[-1][len(_MARKER) :])
+    imports = parse_importtime(proc.stderr)
+    result["factoryMs"] = result["importMs"] + result["createAppMs"]
+    result["processMs"] = process_ms
+    result["imports"] = imports
+    return result
+
+
+def time_gunicorn(port: int) -> float:
+    """Milliseconds from spawning one gunicorn worker until /health answers."""
+    env = _env(isolated=True)
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", "1", "-b", f"127.0.0.1:{port}", "app.wsgi:app"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + 60.0
+        while time.perf_counter() < deadline:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        return (time.perf_counter() - started) * 1000.0
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("gunicorn did not answer /health within 60s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def summarize(runs: List[dict]) -> dict:
+    """Medians plus the import profile of the median run."""
+    keys = ("importMs", "createAppMs", "factoryMs", "firstResponseMs", "processMs")
+    medians = {k: round(statistics.median([r[k] for r in runs]), 1) for k in keys}
+    imports = runs[len(runs) // 2]["imports"]
+    packages = third_party_packages(imports)
+    return {"medians": medians, "packages": packages, "imports": imports}
+
+
+def compare(summary: dict, baseline: dict | None, tolerance: float, slack_ms: float, allow_new: bool) -> List[str]:
+    """Return regression messages (empty when within budget); without a baseline (while recording one) only imports are checked."""
+    problems = []
+    for metric in METRICS if baseline else ():
+        base = baseline["medians"].get(metric)
+        now = summary["medians"][metric]
+        if base is None:
+            continue
+        budget = base * (1.0 + tolerance) + slack_ms
+        if now > budget:
+            problems.append(f"{metric}: {now:.1f} ms > budget {budget:.1f} ms (baseline {base:.1f} ms)")
+    if not allow_new:
+        new = sorted(set(summary["packages"]) - set(BOOT_PACKAGES))
+        if new:
+            problems.append(f"new packages imported at boot: {', '.join(new)}")
+    return problems
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.startupbench", description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters to measure (median is used)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the measured medians as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown over the baseline")
+    parser.add_argument("--slack-ms", type=float, default=15.0, help="Allowed absolute slowdown on top of --tolerance")
+    parser.add_argument("--allow-new-imports", action="store_true", help="Do not fail on packages outside BOOT_PACKAGES")
+    parser.add_argument("--real-env", action="store_true", help="Use the current environment (local copy, upstream) as is")
+    parser.add_argument("--gunicorn", action="store_true", help="Also time a gunicorn worker until /health answers")
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports (self time) to print")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(isolated=not args.real_env) for _ in range(max(1, args.runs))]
+    summary = summarize(runs)
+    if args.gunicorn:
+        summary["medians"]["gunicornHealthMs"] = round(time_gunicorn(args.port), 1)
+
+    baseline = None
+    if not args.update_baseline:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            print(f"No baseline at {args.baseline}; record one with --update-baseline", file=sys.stderr)
+            return 2
+    problems = compare(summary, baseline, args.tolerance, args.slack_ms, args.allow_new_imports)
+
+    if args.update_baseline:
+        payload = {
+            "python": platform.python_version(),
+            "machine": platform.node(),
+            "runs": len(runs),
+            "recordedAt": int(time.time()),
+            "medians": summary["medians"],
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr if args.json else sys.stdout)
+
+    if args.json:
+        top = sorted(summary["imports"], key=lambda i: i[1], reverse=True)[: args.top]
+        print(
+            json.dumps(
+                {
+                    "medians": summary["medians"],
+                    "baseline": baseline["medians"] if baseline else None,
+                    "slowestImports": [{"module": m, "selfUs": s, "cumulativeUs": c} for m, s, c in top],
+                    "regressions": problems,
+                },
+                indent=2,
+            )
+        )
+        return 1 if problems else 0
+
+    print(f"median of {len(runs)} cold starts (python {platform.python_version()})")
+    for metric, value in summary["medians"].items():
+        base = baseline["medians"].get(metric) if baseline else None
+        suffix = f"   (baseline {base:.1f})" if base is not None else ""
+        print(f"  {metric.ljust(18)}{value:>9.1f} ms{suffix}")
+    if args.top > 0:
+        print("slowest imports (self time):")
+    for name, self_us, cumulative_us in sorted(summary["imports"], key=lambda i: i[1], reverse=True)[: args.top]:
+        print(f"  {name.ljust(40)}{self_us / 1000.0:>8.1f} ms  (cumulative {cumulative_us / 1000.0:.1f} ms)")
+    if baseline and baseline.get("python") != platform.python_version():
+        print(f"note: baseline was recorded with python {baseline.get('python')}")
+    if baseline and baseline.get("machine", platform.node()) != platform.node():
+        print(f"note: baseline was recorded on {baseline.get('machine')}")
+    for p in problems:
+        print(f"REGRESSION {p}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
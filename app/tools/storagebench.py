@@ -0,0 +1,100 @@
+"""Measure the local-copy storage formats: disk footprint, read I/O and load time.
+
+For each format (plain JSON, gzip, zstd when installed) the given vpsdb.json is
+written once, then loaded `--runs` times the way the app does it (open,
+decompress while reading, parse, map to models). Read I/O is the number of
+bytes read through syscalls (`rchar` from /proc/self/io, Linux only).
+
+Example:
+    python -m app.tools.storagebench ./data/vpsdb.json --runs 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from app.services.vpsdb_mapper import VpsDbMapper
+from app.utils import compression
+
+
+def _rchar() -> int | None:
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def measure(text: str, codec: str, runs: int, level: int | None) -> Dict[str, float | int | None]:
+    with tempfile.TemporaryDirectory(prefix="vpsdb-storagebench-") as tmp:
+        path = compression.compressed_path(os.path.join(tmp, "vpsdb.json"), codec)
+        started = time.perf_counter()
+        with compression.open_text_writer(path, codec, level) as f:
+            f.write(text)
+        write_s = time.perf_counter() - started
+
+        parse_times: List[float] = []
+        load_times: List[float] = []
+        read_bytes = None
+        for _ in range(runs):
+            before = _rchar()
+            started = time.perf_counter()
+            with compression.open_text_reader(path, codec) as f:
+                raw = json.load(f)
+            parsed = time.perf_counter()
+            VpsDbMapper().map_games(raw)
+            done = time.perf_counter()
+            after = _rchar()
+            parse_times.append(parsed - started)
+            load_times.append(done - started)
+            if before is not None and after is not None:
+                read_bytes = after - before
+
+        return {
+            "disk_bytes": os.path.getsize(path),
+            "write_ms": round(write_s * 1000.0, 1),
+            "read_bytes": read_bytes,
+            "parse_ms": round(statistics.median(parse_times) * 1000.0, 1),
+            "load_ms": round(statistics.median(load_times) * 1000.0, 1),
+        }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.storagebench", description=__doc__.splitlines()[0])
+    parser.add_argument("vpsdb_json", help="Plain vpsdb.json to measure")
+    parser.add_argument("--runs", type=int, default=5, help="Loads per format (median is reported)")
+    parser.add_argument("--level", type=int, default=None, help="Compression level (default: codec default)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.vpsdb_json, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    codecs = ["none", "gzip"] + (["zstd"] if compression.zstd_available() else [])
+    results = {codec: measure(text, codec, max(1, args.runs), args.level) for codec in codecs}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    cols = ("disk_bytes", "write_ms", "read_bytes", "parse_ms", "load_ms")
+    print(f"{args.vpsdb_json}: {len(text.encode('utf-8'))} bytes, median of {args.runs} loads")
+    print("format".ljust(8) + "".join(c.rjust(12) for c in cols))
+    for codec, row in results.items():
+        print(codec.ljust(8) + "".join(str(row[c]).rjust(12) for c in cols))
+    if "zstd" not in results:
+        print("zstd: skipped (pip install zstandard)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Keep the shared local copy in sync with upstream, for workers that only watch it.
+
+Run one of these next to the app (same storage volume) and start the app with
+`VPSDB_UPSTREAM_SYNC=false VPSDB_WATCH_LOCAL=true`: the sidecar is then the
+only process that talks to upstream, and every worker reloads as soon as the
+sidecar swaps in a new copy.
+
+Examples:
+    python -m app.tools.sync_sidecar                 # check every 300s
+    python -m app.tools.sync_sidecar --interval 60
+    python -m app.tools.sync_sidecar --once          # one check, e.g. from cron
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import List
+
+from app.configs.settings import Settings
+from app.services.vpsdb_sync_service import VpsDbSyncService
+
+
+def sync_once(service: VpsDbSyncService) -> bool:
+    """Run one upstream check; return False when it failed."""
+    started = time.perf_counter()
+    try:
+        result = service.sync_if_needed()
+    except Exception as e:
+        print(f"Sync failed: {e}")
+        return False
+    state = "updated" if result.updated else "up to date"
+    print(
+        f"Sync {state}: local {result.local_timestamp}, remote {result.remote_timestamp} "
+        f"({time.perf_counter() - started:.1f}s)"
+    )
+    return True
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.sync_sidecar", description=__doc__.splitlines()[0])
+    parser.add_argument("--interval", type=float, default=300.0, help="Seconds between upstream checks")
+    parser.add_argument("--once", action="store_true", help="Check once and exit (non-zero on failure)")
+    args = parser.parse_args(argv)
+
+    service = VpsDbSyncService(Settings.from_env())
+    if args.once:
+        return 0 if sync_once(service) else 1
+
+    while True:
+        sync_once(service)
+        time.sleep(max(1.0, args.interval))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
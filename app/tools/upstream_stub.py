@@ -0,0 +1,328 @@
+"""Minimal local stand-in for the upstream VPS DB endpoints.
+
+Serves `/lastUpdated.json` and `/vpsdb.json` from a local `vpsdb.json` so load
+and latency runs never touch GitHub Pages. It also serves fake download links
+for link checker runs: `/links/ok/...` (200), `/links/slow/...` (200 after
+`link_delay_seconds`) and `/links/dead/...` (404).
+
+Upstream misbehaviour is scriptable through a `FaultProfile`: added latency,
+bandwidth throttling, truncated bodies, 5xx bursts or random errors and
+regressed timestamps. Set `stub.faults` in process, or `POST /_faults` with a
+profile name or fields (`GET /_faults` shows the profile and counters):
+
+    python -m app.tools.upstream_stub ./data/vpsdb.json --port 8765 --profile slow
+    curl -X POST localhost:8765/_faults -d '{"profile": "errors-burst"}'
+    curl -X POST localhost:8765/_faults -d '{"latencyMs": 1500, "bandwidthKbps": 256}'
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, fields, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+# Upstream paths faults apply to (link checker paths are never faulted).
+UPSTREAM_PATHS = ("lastUpdated.json", "vpsdb.json")
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+    """How the stub misbehaves on the upstream paths (all off by default)."""
+
+    name: str = "healthy"
+    latency_ms: float = 0.0  # before the response headers
+    jitter_ms: float = 0.0  # plus a uniform random extra
+    bandwidth_kbps: float = 0.0  # body throttle (0 = unlimited)
+    truncate_ratio: float = 0.0  # send only this fraction of vpsdb.json (0 = all of it)
+    truncate_declared: bool = True  # keep the full Content-Length (client notices) or close-delimit the body
+    error_status: int = 503
+    error_burst: int = 0  # the next N upstream requests fail with error_status
+    error_rate: float = 0.0  # and then this random fraction of them
+    timestamp_regression_ms: int = 0  # serve lastUpdated this much older than the served data
+    paths: tuple = UPSTREAM_PATHS
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "FaultProfile":
+        """Build from a JSON payload: `{"profile": name}` and/or camelCase or snake_case fields."""
+        base = PROFILES[payload["profile"]] if "profile" in payload else cls(name="custom")
+        known = {f.name for f in fields(cls)}
+        changes = {}
+        for key, value in payload.items():
+            if key == "profile":
+                continue
+            snake = "".join(f"_{c.lower()}" if c.isupper() else c for c in key)
+            if snake not in known:
+                raise ValueError(f"Unknown fault field '{key}'")
+            changes[snake] = tuple(value) if snake == "paths" else value
+        return replace(base, **changes)
+
+    def to_dict(self) -> dict:
+        out = {}
+        for key, value in asdict(self).items():
+            head, *rest = key.split("_")
+            out[head + "".join(p.title() for p in rest)] = list(value) if key == "paths" else value
+        return out
+
+
+# Named profiles for `--profile`, `{"profile": ...}` and app.tools.faultbench.
+PROFILES: Dict[str, FaultProfile] = {
+    p.name: p
+    for p in (
+        FaultProfile(),
+        FaultProfile(name="slow", latency_ms=1500, jitter_ms=500),
+        FaultProfile(name="throttled", bandwidth_kbps=512),
+        FaultProfile(name="truncated", truncate_ratio=0.5),
+        FaultProfile(name="truncated-undeclared", truncate_ratio=0.5, truncate_declared=False),
+        FaultProfile(name="errors-burst", error_burst=2, error_status=503),
+        FaultProfile(name="flaky", error_rate=0.3, error_status=502),
+        FaultProfile(name="timestamp-regression", timestamp_regression_ms=86_400_000),
+    )
+}
+
+
+class UpstreamStub:
+    """Threaded HTTP server serving one vpsdb.json and its lastUpdated timestamp."""
+
+    def __init__(
+        self,
+        json_path: str,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        last_updated: int | None = None,
+        delay_seconds: float = 0.0,
+        link_delay_seconds: float = 2.0,
+        faults: FaultProfile | None = None,
+        seed: int | None = None,
+    ):
+        self.delay_seconds = delay_seconds
+        self.link_delay_seconds = link_delay_seconds
+        with open(json_path, "rb") as f:
+            self.db_body = f.read()
+        self.last_updated = last_updated if last_updated is not None else int(os.path.getmtime(json_path) * 1000)
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._burst_left = 0
+        self.counters: Counter = Counter()
+        self.faults = faults or FaultProfile()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def faults(self) -> FaultProfile:
+        return self._faults
+
+    @faults.setter
+    def faults(self, profile: FaultProfile) -> None:
+        """Switch profiles; restarts the error burst."""
+        with self._lock:
+            self._faults = profile
+            self._burst_left = profile.error_burst
+
+    def publish(self, db_body: bytes, last_updated: int) -> None:
+        """Serve a new upstream version."""
+        with self._lock:
+            self.db_body = db_body
+            self.last_updated = last_updated
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self, storage_dir: str) -> dict:
+        """Environment variables pointing the app at this stub."""
+        return {
+            "VPSDB_REMOTE_URL": f"{self.base_url}/vpsdb.json",
+            "VPSDB_LASTUPDATED_URL": f"{self.base_url}/lastUpdated.json",
+            "VPSDB_MIRRORS": "",
+            "VPSDB_STORAGE_DIR": storage_dir,
+            "VPSDB_LOCAL_JSON_PATH": f"{storage_dir}/vpsdb.json",
+            "VPSDB_LOCAL_TIMESTAMP_PATH": f"{storage_dir}/vpsdb.lastUpdated.json",
+        }
+
+    def start(self) -> "UpstreamStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="upstream-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _should_fail(self, faults: FaultProfile) -> bool:
+        with self._lock:
+            if self._burst_left > 0:
+                self._burst_left -= 1
+                return True
+            return faults.error_rate > 0 and self._random.random() < faults.error_rate
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_HEAD(self):  # noqa: N802 (http.server API)
+                path = self.path.split("?", 1)[0]
+                if path.startswith("/links/"):
+                    self._link(path, with_body=False)
+                else:
+                    self.send_error(405)
+
+            def _link(self, path: str, with_body: bool) -> None:
+                kind = path.split("/")[2] if path.count("/") >= 2 else ""
+                if kind == "slow":
+                    time.sleep(stub.link_delay_seconds)
+                if kind not in ("ok", "slow"):
+                    self.send_error(404)
+                    return
+                body = b"fake download"
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if with_body:
+                    self.wfile.write(body)
+
+            def _json(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _control(self) -> None:
+                if self.command == "POST":
+                    length = int(self.headers.get("Content-Length") or 0)
+                    try:
+                        stub.faults = FaultProfile.from_dict(json.loads(self.rfile.read(length) or b"{}"))
+                    except (KeyError, TypeError, ValueError) as e:
+                        self._json(400, {"error": f"Invalid fault profile: {e}"})
+                        return
+                self._json(200, {"faults": stub.faults.to_dict(), "counters": dict(stub.counters)})
+
+            def do_POST(self):  # noqa: N802 (http.server API)
+                if self.path.split("?", 1)[0] == "/_faults":
+                    self._control()
+                else:
+                    self.send_error(405)
+
+            def do_GET(self):  # noqa: N802 (http.server API)
+                path = self.path.split("?", 1)[0]
+                if path.startswith("/links/"):
+                    self._link(path, with_body=True)
+                    return
+                if path == "/_faults":
+                    self._control()
+                    return
+                name = path.rsplit("/", 1)[-1]
+                if name not in UPSTREAM_PATHS:
+                    self.send_error(404)
+                    return
+
+                faults = stub.faults if name in stub.faults.paths else FaultProfile()
+                stub.counters[name] += 1
+                delay = stub.delay_seconds + faults.latency_ms / 1000.0
+                if faults.jitter_ms:
+                    delay += stub._random.uniform(0, faults.jitter_ms) / 1000.0
+                if delay:
+                    time.sleep(delay)
+                if stub._should_fail(faults):
+                    stub.counters["errors"] += 1
+                    self.send_error(faults.error_status)
+                    return
+
+                with stub._lock:
+                    db_body, last_updated = stub.db_body, stub.last_updated
+                if name == "lastUpdated.json":
+                    if faults.timestamp_regression_ms:
+                        stub.counters["regressedTimestamps"] += 1
+                    body = json.dumps({"lastUpdated": last_updated - faults.timestamp_regression_ms}).encode("utf-8")
+                else:
+                    body = db_body
+                declared = len(body)
+                if name == "vpsdb.json" and faults.truncate_ratio > 0:
+                    stub.counters["truncated"] += 1
+                    body = body[: int(len(body) * faults.truncate_ratio)]
+                    if not faults.truncate_declared:
+                        declared = None
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                if declared is None:
+                    self.send_header("Connection", "close")
+                    self.close_connection = True
+                else:
+                    self.send_header("Content-Length", str(declared))
+                self.end_headers()
+                self._write(body, faults.bandwidth_kbps)
+
+            def _write(self, body: bytes, kbps: float) -> None:
+                if kbps <= 0:
+                    self.wfile.write(body)
+                    return
+                chunk = max(1024, int(kbps * 1024 / 10))  # ~10 writes per second
+                for i in range(0, len(body), chunk):
+                    self.wfile.write(body[i : i + chunk])
+                    time.sleep(chunk / (kbps * 1024))
+
+            def log_message(self, format, *args):  # silence per-request logging
+                return
+
+        return Handler
+
+
+def wait_for(url: str, timeout: float = 30.0) -> None:
+    """Poll a URL until it answers 200 or the timeout passes."""
+    import requests
+
+    deadline = time.time() + timeout
+    while True:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        if time.time() > deadline:
+            raise TimeoutError(f"{url} not ready after {timeout}s")
+        time.sleep(0.1)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.upstream_stub", description=__doc__.splitlines()[0])
+    parser.add_argument("json_path", help="vpsdb.json to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--last-updated", type=int, default=None, help="Served timestamp (default: file mtime)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="healthy")
+    parser.add_argument("--faults", default=None, help="JSON fault fields applied on top of --profile")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for jitter and random errors")
+    args = parser.parse_args(argv)
+
+    payload = {"profile": args.profile, **(json.loads(args.faults) if args.faults else {})}
+    stub = UpstreamStub(
+        args.json_path,
+        host=args.host,
+        port=args.port,
+        last_updated=args.last_updated,
+        faults=FaultProfile.from_dict(payload),
+        seed=args.seed,
+    ).start()
+    print(f"Serving {args.json_path} at {stub.base_url} with faults {stub.faults.to_dict()}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Compare gunicorn worker classes at an equal core count: throughput, latency and memory.
+
+Each configuration gets a fresh gunicorn (against a local upstream stub) and
+the same load mix. Memory is the summed RSS of the gunicorn master and its
+workers after the run. Worker classes whose dependency is missing (gevent)
+are reported as skipped.
+
+Examples:
+    python -m app.tools.workerbench --upstream-stub ./data/vpsdb.json --cores 2
+    python -m app.tools.workerbench --upstream-stub ./data/vpsdb.json --cores 4 --threads 8 -c 32 -d 30
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from app.tools.loadgen import DEFAULT_MIX, http_fetch_factory, parse_mix, report, run_load, spawn_gunicorn
+
+
+def _children(pid: int) -> List[int]:
+    out = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # Fields after the parenthesized command name; ppid is the second one.
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            out.append(int(entry))
+    return out
+
+
+def tree_rss_mb(pid: int) -> float:
+    """Summed VmRSS of `pid` and its direct children, in MiB (Linux only)."""
+    total_kb = 0
+    for p in [pid, *_children(pid)]:
+        try:
+            with open(f"/proc/{p}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return round(total_kb / 1024.0, 1)
+
+
+def configurations(cores: int, threads: int, connections: int) -> List[Tuple[str, str, int, List[str]]]:
+    """(label, worker class, threads, extra args) with one worker process per core."""
+    return [
+        ("sync", "sync", 1, []),
+        (f"gthread x{threads}", "gthread", threads, []),
+        (f"gevent x{connections}", "gevent", 1, ["--worker-connections", str(connections)]),
+    ]
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.workerbench", description=__doc__.splitlines()[0])
+    parser.add_argument("--upstream-stub", metavar="VPSDB_JSON", required=True, help="Serve this vpsdb.json from a local upstream stub")
+    parser.add_argument("--cores", type=int, default=2, help="Worker processes for every worker class")
+    parser.add_argument("--threads", type=int, default=4, help="Threads per gthread worker")
+    parser.add_argument("--connections", type=int, default=100, help="Connections per gevent worker")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-d", "--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    from app.tools.upstream_stub import UpstreamStub
+
+    mix = parse_mix(args.mix)
+    stub = UpstreamStub(args.upstream_stub).start()
+    results: Dict[str, dict] = {}
+    try:
+        os.environ.update(stub.env(tempfile.mkdtemp(prefix="vpsdb-workerbench-")))
+        for label, worker_class, threads, extra in configurations(args.cores, args.threads, args.connections):
+            if worker_class == "gevent" and importlib.util.find_spec("gevent") is None:
+                results[label] = {"skipped": "gevent is not installed"}
+                continue
+            proc = spawn_gunicorn(args.cores, worker_class, threads, args.port, extra)
+            try:
+                make_fetch = http_fetch_factory(f"http://127.0.0.1:{args.port}")
+                if args.warmup > 0:
+                    run_load(make_fetch, mix, args.concurrency, args.warmup)
+                stats, wall = run_load(make_fetch, mix, args.concurrency, args.duration)
+                total = report(stats, wall)["TOTAL"]
+                results[label] = {**total, "rss_mb": tree_rss_mb(proc.pid)}
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+                time.sleep(0.5)  # let the port be released
+    finally:
+        stub.stop()
+
+    if args.json:
+        print(json.dumps({"cores": args.cores, "concurrency": args.concurrency, "results": results}, indent=2))
+        return 0
+
+    cols = ("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "rss_mb")
+    width = max(len(label) for label in results) + 2
+    print(f"{args.cores} worker processes, {args.concurrency} client threads, {args.duration:.0f}s per run")
+    print("worker class".ljust(width) + "".join(c.rjust(10) for c in cols))
+    for label, row in results.items():
+        if "skipped" in row:
+            print(label.ljust(width) + f"  skipped: {row['skipped']}")
+        else:
+            print(label.ljust(width) + "".join(str(row[c]).rjust(10) for c in cols))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
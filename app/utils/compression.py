@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import gzip
+import io
+import os
+from typing import IO, Tuple
+
+# Compression name -> file suffix appended to the configured local JSON path.
+SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def zstd_available() -> bool:
+    """Return True when the optional `zstandard` package is installed."""
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve(name: str | None) -> str:
+    """Normalize a compression name; zstd falls back to gzip when unavailable."""
+    v = (name or "none").strip().lower()
+    if v in ("gz",):
+        v = "gzip"
+    if v in ("zst", "zstandard"):
+        v = "zstd"
+    if v not in SUFFIXES:
+        return "none"
+    if v == "zstd" and not zstd_available():
+        print("zstd requested but the zstandard package is not installed; using gzip")
+        return "gzip"
+    return v
+
+
+def compressed_path(path: str, compression: str) -> str:
+    """The on-disk path of `path` stored with `compression`."""
+    return f"{path}{SUFFIXES[compression]}"
+
+
+def find_existing(path: str, preferred: str) -> Tuple[str, str] | None:
+    """Return (file path, compression) of the stored copy: the newest one, `preferred` on ties.
+
+    Copies written with another setting are still found, so changing the
+    setting never loses the local copy, and a copy left behind by an earlier
+    setting is never read instead of a newer one.
+    """
+    found = []
+    for rank, compression in enumerate([preferred, *(c for c in SUFFIXES if c != preferred)]):
+        candidate = compressed_path(path, compression)
+        try:
+            mtime = os.stat(candidate).st_mtime_ns
+        except OSError:
+            continue
+        found.append((-mtime, rank, candidate, compression))
+    if not found:
+        return None
+    _, _, candidate, compression = min(found)
+    return candidate, compression
+
+
+def open_text_reader(path: str, compression: str) -> IO[str]:
+    """Open a stored copy for reading as text, decompressing while reading."""
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == "zstd":
+        import zstandard
+
+        raw = open(path, "rb")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True), encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def open_text_writer(path: str, compression: str, level: int | None = None) -> IO[str]:
+    """Open `path` for writing text, compressing while writing."""
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8", compresslevel=level if level is not None else 6)
+    if compression == "zstd":
+        import zstandard
+
+        raw = open(path, "wb")
+        cctx = zstandard.ZstdCompressor(level=level if level is not None else 3)
+        return io.TextIOWrapper(cctx.stream_writer(raw, closefd=True), encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
@@ -71,3 +71,12 @@ def get_csv_list(name: str) -> list[str]:
         if p not in out:
             out.append(p)
     return out
+
+
+def get_optional_int(name: str) -> int | None:
+    """Read an optional int query param (None when missing or invalid)."""
+    v = request.args.get(name, None)
+    try:
+        return int(v) if v not in ("", None) else None
+    except ValueError:
+        return None
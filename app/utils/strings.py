@@ -8,3 +8,10 @@ def truncate(text: str | None, max_len: int = 60) -> str:
     if len(text) <= max_len:
         return text
     return text[: max_len - 1] + "…"
+
+
+def norm_key(value: object) -> str:
+    """Normalize a value for case-insensitive matching ("" for None/blank)."""
+    if value is None:
+        return ""
+    return str(value).strip().lower()
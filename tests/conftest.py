@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+
+import pytest
+
+from app.configs.settings import Settings
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch) -> Settings:
+    """Settings with an empty storage dir and no upstream access."""
+    monkeypatch.setenv("VPSDB_STORAGE_DIR", str(tmp_path))
+    monkeypatch.setenv("VPSDB_REMOTE_URL", "http://127.0.0.1:9/vpsdb.json")
+    monkeypatch.setenv("VPSDB_LASTUPDATED_URL", "http://127.0.0.1:9/lastUpdated.json")
+    monkeypatch.setenv("VPSDB_MIRRORS", "")
+    monkeypatch.setenv("VPSDB_UPSTREAM_SYNC", "false")
+    return Settings.from_env()
+
+
+def make_raw_games(count: int = 12) -> list:
+    """A small upstream-shaped game array with deterministic dates, formats and features."""
+    base, day = 1_700_000_000_000, 86_400_000
+    games = []
+    for i in range(count):
+        games.append(
+            {
+                "id": f"g{i}",
+                "name": f"Game {i}",
+                "manufacturer": ("Bally", "Williams", "Stern")[i % 3],
+                "year": 1970 + i,
+                "createdAt": base + i * day,
+                "updatedAt": base + (i + 1) * 2 * day,
+                "tableFiles": [
+                    {
+                        "id": f"t{i}_{j}",
+                        "version": "1.0",
+                        "tableFormat": ("VPX", "FP")[(i + j) % 2],
+                        "authors": [("alice", "bob", "carol")[(i + j) % 3]],
+                        "imgUrl": f"http://img/t{i}_{j}.png",
+                        "createdAt": base + i * day + j * 3_600_000,
+                        "updatedAt": base + ((i * 5 + j) % count + 1) * 2 * day,
+                        "urls": [{"url": f"http://x/{i}/{j}/a"}, {"url": f"http://x/{i}/{j}/b"}],
+                    }
+                    for j in range(2)
+                ],
+                "b2sFiles": [
+                    {
+                        "id": f"b{i}",
+                        "version": "2.0",
+                        "features": [("B2S", "DMD", "FullDMD")[i % 3]],
+                        "authors": [("carol", "dave")[i % 2]],
+                        "imgUrl": f"http://img/b{i}.png",
+                        # Created and updated orders are reversed for backglasses.
+                        "createdAt": base + i * day,
+                        "updatedAt": base + (count - i) * 3 * day,
+                        "urls": [{"url": f"http://y/{i}"}],
+                    }
+                ],
+            }
+        )
+    return games
+
+
+def write_local_copy(settings: Settings, raw: list, timestamp: int) -> None:
+    """Write `raw` as the local copy (uncompressed) with its lastUpdated timestamp."""
+    os.makedirs(settings.STORAGE_DIR, exist_ok=True)
+    with open(settings.LOCAL_JSON_PATH, "w", encoding="utf-8") as f:
+        json.dump(raw, f)
+    with open(settings.LOCAL_TIMESTAMP_PATH, "w", encoding="utf-8") as f:
+        json.dump({"lastUpdated": timestamp}, f)
+
+
+def file_upstream(settings: Settings, directory, raw: list, timestamp: int) -> Settings:
+    """Publish `raw` as a file:// upstream in `directory` and point the settings at it."""
+    os.makedirs(directory, exist_ok=True)
+    db_path = os.path.join(directory, "vpsdb.json")
+    ts_path = os.path.join(directory, "lastUpdated.json")
+    with open(db_path, "w", encoding="utf-8") as f:
+        json.dump(raw, f)
+    with open(ts_path, "w", encoding="utf-8") as f:
+        json.dump({"lastUpdated": timestamp}, f)
+    return dataclasses.replace(settings, VPSDB_MIRRORS=((db_path, ts_path),))
+
+
+@pytest.fixture
+def app(settings):
+    """The Flask app serving `make_raw_games()` from the local copy."""
+    from app import create_app
+
+    write_local_copy(settings, make_raw_games(), 1_700_000_000_000)
+    flask_app = create_app()
+    flask_app.extensions["vpsdb_snapshots"].current()
+    return flask_app
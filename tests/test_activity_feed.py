@@ -0,0 +1,83 @@
+import pytest
+
+from app.services.activity_feed import ActivityCursor, InvalidCursorError, activity_page
+from app.services.game_index import GameQuery
+from app.services.game_snapshot import GameSnapshot
+from app.services.vpsdb_mapper import VpsDbMapper
+from tests.conftest import make_raw_games
+
+V1, V2 = 1_700_000_000_000, 1_700_000_100_000
+
+
+def _index():
+    raw = make_raw_games(10)
+    # Few distinct times, so pages keep ending in the middle of a tie.
+    for i, game in enumerate(raw):
+        for t in game["tableFiles"]:
+            t["updatedAt"] = V1 - (i // 4) * 60_000
+        for b in game["b2sFiles"]:
+            b["updatedAt"] = V1 - (i // 3) * 60_000
+    return GameSnapshot.build((V1, 0, 0), VpsDbMapper().map_games(raw)).index
+
+
+def _key(item):
+    return (item.kind, item.item.id)
+
+
+def _walk(index, limit, version_after_first=None):
+    """Page through the whole feed; optionally serve every page after the first from another version."""
+    seen, cursor, version = [], None, V1
+    while True:
+        page = activity_page(index, version, GameQuery(), "updatedAt", limit, cursor=cursor)
+        seen.extend(_key(i) for i in page.items)
+        if page.next_cursor is None:
+            return seen
+        cursor = page.next_cursor
+        if version_after_first is not None:
+            version = version_after_first
+            version_after_first = None
+
+
+@pytest.mark.parametrize("limit", [1, 3, 7, 50])
+def test_paging_matches_the_full_merge(limit):
+    index = _index()
+    full = [_key(i) for i in activity_page(index, V1, GameQuery(), "updatedAt", 1000).items]
+    assert len(full) == 30
+    assert _walk(index, limit) == full
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5, 7])
+def test_resume_across_versions_keeps_items_sharing_the_last_time(limit):
+    index = _index()
+    full = [_key(i) for i in activity_page(index, V1, GameQuery(), "updatedAt", 1000).items]
+    # Same data under a new version: the cursor falls back to its time and served ids.
+    resumed = _walk(index, limit, version_after_first=V2)
+    assert resumed == full
+
+
+def test_every_page_resumed_from_a_new_version():
+    index = _index()
+    full = [_key(i) for i in activity_page(index, V1, GameQuery(), "updatedAt", 1000).items]
+    seen, cursor, version = [], None, V1
+    while True:
+        page = activity_page(index, version, GameQuery(), "updatedAt", 4, cursor=cursor)
+        seen.extend(_key(i) for i in page.items)
+        if page.next_cursor is None:
+            break
+        cursor, version = page.next_cursor, version + 1
+    assert seen == full
+
+
+def test_cursor_round_trip_and_sort_check():
+    cursor = ActivityCursor(
+        version=V1,
+        sort="updatedAt",
+        offsets={"table": 3, "backglass": 1},
+        last_ms=5,
+        served_at_last=frozenset({"table:t1_0"}),
+    )
+    assert ActivityCursor.decode(cursor.encode(), "updatedAt") == cursor
+    with pytest.raises(InvalidCursorError):
+        ActivityCursor.decode(cursor.encode(), "createdAt")
+    with pytest.raises(InvalidCursorError):
+        ActivityCursor.decode("not-a-cursor", "updatedAt")
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import csv
+import dataclasses
+import io
+import json
+
+import pytest
+
+from app.services import catalog_export
+from app.services.catalog_export import iter_items, stream_export
+from app.services.game_index import GameQuery
+from app.services.game_snapshot import GameSnapshot
+from app.services.vpsdb_mapper import VpsDbMapper
+from tests.conftest import make_raw_games
+
+QUERIES = [
+    GameQuery(),
+    GameQuery(manufacturers=("bally",)),
+    GameQuery(formats=("vpx",), authors=("alice",)),
+    GameQuery(features=("dmd",), year_from=1975, match="any"),
+]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def index(request, settings):
+    games = VpsDbMapper().map_games(make_raw_games(30))
+    version = (1, 0, 0)
+    if request.param == "memory":
+        return GameSnapshot.build(version, games).index
+    from app.services.sqlite_store import SqliteSnapshot
+
+    settings = dataclasses.replace(settings, STORE_BACKEND="sqlite")
+    return SqliteSnapshot.open_or_build(settings, version, lambda: games).index
+
+
+def _ids(items) -> list:
+    return [i.id for i in items]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_scans_match_the_paged_listings(index, query):
+    for offset in (0, 7):
+        assert _ids(index.iter_games(query, offset=offset)) == _ids(index.games(query, offset=offset))
+        assert _ids(index.iter_tables(query, offset=offset)) == _ids(index.tables(query, offset=offset))
+        assert _ids(index.iter_backglasses(query, offset=offset)) == _ids(index.backglasses(query, offset=offset))
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_pages_are_cut_from_one_ordered_pass(index, query):
+    pages = list(iter_items(index, "tables", query, page_size=4))
+    expected = _ids(index.tables(query, sort="createdAt"))
+
+    assert [i.id for page in pages for i in page] == expected
+    assert all(len(page) == 4 for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= 4
+
+
+def test_stream_emits_one_chunk_per_page(index, monkeypatch):
+    real_iter_items = catalog_export.iter_items
+    monkeypatch.setattr(catalog_export, "iter_items", lambda *args: real_iter_items(*args, page_size=10))
+
+    ndjson = list(stream_export(index, "tables", GameQuery(), "ndjson"))
+    assert [chunk.count("\n") for chunk in ndjson] == [10, 10, 10, 10, 10, 10]
+
+    rows = list(stream_export(index, "backglasses", GameQuery(), "csv"))
+    # The header rides along with the first page.
+    assert [chunk.count("\n") for chunk in rows] == [11, 10, 10]
+
+
+def test_ndjson_export_matches_the_listing_order(app):
+    resp = app.test_client().get("/api/export/tables")
+
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.mimetype == "application/x-ndjson"
+    assert resp.headers["X-Snapshot-Version"] == "1700000000000"
+    assert resp.headers["Content-Disposition"] == 'attachment; filename="vpsdb-tables-1700000000000.ndjson"'
+
+    lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    index = app.extensions["vpsdb_snapshots"].current().index
+    assert [line["id"] for line in lines] == _ids(index.tables(GameQuery(), sort="createdAt"))
+
+
+def test_csv_export_has_a_header_and_flat_rows(app):
+    resp = app.test_client().get("/api/export/games?output=csv")
+
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/csv"
+    rows = list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+    assert len(rows) == 12
+    header = ["id", "name", "manufacturer", "year", "createdAt", "updatedAt", "tableCount", "backglassCount"]
+    assert list(rows[0]) == header
+    assert {row["tableCount"] for row in rows} == {"2"}
+
+
+def test_filters_pass_through_to_the_export(app):
+    client = app.test_client()
+    body = client.get("/api/export/games?manufacturer=Bally").get_data(as_text=True)
+    games = [json.loads(line) for line in body.splitlines()]
+    assert len(games) == 4
+    assert {g["manufacturer"] for g in games} == {"Bally"}
+
+    body = client.get("/api/export/tables?output=csv&format=vpx&yearFrom=1975").get_data(as_text=True)
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert rows
+    assert {row["tableFormat"] for row in rows} == {"VPX"}
+    assert all(int(row["gameYear"]) >= 1975 for row in rows)
+
+
+def test_unknown_kind_and_output_are_rejected(app):
+    client = app.test_client()
+    assert client.get("/api/export/players").status_code == 404
+
+    resp = client.get("/api/export/games?output=xml")
+    assert resp.status_code == 400
+    assert resp.get_json()["supported"] == ["csv", "ndjson"]
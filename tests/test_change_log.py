@@ -0,0 +1,80 @@
+import copy
+import dataclasses
+
+from app.services.change_log import ChangeLog
+from app.utils.dates import epoch_to_dt
+from tests.conftest import make_raw_games
+
+BASE = 1_760_000_000_000
+STEP = 60_000
+
+
+def _versions(count: int) -> list:
+    """`count` successive datasets, each renaming one more game than the last."""
+    raw = make_raw_games(6)
+    out = []
+    for i in range(count):
+        raw = copy.deepcopy(raw)
+        if i:
+            raw[i % len(raw)]["name"] = f"Renamed {i}"
+        out.append((BASE + i * STEP, raw))
+    return out
+
+
+def _record_all(log: ChangeLog, versions) -> None:
+    for ts, raw in versions:
+        log.record(raw, ts)
+
+
+def test_since_reads_only_lines_after_since(settings):
+    log = ChangeLog(settings)
+    _record_all(log, _versions(5))
+
+    changes = log.since(epoch_to_dt(BASE + 2 * STEP))
+    assert changes.complete
+    assert changes.version == BASE + 4 * STEP
+    assert set(changes.changes["games"]["updated"]) == {"g3", "g4"}
+
+    # up_to caps the answer at the served snapshot.
+    changes = log.since(epoch_to_dt(BASE), up_to=BASE + 2 * STEP)
+    assert changes.version == BASE + 2 * STEP
+    assert set(changes.changes["games"]["updated"]) == {"g1", "g2"}
+
+
+def test_index_extends_from_last_offset(settings):
+    log = ChangeLog(settings)
+    versions = _versions(4)
+    _record_all(log, versions[:2])
+    assert log.since(epoch_to_dt(BASE)).version == BASE + STEP
+    assert log.indexed_entry_count == 2
+
+    # Another process appends; this reader only indexes the new lines.
+    writer = ChangeLog(settings)
+    _record_all(writer, versions[2:])
+    changes = log.since(epoch_to_dt(BASE + STEP))
+    assert log.indexed_entry_count == 4
+    assert changes.version == BASE + 3 * STEP
+    assert set(changes.changes["games"]["updated"]) == {"g2", "g3"}
+
+
+def test_log_keeps_only_the_retained_versions(settings):
+    settings = dataclasses.replace(settings, CHANGELOG_VERSIONS=3, HISTORY_VERSIONS=0)
+    log = ChangeLog(settings)
+    _record_all(log, _versions(6))
+
+    with open(log._log_path, "rb") as f:
+        assert len(f.readlines()) == 3
+    versions, _ = log.entries()
+    assert versions == [BASE + 3 * STEP, BASE + 4 * STEP, BASE + 5 * STEP]
+
+    assert not log.since(epoch_to_dt(BASE)).complete
+    changes = log.since(epoch_to_dt(BASE + 3 * STEP))
+    assert changes.complete
+    assert set(changes.changes["games"]["updated"]) == {"g4", "g5"}
+
+
+def test_retention_covers_history(settings):
+    settings = dataclasses.replace(settings, CHANGELOG_VERSIONS=2, HISTORY_VERSIONS=4)
+    log = ChangeLog(settings)
+    _record_all(log, _versions(6))
+    assert len(log.entries()[0]) == 4
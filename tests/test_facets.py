@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+
+from app.services.game_index import GameQuery
+from app.services.game_snapshot import GameSnapshot
+from app.services.vpsdb_mapper import VpsDbMapper
+from tests.conftest import make_raw_games
+
+QUERIES = [
+    GameQuery(formats=("vpx",)),
+    GameQuery(features=("dmd",)),
+    GameQuery(formats=("fp",), authors=("alice",)),
+    GameQuery(manufacturers=("bally",), year_from=1972),
+    GameQuery(formats=("vpx",), features=("b2s",), match="any"),
+]
+
+
+def _raw() -> list:
+    raw = make_raw_games()
+    # A game without VPX tables whose backglass author appears nowhere else.
+    raw[0]["tableFiles"] = [dict(t, tableFormat="FP") for t in raw[0]["tableFiles"]]
+    raw[0]["b2sFiles"][0]["authors"] = ["zed"]
+    return raw
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def snapshot(request, settings):
+    games = VpsDbMapper().map_games(_raw())
+    version = (1, 0, 0)
+    if request.param == "memory":
+        return GameSnapshot.build(version, games)
+    from app.services.sqlite_store import SqliteSnapshot
+
+    return SqliteSnapshot.open_or_build(dataclasses.replace(settings, STORE_BACKEND="sqlite"), version, lambda: games)
+
+
+def _counts(facets) -> dict:
+    return {(name, str(value)): count for name, ranked in facets.ranked.items() for value, count in ranked}
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_filtered_counts_never_exceed_unfiltered(snapshot, query):
+    unfiltered = _counts(snapshot.facets)
+    filtered = snapshot.facets_for(query)
+
+    for key, count in _counts(filtered).items():
+        assert count <= unfiltered[key], key
+    for kind, total in filtered.totals.items():
+        assert total <= snapshot.facets.totals[kind]
+
+
+def test_backglass_facets_follow_a_table_only_filter(snapshot):
+    filtered = _counts(snapshot.facets_for(GameQuery(formats=("vpx",))))
+
+    assert ("author", "zed") in _counts(snapshot.facets)
+    assert ("author", "zed") not in filtered
+    assert snapshot.facets_for(GameQuery(formats=("vpx",))).totals["backglasses"] < snapshot.facets.totals["backglasses"]
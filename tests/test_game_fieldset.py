@@ -0,0 +1,73 @@
+import pytest
+
+
+def _games(client, query: str) -> list:
+    resp = client.get(f"/api/games?limit=3&{query}")
+    assert resp.status_code == 200
+    return resp.get_json()["games"]
+
+
+def test_no_parameters_serialize_every_field(app):
+    game = _games(app.test_client(), "")[0]
+    assert set(game) == {"id", "name", "manufacturer", "year", "createdAt", "updatedAt", "tableFiles", "b2sFiles"}
+    assert len(game["tableFiles"]) == 2
+    assert {"version", "urls", "game"} <= set(game["tableFiles"][0])
+
+
+def test_fields_select_game_and_child_keys(app):
+    client = app.test_client()
+
+    games = _games(client, "fields=id,NAME,updatedAt")
+    # Names match case-insensitively; unnamed children are omitted.
+    assert all(set(g) == {"id", "name", "updatedAt"} for g in games)
+
+    games = _games(client, "fields=name,tableFiles.version,tableFiles.tableFormat")
+    assert all(set(g) == {"name", "tableFiles"} for g in games)
+    assert all(set(t) == {"version", "tableFormat"} for g in games for t in g["tableFiles"])
+
+    games = _games(client, "fields=id,b2sFiles")
+    assert all(set(g) == {"id", "b2sFiles"} for g in games)
+    assert "features" in games[0]["b2sFiles"][0]
+
+
+def test_include_controls_which_children_are_serialized(app):
+    client = app.test_client()
+
+    games = _games(client, "include=b2sFiles")
+    assert all("tableFiles" not in g and len(g["b2sFiles"]) == 1 for g in games)
+    assert "manufacturer" in games[0]
+
+    games = _games(client, "include=")
+    assert all("tableFiles" not in g and "b2sFiles" not in g for g in games)
+
+    # `include` wins over children named in `fields`.
+    games = _games(client, "fields=id,tableFiles.id&include=b2sFiles")
+    assert all(set(g) == {"id", "b2sFiles"} for g in games)
+
+
+def test_child_limits_keep_the_most_recently_updated(app):
+    client = app.test_client()
+    full = {g["id"]: g for g in _games(client, "include=tableFiles")}
+
+    for game in _games(client, "include=tableFiles&tableFilesLimit=1"):
+        newest = max(full[game["id"]]["tableFiles"], key=lambda t: t["updatedAt"])
+        assert [t["id"] for t in game["tableFiles"]] == [newest["id"]]
+
+    games = _games(client, "tableFilesLimit=0&b2sFilesLimit=5")
+    assert all(g["tableFiles"] == [] and len(g["b2sFiles"]) == 1 for g in games)
+
+
+@pytest.mark.parametrize(
+    "query, message",
+    [
+        ("fields=id,colour", "Unknown game field 'colour'"),
+        ("fields=tableFiles.colour", "Unknown tableFiles field 'colour'"),
+        ("include=tableFiles,players", "Unknown include 'players'"),
+        ("tableFilesLimit=-1", "tableFilesLimit must be a non-negative integer"),
+        ("b2sFilesLimit=many", "b2sFilesLimit must be a non-negative integer"),
+    ],
+)
+def test_invalid_selections_answer_400(app, query, message):
+    resp = app.test_client().get(f"/api/games?{query}")
+    assert resp.status_code == 400
+    assert resp.get_json()["error"].startswith(message)
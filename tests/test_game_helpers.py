@@ -0,0 +1,39 @@
+import pytest
+
+from app.models.game import Game
+from app.services.game_index import GameIndex, GameQuery
+from app.services.vpsdb_mapper import VpsDbMapper
+from tests.conftest import make_raw_games
+
+
+@pytest.fixture
+def games():
+    return VpsDbMapper().map_games(make_raw_games())
+
+
+def _ids(items) -> list:
+    return [i.id for i in items]
+
+
+def test_deprecated_helpers_warn_and_agree_with_the_index(games):
+    index = GameIndex(games)
+
+    with pytest.warns(DeprecationWarning, match="Game.most_recent_games"):
+        assert _ids(Game.most_recent_games(games, 5, "updatedAt")) == _ids(index.games(GameQuery(), 5, "updatedAt"))
+    with pytest.warns(DeprecationWarning):
+        assert _ids(Game.most_recent_tables(games, 5)) == _ids(index.tables(GameQuery(), 5, "createdAt"))
+    with pytest.warns(DeprecationWarning):
+        assert _ids(Game.most_recent_backglasses(games, 5)) == _ids(index.backglasses(GameQuery(), 5, "updatedAt"))
+    with pytest.warns(DeprecationWarning):
+        tables = Game.tables_by_formats(games, ["vpx"], sort="updatedAt")
+    assert _ids(tables) == _ids(index.tables(GameQuery(formats=("vpx",)), sort="updatedAt"))
+    with pytest.warns(DeprecationWarning):
+        bgs = Game.backglasses_by_features(games, ["DMD"], limit=2)
+    assert _ids(bgs) == _ids(index.backglasses(GameQuery(features=("dmd",)), 2, "createdAt"))
+
+
+def test_empty_filters_return_nothing(games):
+    with pytest.warns(DeprecationWarning):
+        assert Game.tables_by_formats(games, []) == []
+    with pytest.warns(DeprecationWarning):
+        assert Game.backglasses_by_features(games, [" "]) == []
@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+from app.controllers import health_controller
+from tests.conftest import make_raw_games, write_local_copy
+
+TS = 1_700_000_000_000
+
+
+def test_ready_is_503_until_the_first_snapshot_loads(settings, monkeypatch):
+    from app import create_app
+
+    app = create_app()
+    client = app.test_client()
+
+    resp = client.get("/ready")
+    assert resp.status_code == 503
+    payload = resp.get_json()
+    assert payload["ready"] is False
+    assert payload["snapshot"] == {"loaded": False}
+    assert "sync" in payload
+    assert client.get("/health").status_code == 200
+
+    write_local_copy(settings, make_raw_games(), TS)
+    snapshot = app.extensions["vpsdb_snapshots"].current()
+    monkeypatch.setattr(health_controller, "time", SimpleNamespace(time=lambda: snapshot.built_at + 42.5))
+
+    resp = client.get("/ready")
+    assert resp.status_code == 200
+    payload = resp.get_json()
+    assert payload["ready"] is True
+    assert payload["snapshot"] == {
+        "loaded": True,
+        "timestamp": TS,
+        "builtAt": snapshot.built_at,
+        "ageSeconds": 42.5,
+        "games": 12,
+    }
+
+
+def test_ready_age_grows_with_the_snapshot(app, monkeypatch):
+    snapshot = app.extensions["vpsdb_snapshots"].peek()
+    client = app.test_client()
+
+    ages = []
+    for offset in (0.0, 3.25):
+        monkeypatch.setattr(health_controller, "time", SimpleNamespace(time=lambda: snapshot.built_at + offset))
+        ages.append(client.get("/ready").get_json()["snapshot"]["ageSeconds"])
+    assert ages == [0.0, 3.25]
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import os
+
+from app.services.game_index import GameQuery
+from app.services.game_snapshot import GameSnapshot, SnapshotProvider
+from app.services.ingest_worker import build_off_process
+from tests.conftest import make_raw_games, write_local_copy
+
+
+def test_off_process_ingestion_is_opt_in(settings):
+    assert settings.INGEST_PROCESSES == 0
+
+
+def test_off_process_snapshot_matches_in_process_build_from_any_cwd(settings, tmp_path, monkeypatch):
+    write_local_copy(settings, make_raw_games(), 1_700_000_000_000)
+    version = SnapshotProvider(settings).loader.local_version()
+    monkeypatch.chdir(tmp_path)
+
+    snapshot = build_off_process(settings, version)
+
+    expected = GameSnapshot.build(version, SnapshotProvider(settings)._load_games())
+    assert isinstance(snapshot, GameSnapshot)
+    assert [t.id for t in snapshot.index.tables(GameQuery())] == [t.id for t in expected.index.tables(GameQuery())]
+    # Nothing is exchanged through the shared storage dir.
+    assert not [n for n in os.listdir(settings.STORAGE_DIR) if "snapshot" in n or n.endswith(".pickle")]
+
+
+def test_sqlite_backend_hands_back_the_store_file(settings, monkeypatch):
+    from app.configs.settings import Settings
+    from app.services.sqlite_store import SqliteSnapshot
+
+    # The child reads its settings from the environment.
+    monkeypatch.setenv("VPSDB_STORE_BACKEND", "sqlite")
+    monkeypatch.setenv("VPSDB_INGEST_PROCESSES", "1")
+    settings = Settings.from_env()
+    write_local_copy(settings, make_raw_games(), 1_700_000_000_000)
+    version = SnapshotProvider(settings).loader.local_version()
+
+    snapshot = build_off_process(settings, version)
+
+    assert isinstance(snapshot, SqliteSnapshot)
+    assert snapshot.path == settings.SQLITE_PATH
+    assert len(snapshot.index.tables(GameQuery())) == 24
@@ -0,0 +1,63 @@
+import dataclasses
+
+import pytest
+
+from app.services.link_checker import LinkChecker, LinkResult
+from app.tools.upstream_stub import UpstreamStub
+
+# Nothing listens on the discard port: every check is a connection error.
+REFUSED = "http://127.0.0.1:9/table.vpx"
+
+
+@pytest.fixture
+def stub(tmp_path):
+    path = tmp_path / "upstream.json"
+    path.write_text("[]", encoding="utf-8")
+    server = UpstreamStub(str(path)).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def checker(settings):
+    settings = dataclasses.replace(settings, LINK_CHECK_DEAD_AFTER=3, LINK_CHECK_TIMEOUT_SECONDS=2)
+    return LinkChecker(settings, provider=None)
+
+
+def test_connection_errors_turn_dead_only_after_repeated_passes(checker):
+    for expected in ("unreachable", "unreachable", "dead"):
+        assert checker._check_all([REFUSED]) == 1
+        result = checker.cache.get(REFUSED)
+        assert result.state == expected
+        assert checker.is_dead(REFUSED) == (expected == "dead")
+    assert checker.cache.get(REFUSED).failures == 3
+
+    # Dead results are trusted for the TTL like any other verdict.
+    assert checker._check_all([REFUSED]) == 0
+
+
+def test_unreachable_is_retried_every_pass_and_recovers(checker, stub):
+    checker.cache.update({REFUSED: LinkResult(state="unreachable", status=None, checked_at=1e12, failures=2)})
+    assert not checker.cache.is_fresh(REFUSED, now=1e12)
+
+    url = f"{stub.base_url}/links/ok/table.vpx"
+    checker.cache.update({url: LinkResult(state="unreachable", status=None, checked_at=1e12, failures=2)})
+    checker._check_all([url])
+    assert checker.cache.get(url).state == "ok"
+    assert checker.cache.get(url).failures == 0
+
+
+def test_not_found_is_dead_at_once(checker, stub):
+    url = f"{stub.base_url}/links/dead/table.vpx"
+    checker._check_all([url])
+    assert checker.cache.get(url).state == "dead"
+    assert checker.cache.get(url).failures == 0
+
+
+def test_failures_survive_a_reload(checker, settings):
+    checker._check_all([REFUSED])
+    other = LinkChecker(dataclasses.replace(settings, LINK_CHECK_DEAD_AFTER=2), provider=None)
+    other.cache.load()
+    assert other.cache.get(REFUSED).failures == 1
+    other._check_all([REFUSED])
+    assert other.cache.get(REFUSED).state == "dead"
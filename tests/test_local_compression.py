@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import dataclasses
+import os
+import time
+
+from app.services.vpsdb_loader import VpsDbLoader
+from app.services.vpsdb_sync_service import VpsDbSyncService
+from app.utils import compression
+from tests.conftest import file_upstream, make_raw_games, write_local_copy
+
+
+def test_local_copy_is_uncompressed_by_default(settings):
+    assert settings.LOCAL_COMPRESSION == "none"
+    assert settings.LOCAL_COMPRESSION_PRUNE is False
+
+
+def test_switching_compression_keeps_the_plain_copy_unless_pruning(settings, tmp_path):
+    write_local_copy(settings, make_raw_games(3), 1)
+    gz = dataclasses.replace(file_upstream(settings, tmp_path / "up", make_raw_games(4), 2), LOCAL_COMPRESSION="gzip")
+
+    assert VpsDbSyncService(gz).sync_if_needed().updated
+    assert os.path.exists(settings.LOCAL_JSON_PATH)
+    assert os.path.exists(settings.LOCAL_JSON_PATH + ".gz")
+    # The newer (gzip) copy is the one read, whatever the preferred setting.
+    assert len(VpsDbLoader(settings).read_local()) == 4
+
+    upstream = file_upstream(settings, tmp_path / "up", make_raw_games(5), 3)
+    pruning = dataclasses.replace(upstream, LOCAL_COMPRESSION="gzip", LOCAL_COMPRESSION_PRUNE=True)
+    assert VpsDbSyncService(pruning).sync_if_needed().updated
+    assert not os.path.exists(settings.LOCAL_JSON_PATH)
+
+
+def test_find_existing_prefers_the_newest_copy(tmp_path):
+    path = str(tmp_path / "vpsdb.json")
+    for suffix in ("", ".gz"):
+        with open(path + suffix, "wb") as f:
+            f.write(b"[]")
+    now = time.time()
+    os.utime(path, (now, now))
+    os.utime(path + ".gz", (now - 60, now - 60))
+
+    assert compression.find_existing(path, "gzip") == (path, "none")
+    os.utime(path + ".gz", (now, now))
+    assert compression.find_existing(path, "gzip") == (path + ".gz", "gzip")
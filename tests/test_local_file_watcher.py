@@ -0,0 +1,96 @@
+import dataclasses
+import time
+
+import pytest
+
+from app.services.game_snapshot import SnapshotProvider
+from app.services.local_file_watcher import LocalFileWatcher
+from app.services.vpsdb_manifest import publish_manifest
+from tests.conftest import make_raw_games, write_local_copy
+
+TS = 1_700_000_000_000
+
+
+@pytest.fixture
+def watched(settings):
+    """A polling watcher (50 ms polls, 200 ms debounce) over a loaded provider that counts refreshes."""
+    settings = dataclasses.replace(settings, WATCH_MODE="poll", WATCH_POLL_SECONDS=0.05, WATCH_DEBOUNCE_MS=200)
+    write_local_copy(settings, make_raw_games(), TS)
+    provider = SnapshotProvider(settings)
+    provider.current()
+
+    refreshes = []
+    real_refresh = provider.refresh
+
+    def refresh():
+        refreshes.append(time.monotonic())
+        return real_refresh()
+
+    provider.refresh = refresh
+    watcher = LocalFileWatcher(settings, provider)
+    watcher.start()
+    _wait_for(lambda: watcher.state.mode == "poll")
+    # Let the first poll take its baseline fingerprint.
+    time.sleep(0.1)
+    yield settings, provider, watcher, refreshes
+    watcher.stop()
+
+
+def _wait_for(condition, timeout=3.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def test_rewriting_the_local_copy_refreshes_once(watched):
+    settings, provider, watcher, refreshes = watched
+
+    write_local_copy(settings, make_raw_games(13), TS + 1)
+
+    assert _wait_for(lambda: watcher.state.reloads == 1)
+    time.sleep(0.4)
+    assert len(refreshes) == 1
+    assert provider.peek().timestamp == TS + 1
+    assert watcher.state.last_error is None
+
+
+def test_a_burst_of_writes_is_debounced_into_one_refresh(watched):
+    settings, provider, watcher, refreshes = watched
+
+    for i in range(5):
+        write_local_copy(settings, make_raw_games(13 + i), TS + 1 + i)
+        time.sleep(0.1)
+    burst_ended = time.monotonic()
+
+    assert _wait_for(lambda: watcher.state.reloads == 1)
+    time.sleep(0.4)
+    assert len(refreshes) == 1
+    # Writes 100 ms apart keep resetting the 200 ms debounce.
+    assert refreshes[0] >= burst_ended
+    assert watcher.state.events >= 5
+    assert provider.peek().timestamp == TS + 5
+
+
+def test_a_manifest_that_does_not_match_skips_the_reload(watched):
+    settings, provider, watcher, refreshes = watched
+
+    write_local_copy(settings, make_raw_games(13), TS + 1)
+    publish_manifest(settings, TS + 1, "test")
+    # The copy changes again after its manifest was written (a publish in progress).
+    write_local_copy(settings, make_raw_games(14), TS + 2)
+
+    assert _wait_for(lambda: watcher.state.last_error is not None)
+    time.sleep(0.4)
+    assert refreshes == []
+    assert "does not match" in watcher.state.last_error
+    assert provider.peek().timestamp == TS
+
+    # The manifest catching up wakes the watcher again.
+    publish_manifest(settings, TS + 2, "test")
+    assert _wait_for(lambda: watcher.state.reloads == 1)
+    assert len(refreshes) == 1
+    assert provider.peek().timestamp == TS + 2
+    assert watcher.state.last_error is None
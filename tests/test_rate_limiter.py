@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import dataclasses
+
+from flask import Flask
+
+from app.services.rate_limiter import Budget, MemoryBucketStore, RateLimiter
+
+BUDGET = Budget(rate=1.0, burst=2.0)
+
+
+def _key(limiter: RateLimiter, headers: dict, remote_addr: str = "10.0.0.1") -> str:
+    with Flask(__name__).test_request_context(headers=headers, environ_base={"REMOTE_ADDR": remote_addr}):
+        return limiter._client_key()
+
+
+def test_unknown_api_keys_fall_back_to_the_client_address(settings):
+    limiter = RateLimiter(dataclasses.replace(settings, RATE_LIMIT_API_KEYS=("known",)))
+
+    assert _key(limiter, {"X-Api-Key": "random-1"}) == _key(limiter, {"X-Api-Key": "random-2"}) == "ip:10.0.0.1"
+    assert _key(limiter, {"X-Api-Key": "known"}).startswith("key:")
+
+
+def test_forwarded_for_is_ignored_unless_the_proxy_is_trusted(settings):
+    headers = {"X-Forwarded-For": "1.2.3.4, 192.168.0.9"}
+
+    assert _key(RateLimiter(settings), headers) == "ip:10.0.0.1"
+    trusted = RateLimiter(dataclasses.replace(settings, RATE_LIMIT_TRUST_PROXY=True))
+    # The client-supplied first entry is not trusted; the proxy's appended one is.
+    assert _key(trusted, headers) == "ip:192.168.0.9"
+
+
+def test_memory_store_drops_least_recently_used_buckets_beyond_the_cap():
+    store = MemoryBucketStore(max_keys=3)
+    for i in range(10):
+        store.take(f"k{i}", BUDGET, now=100.0 + i)
+
+    assert len(store) == 3
+
+
+def test_memory_store_keeps_recently_used_bucket_limited():
+    store = MemoryBucketStore(max_keys=3)
+    assert store.take("hot", BUDGET, now=100.0)[0]
+    assert store.take("hot", BUDGET, now=100.0)[0]
+    for i in range(5):
+        store.take(f"other{i}", BUDGET, now=100.0)
+        allowed, retry = store.take("hot", BUDGET, now=100.0)
+        assert not allowed and retry > 0
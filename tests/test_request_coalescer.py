@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from app.controllers import api_controller
+
+
+@pytest.fixture
+def slow_games(monkeypatch):
+    """Make /api/games take a while and count how often it is computed."""
+    calls = []
+    real_snapshot = api_controller._snapshot
+
+    def slow_snapshot():
+        calls.append(threading.get_ident())
+        time.sleep(0.3)
+        if getattr(slow_snapshot, "fail_first", False) and len(calls) == 1:
+            raise RuntimeError("leader failed")
+        return real_snapshot()
+
+    monkeypatch.setattr(api_controller, "_snapshot", slow_snapshot)
+    slow_snapshot.calls = calls
+    return slow_snapshot
+
+
+def _fan_out(app, paths, headers=None):
+    barrier = threading.Barrier(len(paths))
+    responses = [None] * len(paths)
+
+    def get(i):
+        client = app.test_client()
+        barrier.wait()
+        responses[i] = client.get(paths[i], headers=headers or {})
+
+    threads = [threading.Thread(target=get, args=(i,)) for i in range(len(paths))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return responses
+
+
+def test_identical_requests_share_one_computation(app, slow_games):
+    responses = _fan_out(app, ["/api/games?limit=5&sort=game_updated"] * 8)
+
+    assert len(slow_games.calls) == 1
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.get_data() for r in responses}) == 1
+    assert sum(r.headers.get("X-Coalesced") == "1" for r in responses) == 7
+
+    totals = app.extensions["request_coalescer"].stats()["totals"]
+    assert totals["computed"] == 1
+    assert totals["collapsed"] == 7
+    assert app.extensions["request_coalescer"].stats()["inFlight"] == 0
+
+
+def test_query_order_is_normalized_and_different_queries_are_not_shared(app, slow_games):
+    paths = ["/api/games?limit=5&sort=game_updated", "/api/games?sort=game_updated&limit=5", "/api/games?limit=6"]
+    responses = _fan_out(app, paths)
+    assert len(slow_games.calls) == 2
+    assert responses[0].get_data() == responses[1].get_data() != responses[2].get_data()
+
+
+def test_conditional_requests_are_not_coalesced(app, slow_games):
+    _fan_out(app, ["/api/games?limit=5"] * 3, headers={"If-None-Match": '"x"'})
+    assert len(slow_games.calls) == 3
+
+
+def test_waiters_compute_themselves_when_the_leader_fails(app, slow_games):
+    slow_games.fail_first = True
+    app.config["PROPAGATE_EXCEPTIONS"] = False
+    responses = _fan_out(app, ["/api/games?limit=5"] * 4)
+
+    assert sorted(r.status_code for r in responses) == [200, 200, 200, 500]
+    assert not any(r.headers.get("X-Coalesced") for r in responses)
+    totals = app.extensions["request_coalescer"].stats()["totals"]
+    assert totals["computed"] == 1
+    assert totals["unshared"] == 3
+
+
+def test_waiters_stop_waiting_after_the_wait_limit(app, slow_games):
+    app.extensions["request_coalescer"]._wait_seconds = 0.05
+    responses = _fan_out(app, ["/api/games?limit=5"] * 3)
+
+    assert all(r.status_code == 200 for r in responses)
+    assert len(slow_games.calls) == 3
+    assert app.extensions["request_coalescer"].stats()["totals"]["timedOut"] == 2
@@ -0,0 +1,94 @@
+import json
+import time
+
+import pytest
+
+from app.controllers import api_controller
+from tests.conftest import make_raw_games, write_local_copy
+
+TS = 1_700_000_000_000
+
+
+@pytest.fixture
+def make_app(settings, monkeypatch):
+    """Build an app with timing-related env overrides: `make_app(SLOW_REQUEST_MS="200")`."""
+    from app import create_app
+    from app.configs.settings import Settings
+
+    def make(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        write_local_copy(Settings.from_env(), make_raw_games(), TS)
+        flask_app = create_app()
+        flask_app.extensions["vpsdb_snapshots"].current()
+        return flask_app
+
+    return make
+
+
+def _segments(header: str) -> dict:
+    out = {}
+    for part in header.split(", "):
+        name, _, dur = part.partition(";dur=")
+        out[name] = float(dur)
+    return out
+
+
+def _slow_lines(output: str) -> list:
+    return [json.loads(line) for line in output.splitlines() if line.startswith('{"event":"slow_request"')]
+
+
+def test_server_timing_lists_stages_in_order_and_the_total(app):
+    resp = app.test_client().get("/widgets/tables/list?limit=5")
+
+    assert resp.status_code == 200
+    assert resp.headers["Timing-Allow-Origin"] == "*"
+    segments = _segments(resp.headers["Server-Timing"])
+    assert list(segments) == ["sync", "snapshot", "filter", "rows", "render", "total"]
+    assert all(dur >= 0 for dur in segments.values())
+    assert segments["total"] >= sum(dur for name, dur in segments.items() if name != "total")
+
+
+def test_server_timing_can_be_disabled(make_app):
+    resp = make_app(SERVER_TIMING_ENABLED="false").test_client().get("/api/games?limit=1")
+    assert "Server-Timing" not in resp.headers
+
+
+def test_slow_requests_are_logged_as_one_json_line(make_app, monkeypatch, capsys):
+    client = make_app(SLOW_REQUEST_MS="200").test_client()
+    client.get("/api/games?limit=1")
+    capsys.readouterr()
+
+    assert client.get("/api/games?limit=2").status_code == 200
+    assert _slow_lines(capsys.readouterr().out) == []
+
+    real_snapshot = api_controller._snapshot
+
+    def slow_snapshot():
+        time.sleep(0.25)
+        return real_snapshot()
+
+    monkeypatch.setattr(api_controller, "_snapshot", slow_snapshot)
+    assert client.get("/api/games?limit=3&sort=game_updated").status_code == 200
+
+    (line,) = _slow_lines(capsys.readouterr().out)
+    assert line["method"] == "GET"
+    assert line["route"] == "/api/games"
+    assert line["endpoint"] == "api.list_games"
+    assert line["status"] == 200
+    assert line["query"] == {"limit": ["3"], "sort": ["game_updated"]}
+    assert line["totalMs"] >= 200
+    assert {"sync", "filter", "render"} <= set(line["stagesMs"])
+
+
+def test_a_zero_threshold_disables_the_slow_log(make_app, monkeypatch, capsys):
+    client = make_app(SLOW_REQUEST_MS="0").test_client()
+    real_snapshot = api_controller._snapshot
+
+    def slow_snapshot():
+        time.sleep(0.05)
+        return real_snapshot()
+
+    monkeypatch.setattr(api_controller, "_snapshot", slow_snapshot)
+    client.get("/api/games?limit=1")
+    assert _slow_lines(capsys.readouterr().out) == []
@@ -0,0 +1,65 @@
+import dataclasses
+import threading
+import time
+
+import pytest
+
+from app.services import game_snapshot
+from app.services.snapshot_history import HistoryNotFoundError, SnapshotHistory
+from tests.conftest import make_raw_games
+
+TS = 1_700_000_000
+
+
+def test_history_is_off_by_default(settings):
+    assert settings.HISTORY_VERSIONS == 0
+    history = SnapshotHistory(settings)
+    assert not history.enabled
+    with pytest.raises(HistoryNotFoundError):
+        history.snapshot_as_of(str(TS))
+
+
+def test_concurrent_as_of_requests_share_one_build(settings, monkeypatch):
+    history = SnapshotHistory(dataclasses.replace(settings, HISTORY_VERSIONS=5))
+    history.record(make_raw_games(), TS)
+
+    calls = []
+    real_build = game_snapshot.GameSnapshot.build.__func__
+
+    def slow_build(cls, *args, **kwargs):
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        return real_build(cls, *args, **kwargs)
+
+    monkeypatch.setattr(game_snapshot.GameSnapshot, "build", classmethod(slow_build))
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(history.snapshot_as_of(str(TS)))) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 6
+    assert all(snap is results[0] for snap in results)
+    assert results[0].timestamp == TS
+    # Later requests hit the cache.
+    assert history.snapshot_as_of(str(TS)) is results[0]
+    assert len(calls) == 1
+
+
+def test_failed_build_is_not_cached(settings, monkeypatch):
+    history = SnapshotHistory(dataclasses.replace(settings, HISTORY_VERSIONS=5))
+    history.record(make_raw_games(), TS)
+    real_build = game_snapshot.GameSnapshot.build
+
+    def broken_build(*args, **kwargs):
+        raise OSError("disk went away")
+
+    monkeypatch.setattr(game_snapshot.GameSnapshot, "build", broken_build)
+    with pytest.raises(OSError):
+        history.snapshot_as_of(str(TS))
+
+    monkeypatch.setattr(game_snapshot.GameSnapshot, "build", real_build)
+    assert history.snapshot_as_of(str(TS)).timestamp == TS
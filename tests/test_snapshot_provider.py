@@ -0,0 +1,93 @@
+import threading
+import time
+
+from app.services import game_snapshot
+from app.services.game_index import GameQuery
+from app.services.game_snapshot import GameSnapshot, SnapshotProvider
+from tests.conftest import make_raw_games, write_local_copy
+
+TS = 1_700_000_000_000
+
+
+def _counting_build(monkeypatch, started=None, release=None):
+    calls = []
+    real_build = GameSnapshot.build.__func__
+
+    def build(cls, *args, **kwargs):
+        calls.append(args[0])
+        if started is not None:
+            started.set()
+            release.wait(5)
+        else:
+            time.sleep(0.1)
+        return real_build(cls, *args, **kwargs)
+
+    monkeypatch.setattr(game_snapshot.GameSnapshot, "build", classmethod(build))
+    return calls
+
+
+def _in_threads(count, target):
+    results = [None] * count
+
+    def run(i):
+        results[i] = target()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_first_loads_build_once(settings, monkeypatch):
+    write_local_copy(settings, make_raw_games(), TS)
+    provider = SnapshotProvider(settings)
+    calls = _counting_build(monkeypatch)
+
+    snaps = _in_threads(8, provider.current)
+
+    assert len(calls) == 1
+    assert all(s is snaps[0] for s in snaps)
+
+
+def test_readers_keep_the_old_snapshot_during_a_rebuild(settings, monkeypatch):
+    write_local_copy(settings, make_raw_games(), TS)
+    provider = SnapshotProvider(settings)
+    old = provider.current()
+
+    started, release = threading.Event(), threading.Event()
+    calls = _counting_build(monkeypatch, started, release)
+    write_local_copy(settings, make_raw_games(13), TS + 1)
+    rebuild = threading.Thread(target=provider.refresh)
+    rebuild.start()
+    assert started.wait(5)
+
+    # TTL expired for everyone: readers must not queue behind the rebuild.
+    provider._checked_at = 0.0
+    begun = time.perf_counter()
+    assert all(s is old for s in _in_threads(4, provider.current))
+    assert time.perf_counter() - begun < 1.0
+
+    release.set()
+    rebuild.join()
+    assert len(calls) == 1
+    assert provider.peek().timestamp == TS + 1
+    assert provider.current().game_count == 13
+
+
+def test_concurrent_filtered_facets_agree(settings, monkeypatch):
+    write_local_copy(settings, make_raw_games(), TS)
+    snapshot = SnapshotProvider(settings).current()
+    query = GameQuery(manufacturers=("bally",))
+    real_build = game_snapshot.GameFacets.build
+
+    def slow_build(*args):
+        time.sleep(0.05)
+        return real_build(*args)
+
+    monkeypatch.setattr(game_snapshot.GameFacets, "build", slow_build)
+
+    facets = _in_threads(8, lambda: snapshot.facets_for(query))
+    assert all(f is facets[0] for f in facets)
+    assert snapshot.facets_for(query) is facets[0]
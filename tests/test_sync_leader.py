@@ -0,0 +1,107 @@
+import json
+import threading
+
+from app.services.sync_leader import SyncLease, SyncLeadership
+from app.services.vpsdb_sync_service import SyncResult, VpsDbSyncService
+
+
+def _lease(settings, holder):
+    lease = SyncLease(settings)
+    lease.holder = holder
+    return lease
+
+
+def _expire(settings):
+    lease = SyncLease(settings)
+    payload = lease.read()
+    payload["expiresAt"] = 0
+    with open(lease._path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+
+
+def test_live_lease_is_refused_and_renewed_by_its_holder(settings):
+    a, b = _lease(settings, "a"), _lease(settings, "b")
+    first = a.try_acquire()
+    assert first["holder"] == "a"
+    assert b.try_acquire() is None
+
+    renewed = a.try_acquire()
+    assert renewed["acquiredAt"] == first["acquiredAt"]
+    assert renewed["expiresAt"] >= first["expiresAt"]
+
+
+def test_expired_lease_is_taken_over(settings):
+    a, b = _lease(settings, "a"), _lease(settings, "b")
+    a.try_acquire()
+    _expire(settings)
+
+    taken = b.try_acquire()
+    assert taken["holder"] == "b"
+    assert b.read()["holder"] == "b"
+    # The old holder is now refused instead of reclaiming the lease.
+    assert a.try_acquire() is None
+
+
+def test_release_only_by_the_holder(settings):
+    a, b = _lease(settings, "a"), _lease(settings, "b")
+    a.try_acquire()
+    b.release()
+    assert a.read()["holder"] == "a"
+
+    a.release()
+    assert a.read() is None
+    assert b.try_acquire()["holder"] == "b"
+
+
+def test_one_winner_among_concurrent_contenders(settings):
+    contenders = [_lease(settings, f"h{i}") for i in range(16)]
+    barrier = threading.Barrier(len(contenders))
+    won = []
+
+    def compete(lease):
+        barrier.wait()
+        if lease.try_acquire() is not None:
+            won.append(lease.holder)
+
+    threads = [threading.Thread(target=compete, args=(lease,)) for lease in contenders]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(won) == 1
+    assert contenders[0].read()["holder"] == won[0]
+
+
+def test_leader_steps_down_when_its_lease_is_taken_over(settings):
+    leadership = SyncLeadership(settings)
+    leadership._tick()
+    assert leadership.is_leader
+
+    _expire(settings)
+    _lease(settings, "other").try_acquire()
+    leadership._tick()
+    assert not leadership.is_leader
+    assert leadership.state.changes == 2
+
+
+def test_manual_sync_is_refused_by_followers(app, settings, monkeypatch):
+    leadership = SyncLeadership(settings)
+    app.extensions["vpsdb_leadership"] = leadership
+    _lease(settings, "other").try_acquire()
+    leadership._tick()
+    client = app.test_client()
+
+    resp = client.post("/sync")
+    assert resp.status_code == 409
+    assert resp.get_json()["leader"] == "other"
+
+    # Once the lease is ours, the sync runs.
+    _expire(settings)
+    leadership._tick()
+    synced = []
+    monkeypatch.setattr(VpsDbSyncService, "sync_if_needed", lambda self: synced.append(1) or SyncResult(False, 1, 1))
+    resp = client.post("/sync")
+    assert resp.status_code == 200
+    assert resp.get_json()["updated"] is False
+    assert synced == [1]
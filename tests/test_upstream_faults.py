@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+
+import pytest
+
+from app.clients.vpsdb_client import _parse_db
+from app.configs.settings import Settings
+from app.services.vpsdb_sync_service import VpsDbSyncService, check_db_payload
+from app.tools.faultbench import _T1, _T2, _v2_body, check_sync
+from app.tools.upstream_stub import PROFILES, FaultProfile, UpstreamStub
+from tests.conftest import make_raw_games
+
+
+@pytest.fixture
+def stub(tmp_path, settings, monkeypatch):
+    """Upstream stub serving v1, with the app's env pointed at it and a synced local copy."""
+    path = tmp_path / "upstream.json"
+    path.write_text(json.dumps(make_raw_games()), encoding="utf-8")
+    server = UpstreamStub(str(path), last_updated=_T1, seed=1).start()
+    for key, value in server.env(settings.STORAGE_DIR).items():
+        monkeypatch.setenv(key, value)
+    VpsDbSyncService(Settings.from_env()).sync_if_needed()
+    yield server
+    server.stop()
+
+
+@pytest.mark.parametrize("name", list(PROFILES))
+def test_sync_under_fault_profile_leaves_a_consistent_local_copy(stub, name):
+    profile = PROFILES[name]
+    if profile.latency_ms:
+        # Same shape, shorter waits.
+        profile = dataclasses.replace(profile, latency_ms=50, jitter_ms=20)
+
+    stub.publish(_v2_body(stub.db_body), _T2)
+    stub.faults = profile
+    result = check_sync(stub, profile, attempts=3)
+
+    assert result["problems"] == []
+    assert result["local"] in ("v1", "v2")
+
+
+def test_truncated_body_never_replaces_the_local_copy(stub):
+    stub.publish(_v2_body(stub.db_body), _T2)
+    stub.faults = PROFILES["truncated-undeclared"]
+    for _ in range(3):
+        with pytest.raises(Exception):
+            VpsDbSyncService(Settings.from_env()).sync_if_needed()
+    assert check_sync(stub, PROFILES["truncated-undeclared"], attempts=1)["local"] == "v1"
+
+
+@pytest.mark.parametrize("payload", [[{"id": "g"}], {"data": [{"id": "g"}]}, {"items": []}, {"games": []}])
+def test_parse_db_accepts_every_shape_the_mapper_reads(payload):
+    text = json.dumps(payload)
+    assert _parse_db(text, check_db_payload) == (text, payload)
+
+
+@pytest.mark.parametrize("text", ['[{"id": "g"}', '{"unexpected": 1}', '"games"'])
+def test_parse_db_rejects_truncated_or_unknown_payloads(text):
+    with pytest.raises(ValueError):
+        _parse_db(text, check_db_payload)
+
+
+def test_fault_profile_from_dict_accepts_camel_and_snake_case():
+    profile = FaultProfile.from_dict({"profile": "slow", "latencyMs": 10, "error_burst": 2})
+
+    assert (profile.name, profile.latency_ms, profile.jitter_ms, profile.error_burst) == ("slow", 10, 500, 2)
+    assert FaultProfile.from_dict(profile.to_dict()) == profile
+    with pytest.raises(ValueError):
+        FaultProfile.from_dict({"latency": 1})
@@ -0,0 +1,107 @@
+import json
+import time
+
+import pytest
+
+from app.clients import vpsdb_client
+from app.clients.vpsdb_client import Mirror, VpsDbClient
+from app.services.vpsdb_sync_service import check_db_payload
+from app.tools.upstream_stub import FaultProfile, UpstreamStub
+from tests.conftest import make_raw_games
+
+TS = 1_700_000_000_000
+
+
+@pytest.fixture
+def stubs(tmp_path, monkeypatch):
+    """Start upstream stubs on demand: `stubs(delay_seconds=..., faults=...)`."""
+    monkeypatch.setattr(vpsdb_client, "_stats", {})
+    path = tmp_path / "vpsdb.json"
+    path.write_text(json.dumps(make_raw_games()), encoding="utf-8")
+    started = []
+
+    def start(**kwargs):
+        stub = UpstreamStub(str(path), last_updated=TS, **kwargs).start()
+        started.append(stub)
+        return stub
+
+    yield start
+    for stub in started:
+        stub.stop()
+
+
+def _mirror(stub) -> Mirror:
+    return Mirror(db_url=f"{stub.base_url}/vpsdb.json", last_updated_url=f"{stub.base_url}/lastUpdated.json")
+
+
+def _client(*stubs, hedge_after_seconds=None) -> VpsDbClient:
+    mirrors = [_mirror(s) for s in stubs]
+    return VpsDbClient("", "", timeout_seconds=5, mirrors=mirrors, hedge_after_seconds=hedge_after_seconds)
+
+
+def test_fastest_healthy_mirror_is_preferred(stubs):
+    slow, fast, slower = stubs(delay_seconds=0.15), stubs(), stubs(delay_seconds=0.3)
+    client = _client(slow, fast, slower)
+
+    # Each mirror is measured once (in configured order), then the fastest one wins.
+    for _ in range(6):
+        assert client.fetch_remote_timestamp() == TS
+
+    counts = [s.counters["lastUpdated.json"] for s in (slow, fast, slower)]
+    assert counts == [1, 4, 1]
+    assert [m["lastUpdatedUrl"] for m in client.mirror_stats()] == [
+        _mirror(s).last_updated_url for s in (fast, slow, slower)
+    ]
+
+
+def test_failing_mirror_fails_over_and_is_demoted(stubs):
+    broken, healthy = stubs(faults=FaultProfile(name="down", error_rate=1.0)), stubs(delay_seconds=0.05)
+    client = _client(broken, healthy)
+
+    for _ in range(5):
+        assert client.fetch_remote_timestamp() == TS
+
+    # Two errors push the error rate over the threshold; afterwards only the healthy mirror is asked.
+    assert broken.counters["lastUpdated.json"] == 2
+    assert healthy.counters["lastUpdated.json"] == 5
+    stats = client.mirror_stats()
+    assert stats[0]["lastUpdatedUrl"] == _mirror(healthy).last_updated_url
+    assert stats[1]["errors"] == 2
+
+
+def test_hedge_fires_after_the_threshold(stubs):
+    stalled, quick = stubs(delay_seconds=0.6), stubs()
+    client = _client(stalled, quick, hedge_after_seconds=0.1)
+
+    started = time.perf_counter()
+    assert client.fetch_remote_timestamp() == TS
+    elapsed = time.perf_counter() - started
+
+    assert 0.1 <= elapsed < 0.5
+    assert stalled.counters["lastUpdated.json"] == 1
+    assert quick.counters["lastUpdated.json"] == 1
+
+
+def test_no_hedge_below_the_threshold(stubs):
+    first, second = stubs(delay_seconds=0.05), stubs()
+    client = _client(first, second, hedge_after_seconds=0.5)
+
+    assert client.fetch_remote_timestamp() == TS
+    assert (first.counters["lastUpdated.json"], second.counters["lastUpdated.json"]) == (1, 0)
+
+
+def test_truncated_or_rejected_db_fails_over(stubs):
+    truncated = stubs(faults=FaultProfile(name="cut", truncate_ratio=0.5, paths=("vpsdb.json",)))
+    healthy = stubs(delay_seconds=0.05)
+    client = _client(truncated, healthy)
+    client.fetch_remote_timestamp()
+    client.fetch_remote_timestamp()
+
+    text, raw = client.fetch_db_json(validate=check_db_payload)
+    assert len(raw) == len(make_raw_games())
+    assert truncated.counters["vpsdb.json"] == 1
+    assert healthy.counters["vpsdb.json"] == 1
+
+    healthy.publish(b'{"unexpected": 1}', TS)
+    with pytest.raises(ValueError):
+        client.fetch_db_json(validate=check_db_payload)
@@ -0,0 +1,79 @@
+import dataclasses
+import threading
+import time
+
+from app.services import widget_rows
+from app.services.widget_rows import WidgetRowsCache
+
+
+def test_rows_payload_matches_the_html_widget_rows(app):
+    client = app.test_client()
+    payload = client.get("/widgets/tables/rows?limit=5").get_json()
+
+    assert payload["v"] == 1_700_000_000_000
+    assert "name" in payload["cols"] and "url" in payload["cols"]
+    assert len(payload["rows"]) == 5
+    assert all(len(row) == len(payload["cols"]) for row in payload["rows"])
+
+
+def test_presentation_params_share_one_cached_payload(app):
+    client = app.test_client()
+    first = client.get("/widgets/tables/rows?limit=5&theme=dark")
+    second = client.get("/widgets/tables/rows?theme=light&limit=5&view=images")
+
+    assert first.get_data() == second.get_data()
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert len(app.extensions["widget_rows_cache"]) == 1
+
+    client.get("/widgets/tables/rows?limit=6")
+    assert len(app.extensions["widget_rows_cache"]) == 2
+
+
+def test_matching_etag_answers_304(app):
+    client = app.test_client()
+    etag = client.get("/widgets/backglasses/rows?limit=3").headers["ETag"]
+    resp = client.get("/widgets/backglasses/rows?limit=3", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["Access-Control-Allow-Origin"] == "*"
+
+
+def test_cache_is_bounded(settings):
+    cache = WidgetRowsCache(dataclasses.replace(settings, WIDGET_ROWS_CACHE_ENTRIES=2))
+    for i in range(5):
+        cache.get_or_build(("k", i), lambda i=i: str(i).encode())
+    assert len(cache) == 2
+    assert cache.get_or_build(("k", 4), lambda: b"rebuilt")[0] == b"4"
+    assert cache.get_or_build(("k", 0), lambda: b"rebuilt")[0] == b"rebuilt"
+
+
+def test_concurrent_misses_agree_on_one_payload(app, monkeypatch):
+    threads = 8
+    real_encode = widget_rows.encode_rows
+    builds = []
+
+    def encode(*args):
+        builds.append(1)
+        n = len(builds)
+        time.sleep(0.05)
+        body = real_encode(*args)
+        # Distinct bytes per build expose a caller that got its own copy.
+        return body[:-1] + f',"n":{n}}}'.encode()
+
+    monkeypatch.setattr(widget_rows, "encode_rows", encode)
+    barrier = threading.Barrier(threads)
+    bodies = [None] * threads
+
+    def get(i):
+        client = app.test_client()
+        barrier.wait()
+        # Distinct themes: not coalesced, but one cache key.
+        bodies[i] = client.get(f"/widgets/tables/rows?limit=5&theme=t{i}").get_data()
+
+    workers = [threading.Thread(target=get, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    assert len(set(bodies)) == 1
+    assert len(app.extensions["widget_rows_cache"]) == 1